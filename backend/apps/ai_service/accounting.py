@@ -0,0 +1,132 @@
+"""
+Token usage, cost and budgets of AI operations.
+
+AIService records every provider call (operation, model, tokens, latency and
+its cost from AI_PRICING). When a summarization task finishes, its calls are
+totalled on the AITask and added to the AIUsageDaily rollup of the day, the
+blog's author, the operation and the model. New tasks are checked against the
+recorded spend of the day: past AI_BUDGET_THROTTLE_AT of a budget they are
+queued late and at the lowest priority, past the budget they are refused.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import AIUsageDaily
+
+# Fields of AIUsageDaily that per-call records are summed into.
+TOTALS = ('calls', 'prompt_tokens', 'completion_tokens', 'cost', 'latency_ms')
+GROUP_BY = ('date', 'author', 'operation', 'model')
+# AITask fields set by record_task_usage.
+USAGE_FIELDS = ('calls', 'model', 'prompt_tokens', 'completion_tokens', 'latency_ms', 'cost')
+
+
+class BudgetExceeded(Exception):
+    """Raised instead of queueing AI work once a daily budget is spent."""
+
+
+def model_prices(model):
+    """(prompt, completion) USD per million tokens; dated model versions match their base name."""
+    names = [name for name in settings.AI_PRICING if model == name or model.startswith(f'{name}-')]
+    if not names:
+        return 0.0, 0.0
+    return tuple(settings.AI_PRICING[max(names, key=len)])
+
+
+def call_cost(model, prompt_tokens, completion_tokens):
+    prompt_price, completion_price = model_prices(model)
+    return round((prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000, 6)
+
+
+def call_record(operation, completion, latency):
+    """Accounting entry for one provider call."""
+    return {
+        'operation': operation,
+        'model': completion.model,
+        'prompt_tokens': completion.prompt_tokens,
+        'completion_tokens': completion.completion_tokens,
+        'latency_ms': round(latency * 1000),
+        'cost': call_cost(completion.model, completion.prompt_tokens, completion.completion_tokens),
+    }
+
+
+def record_task_usage(task, calls):
+    """Total `calls` on the finished task and add them to today's rollups; the task is saved by the caller."""
+    task.calls = list(calls)
+    task.prompt_tokens = sum(call['prompt_tokens'] for call in calls)
+    task.completion_tokens = sum(call['completion_tokens'] for call in calls)
+    task.latency_ms = sum(call['latency_ms'] for call in calls)
+    task.cost = Decimal(str(round(sum(call['cost'] for call in calls), 6)))
+    if calls:
+        # The model of the call with the most tokens (the analysis, not a condensing step).
+        task.model = max(calls, key=lambda call: call['prompt_tokens'] + call['completion_tokens'])['model']
+
+    groups = defaultdict(lambda: dict.fromkeys(TOTALS, 0))
+    for call in calls:
+        totals = groups[call['operation'], call['model']]
+        totals['calls'] += 1
+        for name in TOTALS[1:]:
+            totals[name] += call[name]
+
+    today = timezone.now().date()
+    author_id = task.blog.author_id
+    with transaction.atomic():
+        for (operation, model), totals in groups.items():
+            row, _ = AIUsageDaily.objects.get_or_create(
+                date=today, author_id=author_id, operation=operation, model=model
+            )
+            totals['cost'] = Decimal(str(round(totals['cost'], 6)))
+            AIUsageDaily.objects.filter(pk=row.pk).update(
+                **{name: F(name) + value for name, value in totals.items()}
+            )
+
+
+def spent_today(author_id=None):
+    """Recorded spend of the day in USD, overall or for one author."""
+    rows = AIUsageDaily.objects.filter(date=timezone.now().date())
+    if author_id is not None:
+        rows = rows.filter(author_id=author_id)
+    return float(rows.aggregate(total=Sum('cost'))['total'] or 0)
+
+
+def budget_state(author_id=None):
+    """'ok', 'throttle' or 'exceeded', for the stricter of the global and the author's daily budget."""
+    checks = [(settings.AI_DAILY_BUDGET, None)]
+    if author_id is not None:
+        checks.append((settings.AI_AUTHOR_DAILY_BUDGET, author_id))
+    state = 'ok'
+    for budget, owner in checks:
+        if not budget:
+            continue
+        spent = spent_today(owner)
+        if spent >= budget:
+            return 'exceeded'
+        if spent >= budget * settings.AI_BUDGET_THROTTLE_AT:
+            state = 'throttle'
+    return state
+
+
+def usage_report(days=30, group_by='date', author_id=None):
+    """Totals per `group_by` value over the last `days` days, newest or most expensive first."""
+    if group_by not in GROUP_BY:
+        raise ValueError(f'group_by must be one of {", ".join(GROUP_BY)}.')
+    since = timezone.now().date() - timedelta(days=days - 1)
+    rows = AIUsageDaily.objects.filter(date__gte=since)
+    if author_id is not None:
+        rows = rows.filter(author_id=author_id)
+    key = 'author__username' if group_by == 'author' else group_by
+    # Annotations may not reuse the model's field names.
+    totals = (
+        rows.values(key)
+        .annotate(**{f'total_{name}': Sum(name) for name in TOTALS})
+        .order_by('-date' if group_by == 'date' else '-total_cost')
+    )
+    return [
+        {group_by: row[key], **{name: row[f'total_{name}'] for name in TOTALS}, 'cost': float(row['total_cost'])}
+        for row in totals
+    ]
@@ -1,9 +1,51 @@
 from django.contrib import admin
-from .models import AITask
+from .models import AITask, AITaskArchive, AIResultCache, AIBatchJob, AIUsageDaily
 
 @admin.register(AITask)
 class AITaskAdmin(admin.ModelAdmin):
-    list_display = ['blog', 'task_type', 'status', 'created_at', 'completed_at']
+    list_display = ['blog', 'task_type', 'status', 'step', 'progress', 'cost', 'created_at', 'completed_at']
     list_filter = ['status', 'task_type', 'created_at']
     search_fields = ['blog__title']
-    readonly_fields = ['created_at', 'updated_at', 'completed_at', 'result', 'error']
+    readonly_fields = [
+        'step', 'progress', 'created_at', 'updated_at', 'completed_at', 'result', 'error',
+        'model', 'prompt_tokens', 'completion_tokens', 'latency_ms', 'cost', 'calls'
+    ]
+
+
+@admin.register(AITaskArchive)
+class AITaskArchiveAdmin(admin.ModelAdmin):
+    list_display = ['task_id', 'blog_id', 'task_type', 'status', 'mode', 'duration_seconds', 'completed_at']
+    list_filter = ['status', 'task_type', 'mode']
+    search_fields = ['task_id', 'blog_id']
+    readonly_fields = [
+        'task_id', 'blog_id', 'task_type', 'status', 'mode', 'model', 'prompt_tokens', 'completion_tokens',
+        'latency_ms', 'cost', 'duration_seconds', 'error', 'created_at', 'completed_at', 'archived_at'
+    ]
+
+
+@admin.register(AIUsageDaily)
+class AIUsageDailyAdmin(admin.ModelAdmin):
+    list_display = ['date', 'author', 'operation', 'model', 'calls', 'prompt_tokens', 'completion_tokens', 'cost']
+    list_filter = ['date', 'operation', 'model']
+    search_fields = ['author__username']
+    readonly_fields = [
+        'date', 'author', 'operation', 'model', 'calls', 'prompt_tokens', 'completion_tokens', 'latency_ms', 'cost'
+    ]
+
+
+@admin.register(AIResultCache)
+class AIResultCacheAdmin(admin.ModelAdmin):
+    list_display = ['key', 'model', 'prompt_version', 'hits', 'created_at', 'last_hit_at']
+    list_filter = ['model', 'prompt_version']
+    search_fields = ['key']
+    readonly_fields = ['key', 'model', 'prompt_version', 'result', 'hits', 'created_at', 'last_hit_at']
+
+
+@admin.register(AIBatchJob)
+class AIBatchJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'status', 'processed', 'succeeded', 'failed', 'cache_hits', 'created_at', 'finished_at']
+    list_filter = ['status']
+    readonly_fields = [
+        'last_blog_id', 'processed', 'succeeded', 'failed', 'cache_hits', 'prompt_tokens',
+        'completion_tokens', 'elapsed_seconds', 'error', 'created_at', 'updated_at', 'finished_at'
+    ]
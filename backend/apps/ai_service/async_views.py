@@ -0,0 +1,81 @@
+"""
+Server-Sent Events stream of a summarization task's progress.
+
+Runs as a native async view, so under an ASGI server an open stream holds a
+coroutine rather than a worker thread (under WSGI the response is buffered
+until the task finishes). EventSource cannot send an Authorization header, so
+the JWT access token may also be passed as the `token` query parameter.
+"""
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from apps.users.authentication import CachedJWTAuthentication
+
+from .models import AITask
+from .streaming import done_event, get_stream_broker, task_channel
+
+
+@sync_to_async
+def _authenticate(request):
+    """Return the user for the request's JWT (header or ?token=), or None."""
+    authentication = CachedJWTAuthentication()
+    try:
+        raw_token = request.GET.get('token')
+        if raw_token:
+            return authentication.get_user(authentication.get_validated_token(raw_token))
+        result = authentication.authenticate(request)
+        return result[0] if result else None
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def _event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+async def _task_events(task):
+    if task.status not in AITask.ACTIVE_STATUSES:
+        yield _event('done', done_event(task))
+        return
+    deadline = time.monotonic() + settings.AI_STREAM_TIMEOUT
+    async for item in get_stream_broker().listen(task_channel(task.id), settings.AI_STREAM_HEARTBEAT):
+        if item is not None:
+            event, data = item
+            yield _event(event, data)
+            continue
+        # Idle: the worker may have died without publishing, so check the task itself.
+        await task.arefresh_from_db()
+        if task.status not in AITask.ACTIVE_STATUSES:
+            yield _event('done', done_event(task))
+            return
+        if time.monotonic() > deadline:
+            # EventSource reconnects and resumes from a fresh snapshot.
+            return
+        yield ': keep-alive\n\n'
+
+
+async def task_stream(request, pk):
+    """Stream a summarization task: snapshot, then status, token, reset and finally done events."""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    user = await _authenticate(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided or are invalid.'}, status=401)
+    try:
+        task = await AITask.objects.select_related('blog').aget(pk=pk)
+    except AITask.DoesNotExist:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+    # Same rule as generating the summary: the post's author or staff.
+    if task.blog.author_id != user.id and not user.is_staff:
+        return JsonResponse({'detail': 'Permission denied'}, status=403)
+
+    response = StreamingHttpResponse(_task_events(task), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream.
+    response['X-Accel-Buffering'] = 'no'
+    return response
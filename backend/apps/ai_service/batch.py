@@ -0,0 +1,145 @@
+"""
+Batch summarization over the blog corpus.
+
+A job selects published posts without a BlogSummary (and, if include_stale,
+posts whose content, model or prompt version changed since their summary), then summarizes them in id order, one
+window of blogs at a time, with `concurrency` threads sharing one
+requests/tokens-per-minute budget. Counters and the last_blog_id checkpoint
+are saved after every window, so a job that stops (worker restart,
+cancellation, crash) resumes where it left off. A job also stops, as failed
+and resumable, once the day's global AI budget is spent.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.db import connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.blogs.models import Blog, BlogSummary
+
+from .accounting import BudgetExceeded, budget_state
+from .models import AIBatchJob
+from .ratelimit import LocalRateLimiter
+from .service import AIService
+from .tasks import summarize_blog, summary_content_hash, summary_version
+
+# Blogs per checkpoint, as a multiple of the job's concurrency.
+WINDOW_FACTOR = 4
+PROGRESS_FIELDS = [
+    'last_blog_id', 'processed', 'succeeded', 'failed', 'cache_hits',
+    'prompt_tokens', 'completion_tokens', 'elapsed_seconds', 'updated_at',
+]
+
+
+def pending_blogs(include_stale=True, after_id=0):
+    """Yield published blogs that need a (fresh) summary, by id.
+
+    Posts saved after their summary, or whose summary was made with another
+    model or prompt version, are only candidates: the summary is stale when
+    its content_hash no longer matches, so edits to status, tags and the like
+    do not pay for a new summary. Candidates whose summary is still current
+    get the current model and prompt version recorded, so they are not
+    selected again.
+    """
+    model, prompt_version = summary_version()
+    needs_summary = Q(ai_summary_record__isnull=True)
+    if include_stale:
+        needs_summary |= (
+            Q(ai_summary_record__updated_at__lt=F('updated_at'))
+            | ~Q(ai_summary_record__model=model)
+            | ~Q(ai_summary_record__prompt_version=prompt_version)
+        )
+    candidates = (
+        Blog.objects
+        .filter(needs_summary, status='published', id__gt=after_id)
+        .select_related('ai_summary_record')
+        .order_by('id')
+    )
+    current = []
+    try:
+        for blog in candidates.iterator(chunk_size=500):
+            summary = getattr(blog, 'ai_summary_record', None)
+            if summary is None or summary.content_hash != summary_content_hash(blog):
+                yield blog
+            elif (summary.model, summary.prompt_version) != (model, prompt_version):
+                current.append(summary.pk)
+                if len(current) >= 500:
+                    _record_version(current, model, prompt_version)
+    finally:
+        _record_version(current, model, prompt_version)
+
+
+def _record_version(summary_ids, model, prompt_version):
+    if summary_ids:
+        # update(), not save(): updated_at must keep saying when the summary was made.
+        BlogSummary.objects.filter(pk__in=summary_ids).update(model=model, prompt_version=prompt_version)
+        summary_ids.clear()
+
+
+def _summarize(blog, limiter):
+    service = AIService(limiter=limiter)
+    try:
+        _, result = summarize_blog(blog, service)
+    except Exception as e:
+        # One blog's database error must not abort the whole job.
+        result = {'status': 'error', 'message': str(e)}
+    try:
+        return result, service.usage
+    finally:
+        # Worker threads each hold their own connection; don't leave them open.
+        connection.close()
+
+
+def run_batch_job(job, progress=None):
+    """Run or resume `job`; `progress(job)` is called after every checkpoint."""
+    if job.status in (AIBatchJob.Status.COMPLETED, AIBatchJob.Status.CANCELLED):
+        return job
+    job.status = AIBatchJob.Status.RUNNING
+    job.error = ''
+    job.save(update_fields=['status', 'error', 'updated_at'])
+
+    limiter = LocalRateLimiter(job.requests_per_minute, job.tokens_per_minute)
+    window = max(job.concurrency, 1) * WINDOW_FACTOR
+    try:
+        with ThreadPoolExecutor(max_workers=max(job.concurrency, 1)) as executor:
+            while job.limit is None or job.processed < job.limit:
+                if budget_state() == 'exceeded':
+                    raise BudgetExceeded('The daily AI budget has been spent; resume the job tomorrow.')
+                size = window if job.limit is None else min(window, job.limit - job.processed)
+                blogs = list(islice(pending_blogs(job.include_stale, job.last_blog_id), size))
+                if not blogs:
+                    break
+
+                started = time.monotonic()
+                results = list(executor.map(lambda blog: _summarize(blog, limiter), blogs))
+                for result, usage in results:
+                    job.processed += 1
+                    if result['status'] == 'success':
+                        job.succeeded += 1
+                    elif result['status'] != 'skipped':
+                        job.failed += 1
+                    job.cache_hits += bool(result.get('cache', {}).get('hit'))
+                    job.prompt_tokens += usage['prompt_tokens']
+                    job.completion_tokens += usage['completion_tokens']
+                job.last_blog_id = blogs[-1].id
+                job.elapsed_seconds += time.monotonic() - started
+                # Leave status alone so a cancellation made meanwhile is not overwritten.
+                job.save(update_fields=PROGRESS_FIELDS)
+                if progress:
+                    progress(job)
+
+                job.refresh_from_db(fields=['status'])
+                if job.status == AIBatchJob.Status.CANCELLED:
+                    return job
+    except Exception as e:
+        job.status = AIBatchJob.Status.FAILED
+        job.error = str(e)
+        job.save(update_fields=['status', 'error', 'updated_at'])
+        raise
+
+    job.status = AIBatchJob.Status.COMPLETED
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'finished_at', 'updated_at'])
+    return job
@@ -0,0 +1,67 @@
+"""
+Persistent cache of AI analysis results.
+
+Entries are keyed by a SHA-256 of the normalized post content, the model and
+AI_PROMPT_VERSION, so unchanged posts, re-runs and identical content in
+different posts are served without an API call. Bump AI_PROMPT_VERSION when
+prompts change, and purge old versions with `invalidate_ai_cache`.
+"""
+import hashlib
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AIResultCache
+
+# Per-call details that describe how a result was produced, not the result itself.
+VOLATILE_FIELDS = ('mode', 'map_reduce', 'usage', 'cache')
+
+
+def normalize_content(content):
+    """Normalize unicode and whitespace so cosmetic edits keep the same key."""
+    content = unicodedata.normalize('NFC', content or '')
+    return re.sub(r'\s+', ' ', content).strip()
+
+
+def cache_key(content, model, prompt_version=None):
+    prompt_version = prompt_version or settings.AI_PROMPT_VERSION
+    digest = hashlib.sha256()
+    for part in (model, prompt_version, normalize_content(content)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def get_cached_result(key):
+    """Return the cached result for `key` and count the hit, or None."""
+    entry = AIResultCache.objects.filter(key=key).only('result').first()
+    if entry is None:
+        return None
+    AIResultCache.objects.filter(pk=entry.pk).update(hits=F('hits') + 1, last_hit_at=timezone.now())
+    return entry.result
+
+
+def store_result(key, model, result):
+    """Store a successful analysis result."""
+    AIResultCache.objects.update_or_create(
+        key=key,
+        defaults={
+            'model': model,
+            'prompt_version': settings.AI_PROMPT_VERSION,
+            'result': {k: v for k, v in result.items() if k not in VOLATILE_FIELDS},
+        }
+    )
+
+
+def invalidate(prompt_version=None, keep_current=False):
+    """Delete cached results for one prompt version, or for all versions but the current one."""
+    entries = AIResultCache.objects.all()
+    if prompt_version:
+        entries = entries.filter(prompt_version=prompt_version)
+    if keep_current:
+        entries = entries.exclude(prompt_version=settings.AI_PROMPT_VERSION)
+    deleted, _ = entries.delete()
+    return deleted
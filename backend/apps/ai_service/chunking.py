@@ -0,0 +1,98 @@
+"""
+Token estimates and token-budgeted chunking of Markdown posts.
+
+The estimate is deliberately conservative (it over-counts relative to the
+GPT BPE tokenizers for English prose and code) so that a prompt budgeted with
+it never exceeds the model's real context window.
+"""
+import re
+
+TOKEN_RE = re.compile(r'\w+|[^\w\s]')
+HEADING_RE = re.compile(r'^#{1,6}\s')
+FENCE_RE = re.compile(r'^\s*(```|~~~)')
+PARAGRAPH_RE = re.compile(r'\n\s*\n')
+SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+
+# Chat format overhead per message (role and separators).
+MESSAGE_OVERHEAD = 4
+
+
+def estimate_tokens(text):
+    """Upper-bound token count: one per word or symbol, plus one per 8 characters of long words."""
+    return sum(1 + len(piece) // 8 for piece in TOKEN_RE.findall(text or ''))
+
+
+def estimate_messages_tokens(messages):
+    return sum(estimate_tokens(message['content']) + MESSAGE_OVERHEAD for message in messages) + 2
+
+
+def split_sections(content):
+    """Split Markdown into sections, each starting at a heading outside code fences."""
+    sections, current, in_fence = [], [], False
+    for line in content.splitlines():
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+        if not in_fence and HEADING_RE.match(line) and current:
+            sections.append('\n'.join(current).strip())
+            current = []
+        current.append(line)
+    if current:
+        sections.append('\n'.join(current).strip())
+    return [section for section in sections if section]
+
+
+def _split_oversized(text, max_tokens):
+    """Split text that exceeds the budget by paragraphs, then sentences, then words."""
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    for pattern, joiner in ((PARAGRAPH_RE, '\n\n'), (SENTENCE_RE, ' ')):
+        parts = [part for part in pattern.split(text) if part.strip()]
+        if len(parts) > 1:
+            return _pack(
+                [piece for part in parts for piece in _split_oversized(part, max_tokens)],
+                max_tokens, joiner
+            )
+    words = [
+        piece
+        for word in text.split()
+        for piece in (_split_word(word, max_tokens) if estimate_tokens(word) > max_tokens else [word])
+    ]
+    return _pack(words, max_tokens, ' ')
+
+
+def _split_word(word, max_tokens):
+    """Split a single word that exceeds the budget by characters."""
+    # A run of word characters costs 1 + len // 8 tokens, so runs of this length fit the budget.
+    size = max(1, (max_tokens - 1) * 8)
+    pieces = [
+        token[start:start + size]
+        for token in TOKEN_RE.findall(word)
+        for start in range(0, len(token), size)
+    ]
+    # Joined without separators, adjacent runs merge, which never costs more than the sum.
+    return _pack(pieces, max_tokens, '')
+
+
+def _pack(pieces, max_tokens, joiner):
+    """Greedily merge consecutive pieces while they fit the budget."""
+    chunks, current, current_tokens = [], [], 0
+    for piece in pieces:
+        tokens = estimate_tokens(piece)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(joiner.join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        chunks.append(joiner.join(current))
+    return chunks
+
+
+def split_markdown(content, max_tokens):
+    """Split a Markdown post into chunks of at most `max_tokens`, preferring heading boundaries."""
+    pieces = [
+        piece
+        for section in split_sections(content)
+        for piece in _split_oversized(section, max_tokens)
+    ]
+    return _pack(pieces, max_tokens, '\n\n')
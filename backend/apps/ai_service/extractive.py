@@ -0,0 +1,232 @@
+"""
+Offline extractive analysis: TextRank summaries, key points and lexicon sentiment.
+
+Sentences are ranked with PageRank over a cosine-similarity graph of their
+TF-IDF vectors. The summary is the top-ranked sentences in document order,
+preferring complete sentences over list items;
+key points are picked by maximal marginal relevance so they do not repeat
+each other. Everything runs locally with NumPy in a few milliseconds per post.
+"""
+import re
+
+import numpy as np
+
+from .chunking import SENTENCE_RE
+
+LOCAL_MODEL = 'local-textrank'
+
+MAX_SENTENCES = 400
+MIN_SENTENCE_WORDS = 4
+PROSE_MIN_WORDS = 6
+KEY_POINT_WORDS = 30
+DAMPING = 0.85
+
+CODE_BLOCK_RE = re.compile(r'```.*?```|~~~.*?~~~', re.S)
+IMAGE_RE = re.compile(r'!\[[^\]]*\]\([^)]*\)')
+LINK_RE = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+HTML_RE = re.compile(r'<[^>]+>')
+EMPHASIS_RE = re.compile(r'[*_`]{1,3}')
+HEADING_RE = re.compile(r'^\s{0,3}#{1,6}\s')
+LIST_MARKER_RE = re.compile(r'^\s*(?:[-*+]|\d+[.)])\s+')
+WORD_RE = re.compile(r"[a-z][a-z']+")
+LEADING_SYMBOLS_RE = re.compile(r'^[^\w"\'(]+')
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have having
+he her here hers herself him himself his how i if in into is it its itself just let me more most my myself
+no nor not now of off on once only or other our ours ourselves out over own same she should so some such
+than that the their theirs them themselves then there these they this those through to too under until up
+very was we were what when where which while who whom why will with would you your yours yourself
+yourselves one two also get got may might must shall us use used using like make made many much well
+""".split())
+
+POSITIVE = frozenset("""
+good great excellent amazing awesome best better love loved lovely enjoy enjoyed enjoyable happy
+glad pleased success successful win wins won benefit benefits beneficial improve improved improvement
+improves effective efficient easy easier fast faster powerful reliable robust secure safe clean elegant
+simple helpful useful valuable impressive innovative exciting excited fantastic wonderful brilliant
+perfect positive strong smooth gain gains growth opportunity opportunities recommend recommended
+solved solve solves progress thrive thriving boost boosts celebrate favorite favourite superior
+""".split())
+
+NEGATIVE = frozenset("""
+bad worse worst poor terrible awful horrible hate hated dislike sad angry annoying annoyed fail failed
+failure fails failing problem problems issue issues bug bugs broken break breaks crash crashes crashed
+slow slower difficult hard painful pain risk risky danger dangerous insecure vulnerable vulnerability
+error errors wrong mistake mistakes loss lose losing lost weak fragile complex complicated confusing
+expensive costly waste wasted frustrating frustrated negative decline declining threat threats unfortunately
+concern concerns worry worried harmful damage damaged outage bottleneck leak leaks regression
+""".split())
+
+NEGATIONS = frozenset("not no never none cannot without hardly n't isn't aren't wasn't don't doesn't didn't won't".split())
+
+
+def _stem(word):
+    for suffix in ('ing', 'ed', 'es', 's'):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def clean_markdown(content):
+    """Strip code, images, link targets, HTML and emphasis; drop headings."""
+    content = CODE_BLOCK_RE.sub(' ', content or '')
+    content = IMAGE_RE.sub(' ', content)
+    content = LINK_RE.sub(r'\1', content)
+    content = HTML_RE.sub(' ', content)
+    lines = []
+    for line in content.splitlines():
+        if HEADING_RE.match(line):
+            lines.append('')
+            continue
+        # List items are sentences of their own.
+        if LIST_MARKER_RE.match(line):
+            lines.extend(['', LIST_MARKER_RE.sub('', line), ''])
+            continue
+        lines.append(line)
+    return EMPHASIS_RE.sub('', '\n'.join(lines))
+
+
+def _join_lines(paragraph):
+    """Join wrapped prose lines, but keep lines that look like separate items apart."""
+    lines = [line.strip() for line in paragraph.splitlines() if line.strip()]
+    text = lines[0] if lines else ''
+    for previous, line in zip(lines, lines[1:]):
+        wrapped = re.search(r'[a-z,;]$', previous) and not re.match(r'[A-Z0-9]', line)
+        text += (' ' if wrapped else '\n') + line
+    return text
+
+
+def split_sentences(content):
+    """Candidate sentences from Markdown content, in document order.
+
+    Lead-ins ending in a colon, repeats and fragments under MIN_SENTENCE_WORDS are skipped.
+    """
+    sentences, seen = [], set()
+    for paragraph in re.split(r'\n\s*\n', clean_markdown(content)):
+        for line in _join_lines(paragraph).split('\n'):
+            for sentence in SENTENCE_RE.split(line):
+                sentence = LEADING_SYMBOLS_RE.sub('', sentence).strip()
+                if len(sentence.split()) < MIN_SENTENCE_WORDS or sentence.endswith(':') or sentence in seen:
+                    continue
+                seen.add(sentence)
+                sentences.append(sentence)
+                if len(sentences) >= MAX_SENTENCES:
+                    return sentences
+    return sentences
+
+
+def is_prose(sentence):
+    """Complete sentences (as opposed to list items, labels and table rows)."""
+    return len(sentence.split()) >= PROSE_MIN_WORDS and sentence[-1] in '.!?'
+
+
+def _terms(sentence):
+    return [_stem(word) for word in WORD_RE.findall(sentence.lower()) if word not in STOPWORDS]
+
+
+def tfidf_matrix(sentences):
+    """L2-normalized sublinear TF-IDF rows, one per sentence."""
+    vocabulary, rows = {}, []
+    for sentence in sentences:
+        counts = {}
+        for term in _terms(sentence):
+            index = vocabulary.setdefault(term, len(vocabulary))
+            counts[index] = counts.get(index, 0) + 1
+        rows.append(counts)
+
+    matrix = np.zeros((len(sentences), max(len(vocabulary), 1)), dtype=np.float32)
+    for i, counts in enumerate(rows):
+        if counts:
+            matrix[i, list(counts)] = 1 + np.log(np.fromiter(counts.values(), dtype=np.float32))
+    document_frequency = np.count_nonzero(matrix, axis=0)
+    matrix *= np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def textrank(similarity, damping=DAMPING, tolerance=1e-6, max_iterations=100):
+    """PageRank scores over a weighted, undirected similarity graph."""
+    n = similarity.shape[0]
+    weights = similarity.copy()
+    np.fill_diagonal(weights, 0)
+    row_sums = weights.sum(axis=1, keepdims=True)
+    # Sentences with no similar neighbour link uniformly to all others.
+    transition = np.where(row_sums > 0, weights / np.where(row_sums == 0, 1, row_sums), 1.0 / n)
+    scores = np.full(n, 1.0 / n)
+    for _ in range(max_iterations):
+        updated = (1 - damping) / n + damping * transition.T @ scores
+        if np.abs(updated - scores).sum() < tolerance:
+            return updated
+        scores = updated
+    return scores
+
+
+def _shorten(sentence, max_words=KEY_POINT_WORDS):
+    words = sentence.split()
+    return sentence if len(words) <= max_words else ' '.join(words[:max_words]) + '…'
+
+
+def select_key_points(sentences, scores, similarity, count, diversity=0.3):
+    """Pick high-ranking sentences by maximal marginal relevance."""
+    relevance = scores / scores.max()
+    selected = []
+    candidates = list(np.argsort(-scores))
+    while candidates and len(selected) < count:
+        if selected:
+            redundancy = similarity[np.ix_(candidates, selected)].max(axis=1)
+            mmr = (1 - diversity) * relevance[candidates] - diversity * redundancy
+            best = candidates[int(np.argmax(mmr))]
+        else:
+            best = candidates[0]
+        selected.append(best)
+        candidates.remove(best)
+    return [_shorten(sentences[i]) for i in selected]
+
+
+def analyze_sentiment(content):
+    """Lexicon sentiment with simple negation handling: positive, negative or neutral."""
+    words = WORD_RE.findall(clean_markdown(content).lower())
+    positive = negative = 0
+    negate_until = -1
+    for i, word in enumerate(words):
+        if word in NEGATIONS or word.endswith("n't"):
+            negate_until = i + 3
+            continue
+        polarity = 1 if word in POSITIVE else -1 if word in NEGATIVE else 0
+        if i <= negate_until:
+            polarity = -polarity
+        if polarity > 0:
+            positive += 1
+        elif polarity < 0:
+            negative += 1
+    if positive + negative < 2:
+        return 'neutral'
+    score = (positive - negative) / (positive + negative)
+    return 'positive' if score > 0.2 else 'negative' if score < -0.2 else 'neutral'
+
+
+def analyze(content, max_sentences=3, num_points=5):
+    """Summary, key points and sentiment for a post, computed offline."""
+    sentences = split_sentences(content)
+    sentiment = analyze_sentiment(content)
+    if len(sentences) <= 1:
+        text = sentences[0] if sentences else ' '.join(clean_markdown(content).split())
+        return {'summary': text, 'key_points': [_shorten(text)] if text else [], 'sentiment': sentiment}
+
+    matrix = tfidf_matrix(sentences)
+    similarity = matrix @ matrix.T
+    scores = textrank(similarity)
+    # List items help rank the prose around them, but the summary reads better without them.
+    prose = np.array([is_prose(sentence) for sentence in sentences])
+    ranked = np.argsort(-(scores + prose * scores.max()))
+    top = sorted(ranked[:max_sentences])
+    return {
+        'summary': ' '.join(sentences[i] for i in top),
+        'key_points': select_key_points(
+            sentences, scores + prose * scores.max() * 0.5, similarity, min(num_points, len(sentences))
+        ),
+        'sentiment': sentiment,
+    }
+
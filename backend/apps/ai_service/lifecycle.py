@@ -0,0 +1,140 @@
+"""
+AITask lifecycle: progress reporting, retention and the status overview.
+
+Finished tasks older than AI_TASK_RETENTION_DAYS are moved into the compact
+AITaskArchive table (no summary text, which lives on BlogSummary) in batches,
+each archived and deleted in its own transaction so the job never holds long
+locks and can be interrupted and re-run.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AITask, AITaskArchive
+
+# Percent reached when each step starts.
+STEP_PROGRESS = {
+    'queued': 0,
+    'started': 5,
+    'condensing': 10,
+    'analyzing': 60,
+    'saving': 95,
+    'completed': 100,
+}
+
+
+class TaskProgress:
+    """Records an AITask's step and percent done, and publishes them to its stream.
+
+    Progress never goes backwards, and database writes are skipped unless the
+    step changes or the percentage moves by at least MIN_DELTA. Every write
+    also bumps updated_at, so long tasks are not mistaken for abandoned ones.
+    """
+
+    MIN_DELTA = 5
+
+    def __init__(self, task, stream=None):
+        self.task = task
+        self.stream = stream
+
+    def __call__(self, step, progress=None):
+        if progress is None:
+            progress = STEP_PROGRESS.get(step, self.task.progress)
+        progress = max(self.task.progress, min(int(progress), 100))
+        if step == self.task.step and progress - self.task.progress < self.MIN_DELTA:
+            return
+        self.task.step, self.task.progress = step, progress
+        AITask.objects.filter(pk=self.task.pk).update(step=step, progress=progress, updated_at=timezone.now())
+        if self.stream:
+            self.stream.progress(step, progress)
+
+
+def _archive_entry(task):
+    result = task['result'] or {}
+    usage = result.get('usage') or {}
+    duration = task['completed_at'] - task['created_at'] if task['completed_at'] else None
+    return AITaskArchive(
+        task_id=task['id'],
+        blog_id=task['blog_id'],
+        task_type=task['task_type'],
+        status=task['status'],
+        mode=result.get('mode') or '',
+        model=task['model'],
+        # Tasks finished before usage accounting only have their totals in the result.
+        prompt_tokens=task['prompt_tokens'] or usage.get('prompt_tokens', 0),
+        completion_tokens=task['completion_tokens'] or usage.get('completion_tokens', 0),
+        latency_ms=task['latency_ms'],
+        cost=task['cost'],
+        duration_seconds=duration.total_seconds() if duration else None,
+        error=task['error'][:255],
+        created_at=task['created_at'],
+        completed_at=task['completed_at'],
+    )
+
+
+def archive_tasks(retention_days=None, batch_size=None):
+    """Archive and delete finished tasks older than the retention window; return how many."""
+    if retention_days is None:
+        retention_days = settings.AI_TASK_RETENTION_DAYS
+    batch_size = batch_size or settings.AI_TASK_ARCHIVE_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    expired = (
+        AITask.objects
+        .filter(status__in=AITask.FINISHED_STATUSES, completed_at__lt=cutoff)
+        .order_by('completed_at')
+        .values(
+            'id', 'blog_id', 'task_type', 'status', 'result', 'error', 'created_at', 'completed_at',
+            'model', 'prompt_tokens', 'completion_tokens', 'latency_ms', 'cost',
+        )
+    )
+
+    archived = 0
+    while True:
+        with transaction.atomic():
+            batch = list(expired[:batch_size])
+            if not batch:
+                break
+            # ignore_conflicts: rows archived by an interrupted earlier run are just deleted.
+            AITaskArchive.objects.bulk_create([_archive_entry(task) for task in batch], ignore_conflicts=True)
+            AITask.objects.filter(id__in=[task['id'] for task in batch]).delete()
+        archived += len(batch)
+        if len(batch) < batch_size:
+            break
+    return archived
+
+
+def task_overview():
+    """Task counts by status, the oldest pending task and tasks currently processing.
+
+    Finished tasks are counted over the retention window only, on the
+    (status, completed_at) index; active ones on the (status, created_at)
+    index. Each query is an index range scan of one status, so finished
+    tasks that archiving has not moved yet do not make the overview slower.
+    """
+    now = timezone.now()
+    finished_since = now - timedelta(days=settings.AI_TASK_RETENTION_DAYS)
+    counts = {status: AITask.objects.filter(status=status).count() for status in AITask.ACTIVE_STATUSES}
+    counts.update({
+        status: AITask.objects.filter(status=status, completed_at__gte=finished_since).count()
+        for status in AITask.FINISHED_STATUSES
+    })
+    oldest_pending = (
+        AITask.objects.filter(status=AITask.Status.PENDING)
+        .order_by('created_at').values_list('created_at', flat=True).first()
+    )
+    processing = list(
+        AITask.objects.filter(status=AITask.Status.PROCESSING)
+        .order_by('-created_at')
+        .values('id', 'blog_id', 'task_type', 'step', 'progress', 'created_at', 'updated_at')[:20]
+    )
+    stalled_before = now - timedelta(seconds=settings.AI_TASK_DEDUP_TIMEOUT)
+    return {
+        'counts': {status: counts[status] for status in AITask.Status.values},
+        'oldest_pending_at': oldest_pending,
+        'oldest_pending_age_seconds': (now - oldest_pending).total_seconds() if oldest_pending else None,
+        'stalled': AITask.objects.filter(status=AITask.Status.PROCESSING, updated_at__lt=stalled_before).count(),
+        'processing': processing,
+        'retention_days': settings.AI_TASK_RETENTION_DAYS,
+    }
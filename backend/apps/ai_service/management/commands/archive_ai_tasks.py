@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.ai_service.lifecycle import archive_tasks
+
+
+class Command(BaseCommand):
+    help = 'Move finished AI tasks past the retention window into the AI task archive.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.AI_TASK_RETENTION_DAYS,
+            help='Archive tasks finished more than this many days ago.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.AI_TASK_ARCHIVE_BATCH_SIZE,
+            help='Tasks archived and deleted per transaction.'
+        )
+
+    def handle(self, *args, **options):
+        archived = archive_tasks(options['days'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} AI tasks"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.ai_service.cache import invalidate
+
+
+class Command(BaseCommand):
+    help = 'Delete cached AI analysis results by prompt version.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prompt-version', help='Delete results produced with this prompt version.')
+        parser.add_argument(
+            '--stale', action='store_true',
+            help='Delete results from every prompt version except the current AI_PROMPT_VERSION.'
+        )
+        parser.add_argument('--all', action='store_true', help='Delete every cached result.')
+
+    def handle(self, *args, **options):
+        if not (options['prompt_version'] or options['stale'] or options['all']):
+            raise CommandError('Pass --prompt-version, --stale or --all.')
+        deleted = invalidate(options['prompt_version'], keep_current=options['stale'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} cached results"))
@@ -0,0 +1,47 @@
+import threading
+
+from django.core.management.base import BaseCommand
+
+from apps.ai_service.mock_server import start_server
+
+
+class Command(BaseCommand):
+    help = 'Serve a local mock of the OpenAI chat-completions API with latency and fault injection.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8900)
+        parser.add_argument('--latency-ms', type=float, default=300, help='Fixed latency per request.')
+        parser.add_argument('--jitter-ms', type=float, default=0, help='Random extra latency, up to this much.')
+        parser.add_argument('--token-ms', type=float, default=5, help='Extra latency per completion token.')
+        parser.add_argument('--malformed-rate', type=float, default=0.0,
+                            help='Fraction of JSON-mode replies that are truncated.')
+        parser.add_argument('--rate-limit-rate', type=float, default=0.0,
+                            help='Fraction of requests answered with 429.')
+        parser.add_argument('--retry-after', type=float, default=1, help='Retry-After seconds sent with 429s.')
+        parser.add_argument('--error-rate', type=float, default=0.0,
+                            help='Fraction of requests answered with 500.')
+        parser.add_argument('--hang-rate', type=float, default=0.0,
+                            help='Fraction of requests that never answer (client timeout).')
+        parser.add_argument('--hang-seconds', type=float, default=120, help='How long a hung request stalls.')
+
+    def handle(self, *args, **options):
+        server = start_server(
+            options['port'], options['host'],
+            latency_ms=options['latency_ms'],
+            jitter_ms=options['jitter_ms'],
+            token_ms=options['token_ms'],
+            malformed_rate=options['malformed_rate'],
+            rate_limit_rate=options['rate_limit_rate'],
+            retry_after=options['retry_after'],
+            error_rate=options['error_rate'],
+            hang_rate=options['hang_rate'],
+            hang_seconds=options['hang_seconds'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Mock AI server on http://{options['host']}:{server.server_port}/v1 (stats at /stats)"
+        ))
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.ai_service.batch import pending_blogs, run_batch_job
+from apps.ai_service.models import AIBatchJob
+from apps.ai_service.tasks import run_summary_batch_task
+
+
+class Command(BaseCommand):
+    help = 'Summarize published blogs that have no summary or a stale one, as a resumable batch job.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--rpm', type=int, help='Maximum API requests per minute.')
+        parser.add_argument('--tpm', type=int, help='Maximum API tokens per minute (prompt + max reply).')
+        parser.add_argument('--limit', type=int, help='Stop after this many blogs.')
+        parser.add_argument('--missing-only', action='store_true', help='Skip blogs whose summary is stale.')
+        parser.add_argument('--resume', type=int, metavar='JOB_ID', help='Resume an unfinished job.')
+        parser.add_argument(
+            '--sync', action='store_true',
+            help='Run in this process instead of queueing a Celery task.'
+        )
+
+    def handle(self, *args, **options):
+        if options['resume']:
+            try:
+                job = AIBatchJob.objects.get(id=options['resume'])
+            except AIBatchJob.DoesNotExist:
+                raise CommandError(f"Batch job {options['resume']} not found.")
+        else:
+            job = AIBatchJob.objects.create(
+                include_stale=not options['missing_only'],
+                concurrency=options['concurrency'],
+                requests_per_minute=options['rpm'],
+                tokens_per_minute=options['tpm'],
+                limit=options['limit']
+            )
+        pending = sum(1 for _ in pending_blogs(job.include_stale, job.last_blog_id))
+        self.stdout.write(f"Batch job {job.id}: {pending} blogs to summarize")
+
+        if not options['sync']:
+            result = run_summary_batch_task.delay(job.id)
+            self.stdout.write(f"Queued as task {result.id}; resume with --resume {job.id}")
+            return
+
+        job = run_batch_job(job, progress=self._report)
+        self.stdout.write(self.style.SUCCESS(
+            f"Job {job.id} {job.status}: {job.succeeded} succeeded, {job.failed} failed, "
+            f"{job.processed - job.succeeded - job.failed} skipped (in progress elsewhere), "
+            f"{job.cache_hits} cache hits, {job.prompt_tokens + job.completion_tokens} tokens, "
+            f"{job.throughput_per_minute} blogs/min"
+        ))
+
+    def _report(self, job):
+        tokens_per_minute = (job.prompt_tokens + job.completion_tokens) * 60 / job.elapsed_seconds
+        self.stdout.write(
+            f"  {job.processed} processed (last id {job.last_blog_id}), "
+            f"{job.throughput_per_minute} blogs/min, {tokens_per_minute:.0f} tokens/min"
+        )
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:10
+
+from django.db import migrations, models
+from django.db.models import Max
+from django.utils import timezone
+
+
+def fail_duplicate_active_tasks(apps, schema_editor):
+    """Keep only the newest pending/processing task per blog and type, so the constraint can be added."""
+    AITask = apps.get_model('ai_service', 'AITask')
+    active = AITask.objects.filter(status__in=['pending', 'processing'])
+    newest = active.values('blog', 'task_type').annotate(newest=Max('id')).values_list('newest', flat=True)
+    active.exclude(id__in=list(newest)).update(
+        status='failed',
+        error='Superseded by a newer task for the same blog.',
+        completed_at=timezone.now()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_service', '0004_ai_batch_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aitask',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.RunPython(fail_duplicate_active_tasks, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='aitask',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'processing'])), fields=('blog', 'task_type', 'content_hash'), name='unique_active_ai_task'),
+        ),
+    ]
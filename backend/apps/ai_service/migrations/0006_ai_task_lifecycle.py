@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_service', '0005_ai_task_dedup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AITaskArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField(unique=True)),
+                ('blog_id', models.BigIntegerField(db_index=True)),
+                ('task_type', models.CharField(max_length=50)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed')], max_length=20)),
+                ('mode', models.CharField(blank=True, max_length=30)),
+                ('prompt_tokens', models.PositiveIntegerField(default=0)),
+                ('completion_tokens', models.PositiveIntegerField(default=0)),
+                ('duration_seconds', models.FloatField(blank=True, null=True)),
+                ('error', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField()),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'AI Task Archive Entry',
+                'verbose_name_plural': 'AI Task Archive',
+                'ordering': ['-completed_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='aitask',
+            name='progress',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='aitask',
+            name='step',
+            field=models.CharField(blank=True, max_length=30),
+        ),
+        migrations.AddIndex(
+            model_name='aitask',
+            index=models.Index(fields=['status', 'completed_at'], name='ai_service__status_5c52f8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aitaskarchive',
+            index=models.Index(fields=['status', 'completed_at'], name='ai_service__status_b696ab_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_service', '0007_usage_accounting'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aitaskarchive',
+            name='cost',
+            field=models.DecimalField(decimal_places=6, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='aitaskarchive',
+            name='latency_ms',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='aitaskarchive',
+            name='model',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
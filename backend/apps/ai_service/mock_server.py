@@ -0,0 +1,227 @@
+"""
+Local stand-in for the OpenAI chat-completions endpoint, for development and load tests.
+
+Replies are derived from the prompt so AIService gets well-formed answers:
+a JSON object for combined analysis requests, a JSON array for key points,
+one word for sentiment and the leading sentences for summaries. Latency is
+modelled as a fixed per-request cost (plus random jitter) and a
+per-completion-token cost, and usage is reported with a ~4 characters per
+token estimate. Requests with "stream": true are answered as server-sent
+events, one chunk per ~4 characters, paced by the per-token latency.
+
+Faults can be injected per request: 429 with Retry-After, 500, a hang longer
+than the client timeout, and truncated JSON in JSON-mode replies.
+GET /stats reports connections accepted and requests served by status, which
+shows whether clients reuse keep-alive connections.
+
+    python manage.py run_mock_ai_server --port 8900 --latency-ms 300 --error-rate 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8900/v1 python manage.py ...
+"""
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+
+def _sentences(text):
+    return [s.strip() for s in re.split(r'(?<=[.!?])\s+', text) if s.strip()]
+
+
+def _post_body(prompt):
+    return prompt.split('\n\n', 1)[1] if '\n\n' in prompt else prompt
+
+
+def _pieces(text, size=4):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def build_reply(messages, response_format, malformed_rate=0.0):
+    """Return a plausible reply for a chat request."""
+    system = messages[0]['content'] if messages and messages[0]['role'] == 'system' else ''
+    prompt = messages[-1]['content'] if messages else ''
+    sentences = _sentences(_post_body(prompt)) or ['Empty post.']
+
+    if (response_format or {}).get('type') == 'json_object':
+        if random.random() < malformed_rate:
+            return '{"summary": "' + sentences[0][:40]
+        return json.dumps({
+            'summary': ' '.join(sentences[:3]),
+            'key_points': sentences[:5],
+            'sentiment': 'positive',
+        })
+    if 'key points' in system:
+        return json.dumps(sentences[:5])
+    if 'sentiment' in system.lower():
+        return 'positive'
+    return ' '.join(sentences[:3])
+
+
+class MockAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Load tests open dozens of connections at once; the default backlog of 5 drops some.
+    request_queue_size = 128
+
+    def __init__(self, address, handler, **faults):
+        super().__init__(address, handler)
+        self.latency = faults.get('latency_ms', 0) / 1000
+        self.jitter = faults.get('jitter_ms', 0) / 1000
+        self.token_latency = faults.get('token_ms', 0) / 1000
+        self.malformed_rate = faults.get('malformed_rate', 0.0)
+        self.rate_limit_rate = faults.get('rate_limit_rate', 0.0)
+        self.retry_after = faults.get('retry_after', 1)
+        self.error_rate = faults.get('error_rate', 0.0)
+        self.hang_rate = faults.get('hang_rate', 0.0)
+        self.hang_seconds = faults.get('hang_seconds', 120)
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+
+    def count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def snapshot(self):
+        with self._stats_lock:
+            return dict(self.stats)
+
+
+class MockAIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; with Nagle on, kept-alive
+    # connections stall on the client's delayed ACK.
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        # One handler instance per TCP connection; its requests share it while kept alive.
+        super().setup()
+        self.server.count('connections')
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count(f'status_{status}')
+
+    def _send_error(self, status, message, error_type, headers=None):
+        self._send_json(status, {'error': {'message': message, 'type': error_type}}, headers)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/stats':
+            body = json.dumps(self.server.snapshot()).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self._send_error(404, 'Not found', 'invalid_request_error')
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_error(404, 'Not found', 'invalid_request_error')
+            return
+        server.count('requests')
+
+        roll = random.random()
+        if roll < server.rate_limit_rate:
+            self._send_error(429, 'Rate limit reached', 'requests', {'Retry-After': str(server.retry_after)})
+            return
+        roll -= server.rate_limit_rate
+        if roll < server.error_rate:
+            self._send_error(500, 'The server had an error while processing your request.', 'server_error')
+            return
+        roll -= server.error_rate
+        if roll < server.hang_rate:
+            # Outlast the client's read timeout, then drop the connection.
+            time.sleep(server.hang_seconds)
+            self.close_connection = True
+            server.count('hangs')
+            return
+
+        messages = request.get('messages', [])
+        reply = build_reply(messages, request.get('response_format'), server.malformed_rate)
+        if request.get('stream'):
+            self._stream_reply(request, reply)
+            return
+        prompt_tokens = sum(estimate_tokens(m.get('content') or '') for m in messages)
+        completion_tokens = estimate_tokens(reply)
+        time.sleep(server.latency + random.uniform(0, server.jitter) + completion_tokens * server.token_latency)
+
+        self._send_json(200, {
+            'id': f'chatcmpl-{uuid.uuid4().hex}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'mock'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': reply},
+                'finish_reason': 'stop',
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        })
+
+    def _stream_reply(self, request, reply):
+        """Send the reply as chat.completion.chunk events over chunked transfer encoding."""
+        server = self.server
+        chunk_id, created = f'chatcmpl-{uuid.uuid4().hex}', int(time.time())
+
+        def event(delta, finish_reason=None):
+            payload = {
+                'id': chunk_id,
+                'object': 'chat.completion.chunk',
+                'created': created,
+                'model': request.get('model', 'mock'),
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+            }
+            return f'data: {json.dumps(payload)}\n\n'
+
+        def write(data):
+            body = data.encode()
+            self.wfile.write(f'{len(body):x}\r\n'.encode() + body + b'\r\n')
+
+        time.sleep(server.latency + random.uniform(0, server.jitter))
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        write(event({'role': 'assistant', 'content': ''}))
+        for piece in _pieces(reply):
+            time.sleep(server.token_latency)
+            write(event({'content': piece}))
+        write(event({}, 'stop'))
+        write('data: [DONE]\n\n')
+        self.wfile.write(b'0\r\n\r\n')
+        server.count('status_200')
+
+
+def start_server(port=0, host='127.0.0.1', **faults):
+    """Start the mock server in a daemon thread and return it; base URL is f'http://{host}:{port}/v1'.
+
+    Faults: latency_ms, jitter_ms, token_ms, malformed_rate, rate_limit_rate,
+    retry_after, error_rate, hang_rate and hang_seconds.
+    """
+    server = MockAIServer((host, port), MockAIHandler, **faults)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -1,5 +1,6 @@
 from django.db import models
 from apps.blogs.models import Blog
+from apps.users.models import User
 
 class AITask(models.Model):
     """Track AI processing tasks."""
@@ -13,18 +14,159 @@ class AITask(models.Model):
     blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='ai_tasks')
     task_type = models.CharField(max_length=50)  # summarization, sentiment_analysis, etc.
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    # Result cache key of the content being processed; one active task per blog and content version.
+    content_hash = models.CharField(max_length=64, blank=True)
     result = models.JSONField(null=True, blank=True)
     error = models.TextField(blank=True)
+    # Current step (queued, condensing, analyzing, saving, ...) and percent done.
+    step = models.CharField(max_length=30, blank=True)
+    progress = models.PositiveSmallIntegerField(default=0)
+    # Provider calls made (operation, model, tokens, latency_ms, cost) and their totals.
+    calls = models.JSONField(default=list, blank=True)
+    model = models.CharField(max_length=100, blank=True)
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    completion_tokens = models.PositiveIntegerField(default=0)
+    latency_ms = models.PositiveIntegerField(default=0)
+    cost = models.DecimalField(max_digits=12, decimal_places=6, default=0)  # USD
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     
+    ACTIVE_STATUSES = [Status.PENDING, Status.PROCESSING]
+    FINISHED_STATUSES = [Status.COMPLETED, Status.FAILED]
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['blog', 'status']),
             models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['status', 'completed_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['blog', 'task_type', 'content_hash'],
+                condition=models.Q(status__in=['pending', 'processing']),
+                name='unique_active_ai_task'
+            ),
         ]
     
     def __str__(self):
         return f"{self.task_type} for {self.blog.title}"
+
+
+class AITaskArchive(models.Model):
+    """Compact record of a finished AITask, kept after the task row is deleted."""
+    task_id = models.BigIntegerField(unique=True)
+    # Plain ids rather than foreign keys: archives outlive deleted blogs.
+    blog_id = models.BigIntegerField(db_index=True)
+    task_type = models.CharField(max_length=50)
+    status = models.CharField(max_length=20, choices=AITask.Status.choices)
+    mode = models.CharField(max_length=30, blank=True)
+    model = models.CharField(max_length=100, blank=True)
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    completion_tokens = models.PositiveIntegerField(default=0)
+    latency_ms = models.PositiveIntegerField(default=0)
+    cost = models.DecimalField(max_digits=12, decimal_places=6, default=0)  # USD
+    duration_seconds = models.FloatField(null=True, blank=True)
+    error = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField()
+    completed_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-completed_at']
+        verbose_name = 'AI Task Archive Entry'
+        verbose_name_plural = 'AI Task Archive'
+        indexes = [
+            models.Index(fields=['status', 'completed_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.task_type} task {self.task_id} ({self.status})"
+
+
+class AIUsageDaily(models.Model):
+    """Provider calls, tokens, latency and spend per day, author, operation and model."""
+    date = models.DateField()
+    author = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    operation = models.CharField(max_length=30)
+    model = models.CharField(max_length=100)
+    calls = models.PositiveIntegerField(default=0)
+    prompt_tokens = models.PositiveBigIntegerField(default=0)
+    completion_tokens = models.PositiveBigIntegerField(default=0)
+    latency_ms = models.PositiveBigIntegerField(default=0)
+    cost = models.DecimalField(max_digits=14, decimal_places=6, default=0)  # USD
+
+    class Meta:
+        ordering = ['-date']
+        verbose_name = 'AI Usage (Daily)'
+        verbose_name_plural = 'AI Usage (Daily)'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'author', 'operation', 'model'], name='unique_ai_usage_daily'),
+        ]
+        indexes = [
+            models.Index(fields=['author', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.operation} {self.model}"
+
+
+class AIResultCache(models.Model):
+    """AI analysis results keyed by a hash of (normalized content, model, prompt version)."""
+    key = models.CharField(max_length=64, unique=True)
+    model = models.CharField(max_length=100)
+    prompt_version = models.CharField(max_length=20, db_index=True)
+    result = models.JSONField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_hit_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'AI Result Cache Entry'
+        verbose_name_plural = 'AI Result Cache'
+
+    def __str__(self):
+        return f"{self.model} v{self.prompt_version} {self.key[:12]}"
+
+
+class AIBatchJob(models.Model):
+    """A resumable batch summarization run over the blog corpus."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        COMPLETED = 'completed', 'Completed'
+        FAILED = 'failed', 'Failed'
+        CANCELLED = 'cancelled', 'Cancelled'
+
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    include_stale = models.BooleanField(default=True)  # also redo summaries of changed content
+    concurrency = models.PositiveSmallIntegerField(default=4)
+    requests_per_minute = models.PositiveIntegerField(null=True, blank=True)
+    tokens_per_minute = models.PositiveIntegerField(null=True, blank=True)
+    limit = models.PositiveIntegerField(null=True, blank=True)
+    # Checkpoint: every selected blog with id <= last_blog_id has been attempted.
+    last_blog_id = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    succeeded = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    cache_hits = models.PositiveIntegerField(default=0)
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    completion_tokens = models.PositiveIntegerField(default=0)
+    elapsed_seconds = models.FloatField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Batch job {self.id} ({self.status})"
+
+    @property
+    def throughput_per_minute(self):
+        """Blogs processed per minute of run time."""
+        return round(self.processed * 60 / self.elapsed_seconds, 1) if self.elapsed_seconds else None
@@ -0,0 +1,225 @@
+"""
+Chat-completion providers for AIService.
+
+A provider turns chat messages into a Completion. AI_PROVIDER names the class
+to use; OpenAIProvider speaks the OpenAI chat-completions protocol, so it also
+serves compatible endpoints and the bundled mock server
+(apps.ai_service.mock_server) through OPENAI_BASE_URL.
+
+Each process keeps one provider with one pooled, keep-alive async HTTP client
+on a dedicated event-loop thread. Synchronous callers (Celery tasks, worker
+threads) submit requests to that loop, so concurrent requests share
+connections instead of opening one per call. Streamed completions hand
+their text deltas back to the calling thread as they arrive.
+"""
+import asyncio
+import os
+import queue
+import threading
+from dataclasses import dataclass
+
+import httpx
+import openai
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .chunking import estimate_messages_tokens, estimate_tokens
+
+# Operations that can be given their own model and timeout (AI_MODELS / AI_TIMEOUTS).
+OPERATIONS = ('analysis', 'summary', 'key_points', 'sentiment', 'chunk_summary')
+
+
+@dataclass
+class Completion:
+    text: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class _LoopThread:
+    """An asyncio event loop running forever in a daemon thread."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='ai-provider-loop', daemon=True)
+        self.thread.start()
+
+    def submit(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+
+class ChatProvider:
+    """Base class for chat-completion providers; subclasses implement acomplete."""
+
+    # Exceptions AIService retries with backoff.
+    retryable_errors = ()
+
+    def __init__(self):
+        self._loop_thread = None
+        self._loop_lock = threading.Lock()
+
+    @property
+    def configured(self):
+        """Whether the provider has what it needs (e.g. credentials) to send requests."""
+        return True
+
+    def model_for(self, operation):
+        return settings.AI_MODELS.get(operation) or settings.OPENAI_MODEL
+
+    def timeout_for(self, operation):
+        return settings.AI_TIMEOUTS.get(operation) or settings.OPENAI_TIMEOUT
+
+    def retry_after(self, error):
+        """Seconds the provider asked us to wait before retrying `error`, if known."""
+        return None
+
+    async def acomplete(self, messages, operation, temperature, max_tokens, **options):
+        raise NotImplementedError
+
+    async def astream(self, messages, operation, temperature, max_tokens, on_delta, **options):
+        """Pass the completion's text to on_delta as it is generated and return the Completion.
+
+        Providers without streaming deliver the whole text as one delta.
+        """
+        completion = await self.acomplete(messages, operation, temperature, max_tokens, **options)
+        on_delta(completion.text)
+        return completion
+
+    def complete(self, messages, operation, temperature, max_tokens, **options):
+        """Blocking acomplete, run on the provider's event loop."""
+        return self.submit(self.acomplete(messages, operation, temperature, max_tokens, **options)).result()
+
+    def stream(self, messages, operation, temperature, max_tokens, on_delta, **options):
+        """Blocking astream; on_delta runs in the calling thread, not on the event loop."""
+        deltas = queue.SimpleQueue()
+        future = self.submit(self.astream(messages, operation, temperature, max_tokens, deltas.put, **options))
+        future.add_done_callback(lambda _: deltas.put(None))
+        while (delta := deltas.get()) is not None:
+            on_delta(delta)
+        return future.result()
+
+    def submit(self, coroutine):
+        """Schedule a coroutine on the provider's event loop; return a concurrent.futures.Future."""
+        if self._loop_thread is None:
+            with self._loop_lock:
+                if self._loop_thread is None:
+                    self._loop_thread = _LoopThread()
+        return self._loop_thread.submit(coroutine)
+
+
+class OpenAIProvider(ChatProvider):
+    """OpenAI (or compatible) chat completions over a pooled AsyncOpenAI client."""
+
+    retryable_errors = (
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError,
+    )
+
+    def __init__(self, api_key=None, base_url=None):
+        super().__init__()
+        self.api_key = api_key or settings.OPENAI_API_KEY
+        self.base_url = base_url or settings.OPENAI_BASE_URL or None
+        self._client = None
+
+    @property
+    def configured(self):
+        # A custom base URL (compatible server, mock) may not need a key.
+        return bool(self.api_key or self.base_url)
+
+    def http_client(self):
+        """Keep-alive connection pool shared by every request of this provider."""
+        return httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=settings.AI_HTTP_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT)
+        )
+
+    def _get_client(self):
+        # Created on the loop thread: httpx async connections belong to the loop that opened them.
+        if self._client is None:
+            self._client = openai.AsyncOpenAI(
+                api_key=self.api_key or 'missing',
+                base_url=self.base_url,
+                # Retries go through AIService so they respect the shared rate limiter.
+                max_retries=0,
+                http_client=self.http_client()
+            )
+        return self._client
+
+    async def acomplete(self, messages, operation, temperature, max_tokens, **options):
+        model = self.model_for(operation)
+        response = await self._get_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=self.timeout_for(operation),
+            **options
+        )
+        usage = response.usage
+        return Completion(
+            text=(response.choices[0].message.content or '').strip(),
+            model=response.model or model,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0
+        )
+
+    async def astream(self, messages, operation, temperature, max_tokens, on_delta, **options):
+        model = self.model_for(operation)
+        response = await self._get_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=self.timeout_for(operation),
+            stream=True,
+            **options
+        )
+        parts = []
+        async for chunk in response:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                on_delta(delta)
+            model = chunk.model or model
+        text = ''.join(parts)
+        # Streamed responses carry no usage; count with the local estimate.
+        return Completion(
+            text=text.strip(),
+            model=model,
+            prompt_tokens=estimate_messages_tokens(messages),
+            completion_tokens=estimate_tokens(text)
+        )
+
+    def retry_after(self, error):
+        response = getattr(error, 'response', None)
+        if response is None:
+            return None
+        for header, scale in (('retry-after-ms', 0.001), ('retry-after', 1)):
+            try:
+                return float(response.headers[header]) * scale
+            except (KeyError, ValueError):
+                continue
+        return None
+
+
+_provider = None
+_provider_pid = None
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    """Return this process's provider (AI_PROVIDER), created again after a fork."""
+    global _provider, _provider_pid
+    if _provider is None or _provider_pid != os.getpid():
+        with _provider_lock:
+            if _provider is None or _provider_pid != os.getpid():
+                _provider = import_string(settings.AI_PROVIDER)()
+                _provider_pid = os.getpid()
+    return _provider
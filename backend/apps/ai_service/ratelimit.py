@@ -0,0 +1,172 @@
+"""
+Request and token budgets for AI provider calls.
+
+RedisRateLimiter is shared by every web and Celery worker: two token buckets
+(requests and tokens per minute) refilled continuously and updated atomically
+in a Lua script against Redis server time, plus a shared "blocked until"
+deadline set when the provider answers 429 with Retry-After. LocalRateLimiter
+is the per-process stand-in used in development, tests and batch jobs.
+"""
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+WINDOW_SECONDS = 60
+
+
+class LocalRateLimiter:
+    """In-process sliding-window budget of requests and tokens per minute."""
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._events = deque()
+        self._tokens = 0
+        self._blocked_until = 0
+        self._lock = threading.Lock()
+
+    def _prune(self, now):
+        while self._events and self._events[0][0] <= now - WINDOW_SECONDS:
+            _, tokens = self._events.popleft()
+            self._tokens -= tokens
+
+    def _wait_time(self, now, tokens):
+        """Seconds until one more request of `tokens` fits the budget, or 0."""
+        if self._blocked_until > now:
+            return self._blocked_until - now
+        if not self._events:
+            return 0
+        over_requests = self.requests_per_minute and len(self._events) + 1 > self.requests_per_minute
+        over_tokens = self.tokens_per_minute and self._tokens + tokens > self.tokens_per_minute
+        if not (over_requests or over_tokens):
+            return 0
+        return max(self._events[0][0] + WINDOW_SECONDS - now, 0.01)
+
+    def acquire(self, tokens=0):
+        """Block until a request of `tokens` fits the budget; return the seconds spent waiting."""
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._prune(now)
+                wait = self._wait_time(now, tokens)
+                if not wait:
+                    self._events.append((now, tokens))
+                    self._tokens += tokens
+                    return now - started
+            time.sleep(wait)
+
+    def penalize(self, seconds):
+        """Hold every request for `seconds`, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+# Returns '0' when the request was admitted, otherwise the seconds to wait (as a string,
+# since Redis truncates Lua numbers to integers).
+ACQUIRE_SCRIPT = """
+if redis.replicate_commands then redis.replicate_commands() end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local blocked = tonumber(redis.call('GET', KEYS[3]) or '0')
+if blocked > now then return tostring(blocked - now) end
+
+local function level(key, rate)
+    local data = redis.call('HMGET', key, 'level', 'ts')
+    local lvl = tonumber(data[1]) or rate
+    local ts = tonumber(data[2]) or now
+    return math.min(rate, lvl + math.max(now - ts, 0) * rate / 60)
+end
+
+local rpm, tpm = tonumber(ARGV[1]), tonumber(ARGV[2])
+local cost = math.min(tonumber(ARGV[3]), tpm > 0 and tpm or tonumber(ARGV[3]))
+local wait, requests, tokens = 0, 0, 0
+if rpm > 0 then
+    requests = level(KEYS[1], rpm)
+    if requests < 1 then wait = math.max(wait, (1 - requests) * 60 / rpm) end
+end
+if tpm > 0 then
+    tokens = level(KEYS[2], tpm)
+    if tokens < cost then wait = math.max(wait, (cost - tokens) * 60 / tpm) end
+end
+if wait > 0 then return tostring(wait) end
+
+if rpm > 0 then
+    redis.call('HSET', KEYS[1], 'level', tostring(requests - 1), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[1], 120)
+end
+if tpm > 0 then
+    redis.call('HSET', KEYS[2], 'level', tostring(tokens - cost), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[2], 120)
+end
+return '0'
+"""
+
+PENALIZE_SCRIPT = """
+if redis.replicate_commands then redis.replicate_commands() end
+local t = redis.call('TIME')
+local untilts = tonumber(t[1]) + tonumber(t[2]) / 1000000 + tonumber(ARGV[1])
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+if untilts > current then
+    redis.call('SET', KEYS[1], tostring(untilts), 'PX', math.ceil(tonumber(ARGV[1]) * 1000))
+end
+return 1
+"""
+
+
+class RedisRateLimiter:
+    """Token buckets in Redis shared by all processes using the same provider key."""
+
+    # Upper bound on one sleep, so a worker re-checks the shared state regularly.
+    MAX_SLEEP = 5
+
+    def __init__(self, url, requests_per_minute=None, tokens_per_minute=None, prefix='ai-ratelimit'):
+        import redis
+        client = redis.Redis.from_url(url)
+        self.requests_per_minute = requests_per_minute or 0
+        self.tokens_per_minute = tokens_per_minute or 0
+        self.keys = [f'{prefix}:requests', f'{prefix}:tokens', f'{prefix}:blocked-until']
+        self._acquire = client.register_script(ACQUIRE_SCRIPT)
+        self._penalize = client.register_script(PENALIZE_SCRIPT)
+
+    def acquire(self, tokens=0):
+        """Block until a request of `tokens` fits the shared budget; return the seconds spent waiting."""
+        started = time.monotonic()
+        while True:
+            wait = float(self._acquire(
+                keys=self.keys,
+                args=[self.requests_per_minute, self.tokens_per_minute, tokens]
+            ))
+            if wait <= 0:
+                return time.monotonic() - started
+            time.sleep(min(wait, self.MAX_SLEEP))
+
+    def penalize(self, seconds):
+        """Hold requests from every worker for `seconds`."""
+        self._penalize(keys=self.keys[2:], args=[seconds])
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Return the process's provider-wide limiter, or None if AI_RATE_LIMITER is 'none'."""
+    global _limiter
+    if _limiter is None and settings.AI_RATE_LIMITER != 'none':
+        with _limiter_lock:
+            if _limiter is None:
+                if settings.AI_RATE_LIMITER == 'redis':
+                    _limiter = RedisRateLimiter(
+                        settings.REDIS_URL,
+                        settings.AI_REQUESTS_PER_MINUTE,
+                        settings.AI_TOKENS_PER_MINUTE
+                    )
+                else:
+                    _limiter = LocalRateLimiter(
+                        settings.AI_REQUESTS_PER_MINUTE or None,
+                        settings.AI_TOKENS_PER_MINUTE or None
+                    )
+    return _limiter
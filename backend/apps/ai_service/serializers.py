@@ -1,9 +1,21 @@
 from rest_framework import serializers
-from .models import AITask
+from .models import AITask, AIUsageDaily
 
 class AITaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = AITask
-        fields = ['id', 'blog', 'task_type', 'status', 'result', 'error', 
+        fields = ['id', 'blog', 'task_type', 'status', 'step', 'progress', 'result', 'error', 
+                  'model', 'prompt_tokens', 'completion_tokens', 'latency_ms', 'cost', 'calls',
                   'created_at', 'updated_at', 'completed_at']
-        read_only_fields = ['id', 'created_at', 'updated_at', 'completed_at']
+        read_only_fields = ['id', 'step', 'progress', 'model', 'prompt_tokens', 'completion_tokens',
+                            'latency_ms', 'cost', 'calls', 'created_at', 'updated_at', 'completed_at']
+
+
+class AIUsageDailySerializer(serializers.ModelSerializer):
+    author = serializers.StringRelatedField()
+
+    class Meta:
+        model = AIUsageDaily
+        fields = ['id', 'date', 'author', 'operation', 'model', 'calls', 'prompt_tokens',
+                  'completion_tokens', 'latency_ms', 'cost']
+        read_only_fields = fields
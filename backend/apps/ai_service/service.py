@@ -1,20 +1,152 @@
-import openai
-from django.conf import settings
-from django.utils import timezone
 import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from . import extractive
+from .accounting import call_record
+from .cache import cache_key, get_cached_result, store_result
+from .chunking import estimate_messages_tokens, estimate_tokens, split_markdown
+from .providers import get_provider
+from .ratelimit import get_rate_limiter
+from .streaming import JSONFieldStream
+
+SENTIMENTS = ('positive', 'negative', 'neutral')
+
+# Schema for the combined analysis response; sent in the prompt and checked by _parse_analysis.
+ANALYSIS_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'summary': {'type': 'string'},
+        'key_points': {'type': 'array', 'items': {'type': 'string'}, 'minItems': 1},
+        'sentiment': {'type': 'string', 'enum': list(SENTIMENTS)},
+    },
+    'required': ['summary', 'key_points', 'sentiment'],
+    'additionalProperties': False,
+}
+
+
+class PromptTooLarge(Exception):
+    """Raised instead of sending a request that would not fit the model's context window."""
+
+
+class TransientAIError(Exception):
+    """Raised when the provider is still rate-limiting or failing after in-process retries."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Exponential backoff with full jitter, never shorter than the provider's Retry-After."""
+    delay = random.uniform(0, min(settings.AI_BACKOFF_MAX, settings.AI_BACKOFF_BASE * 2 ** attempt))
+    return max(delay, retry_after or 0)
+
+
+def _parse_analysis(text, max_points):
+    """Parse and validate a combined analysis response against ANALYSIS_SCHEMA."""
+    data = json.loads(text)
+    if not isinstance(data, dict) or set(data) != set(ANALYSIS_SCHEMA['required']):
+        raise ValueError('Analysis must be an object with exactly summary, key_points and sentiment.')
+    summary, key_points, sentiment = data['summary'], data['key_points'], data['sentiment']
+    if not isinstance(summary, str) or not summary.strip():
+        raise ValueError('summary must be a non-empty string.')
+    if (
+        not isinstance(key_points, list) or not key_points
+        or not all(isinstance(point, str) and point.strip() for point in key_points)
+    ):
+        raise ValueError('key_points must be a non-empty array of strings.')
+    if sentiment not in SENTIMENTS:
+        raise ValueError(f'sentiment must be one of {", ".join(SENTIMENTS)}.')
+    return {
+        'summary': summary.strip(),
+        'key_points': [point.strip() for point in key_points[:max_points]],
+        'sentiment': sentiment,
+    }
+
 
 class AIService:
     """Service for AI-powered content generation and analysis."""
-    
-    def __init__(self):
-        openai.api_key = settings.OPENAI_API_KEY
-    
-    def generate_summary(self, content, max_sentences=3):
+
+    def __init__(self, provider=None, limiter=None):
+        self.provider = provider or get_provider()
+        # The provider-wide limiter plus an optional caller budget (e.g. a batch job's).
+        self.limiters = [l for l in (get_rate_limiter(), limiter) if l]
+        # Model of the combined analysis; part of the result cache key.
+        self.model = self.provider.model_for('analysis')
+        self.usage = {
+            'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'cost': 0.0,
+            'retries': 0, 'throttled_seconds': 0.0, 'backoff_seconds': 0.0,
+        }
+        # One accounting entry per provider call (see apps.ai_service.accounting).
+        self.calls = []
+        self._usage_lock = threading.Lock()
+
+    def _add_usage(self, **counts):
+        with self._usage_lock:
+            for name, value in counts.items():
+                self.usage[name] += value
+
+    def _chat(self, messages, operation, temperature, max_tokens, stream=None, **kwargs):
+        """Run one chat completion for `operation` and return its text, recording its usage and cost.
+
+        With a `stream` (see apps.ai_service.streaming.TaskStream) the text is
+        also passed to stream.delta as it is generated; stream.reset is called
+        before a retry so partial text can be discarded.
+        """
+        prompt_tokens = estimate_messages_tokens(messages)
+        if prompt_tokens + max_tokens > settings.AI_CONTEXT_TOKENS:
+            raise PromptTooLarge(
+                f'Prompt of ~{prompt_tokens} tokens plus {max_tokens} for the reply exceeds '
+                f'the {settings.AI_CONTEXT_TOKENS} token context.'
+            )
+
+        for attempt in range(settings.AI_MAX_RETRIES + 1):
+            for limiter in self.limiters:
+                self._add_usage(throttled_seconds=limiter.acquire(prompt_tokens + max_tokens))
+            started = time.monotonic()
+            try:
+                if stream is None:
+                    completion = self.provider.complete(messages, operation, temperature, max_tokens, **kwargs)
+                else:
+                    completion = self.provider.stream(
+                        messages, operation, temperature, max_tokens, stream.delta, **kwargs
+                    )
+                break
+            except self.provider.retryable_errors as e:
+                if stream is not None:
+                    stream.reset()
+                retry_after = self.provider.retry_after(e)
+                if retry_after:
+                    # Hold every worker sharing the limiter, not just this one.
+                    for limiter in self.limiters:
+                        limiter.penalize(retry_after)
+                if attempt >= settings.AI_MAX_RETRIES:
+                    raise TransientAIError(str(e), retry_after) from e
+                delay = backoff_delay(attempt, retry_after)
+                self._add_usage(retries=1, backoff_seconds=delay)
+                time.sleep(delay)
+
+        record = call_record(operation, completion, time.monotonic() - started)
+        with self._usage_lock:
+            self.calls.append(record)
+        self._add_usage(
+            calls=1,
+            prompt_tokens=completion.prompt_tokens,
+            completion_tokens=completion.completion_tokens,
+            cost=record['cost']
+        )
+        return completion.text
+
+    def generate_summary(self, content, max_sentences=3, stream=None):
         """Generate summary of blog content using OpenAI."""
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
+            summary = self._chat(
+                [
                     {
                         "role": "system",
                         "content": "You are a helpful assistant that summarizes blog posts concisely."
@@ -24,21 +156,22 @@ class AIService:
                         "content": f"Summarize the following blog post in {max_sentences} sentences:\n\n{content}"
                     }
                 ],
+                operation='summary',
                 temperature=0.7,
-                max_tokens=200
+                max_tokens=200,
+                stream=stream
             )
-            
-            summary = response.choices[0].message.content.strip()
             return {'status': 'success', 'summary': summary}
+        except TransientAIError:
+            raise
         except Exception as e:
             return {'status': 'error', 'message': str(e)}
-    
+
     def extract_key_points(self, content, num_points=5):
         """Extract key points from blog content."""
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
+            response_text = self._chat(
+                [
                     {
                         "role": "system",
                         "content": "You are a helpful assistant that extracts key points from text."
@@ -48,22 +181,22 @@ class AIService:
                         "content": f"Extract {num_points} key points from this blog post:\n\n{content}\n\nReturn as a JSON array of strings."
                     }
                 ],
+                operation='key_points',
                 temperature=0.5,
                 max_tokens=300
             )
-            
-            response_text = response.choices[0].message.content.strip()
             key_points = json.loads(response_text)
             return {'status': 'success', 'key_points': key_points}
+        except TransientAIError:
+            raise
         except Exception as e:
             return {'status': 'error', 'message': str(e)}
-    
+
     def analyze_sentiment(self, content):
         """Analyze sentiment of blog content."""
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
+            sentiment = self._chat(
+                [
                     {
                         "role": "system",
                         "content": "Analyze the sentiment of the given text and respond with only one word: positive, negative, or neutral."
@@ -73,41 +206,190 @@ class AIService:
                         "content": content
                     }
                 ],
+                operation='sentiment',
                 temperature=0.3,
                 max_tokens=10
-            )
-            
-            sentiment = response.choices[0].message.content.strip().lower()
-            
+            ).lower()
+
             # Normalize sentiment
-            if sentiment in ['positive', 'negative', 'neutral']:
+            if sentiment in SENTIMENTS:
                 return {'status': 'success', 'sentiment': sentiment}
             else:
                 return {'status': 'success', 'sentiment': 'neutral'}
+        except TransientAIError:
+            raise
         except Exception as e:
             return {'status': 'error', 'message': str(e)}
-    
-    def generate_complete_summary(self, blog):
-        """Generate a complete summary with key points and sentiment analysis."""
+
+    def analyze_content(self, content, max_sentences=3, num_points=5, stream=None):
+        """Get summary, key points and sentiment from a single request with a strict JSON schema."""
         try:
-            # Generate summary
-            summary_result = self.generate_summary(blog.content)
-            if summary_result['status'] != 'success':
-                raise Exception(summary_result['message'])
-            
-            # Extract key points
-            key_points_result = self.extract_key_points(blog.content)
-            key_points = key_points_result.get('key_points', []) if key_points_result['status'] == 'success' else []
-            
-            # Analyze sentiment
-            sentiment_result = self.analyze_sentiment(blog.content)
-            sentiment = sentiment_result.get('sentiment', 'neutral') if sentiment_result['status'] == 'success' else 'neutral'
-            
-            return {
-                'status': 'success',
-                'summary': summary_result['summary'],
-                'key_points': key_points,
-                'sentiment': sentiment
-            }
+            response_text = self._chat(
+                [
+                    {
+                        "role": "system",
+                        "content": (
+                            "You analyze blog posts. Respond with a single JSON object that matches "
+                            f"this JSON schema and nothing else:\n{json.dumps(ANALYSIS_SCHEMA)}"
+                        )
+                    },
+                    {
+                        "role": "user",
+                        "content": (
+                            f"Summarize this blog post in {max_sentences} sentences, extract {num_points} "
+                            f"key points and classify its overall sentiment:\n\n{content}"
+                        )
+                    }
+                ],
+                operation='analysis',
+                temperature=0.5,
+                max_tokens=500,
+                response_format={'type': 'json_object'},
+                stream=JSONFieldStream(stream, 'summary') if stream else None
+            )
+            return {'status': 'success', **_parse_analysis(response_text, num_points)}
+        except ValueError as e:
+            return {'status': 'error', 'message': f'Invalid analysis response: {e}', 'invalid_response': True}
+        except TransientAIError:
+            raise
         except Exception as e:
             return {'status': 'error', 'message': str(e)}
+
+    def analyze_concurrently(self, content, stream=None):
+        """Run the summary, key point and sentiment requests in parallel."""
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            summary = executor.submit(self.generate_summary, content, stream=stream)
+            key_points = executor.submit(self.extract_key_points, content)
+            sentiment = executor.submit(self.analyze_sentiment, content)
+            summary_result = summary.result()
+            key_points_result = key_points.result()
+            sentiment_result = sentiment.result()
+
+        if summary_result['status'] != 'success':
+            return summary_result
+        return {
+            'status': 'success',
+            'summary': summary_result['summary'],
+            'key_points': key_points_result.get('key_points', []) if key_points_result['status'] == 'success' else [],
+            'sentiment': sentiment_result.get('sentiment', 'neutral') if sentiment_result['status'] == 'success' else 'neutral',
+        }
+
+    def summarize_chunk(self, chunk):
+        """Summarize one section of a long post (map step)."""
+        return self._chat(
+            [
+                {
+                    "role": "system",
+                    "content": "You summarize one section of a longer blog post. Keep concrete facts, names and numbers."
+                },
+                {
+                    "role": "user",
+                    "content": f"Summarize this section in 2-3 sentences:\n\n{chunk}"
+                }
+            ],
+            operation='chunk_summary',
+            temperature=0.3,
+            max_tokens=settings.AI_MAP_SUMMARY_TOKENS
+        )
+
+    def map_reduce(self, content, progress=None):
+        """Condense a long post into section summaries that fit one request.
+
+        The post is split at Markdown headings into token-budgeted chunks that
+        are summarized concurrently; while the joined summaries are still over
+        budget they are chunked and summarized again. `progress(step, percent)`
+        is called as chunks complete.
+        """
+        budget = settings.AI_CHUNK_TOKENS
+        text, chunks, levels = content, 0, 0
+        while estimate_tokens(text) > budget:
+            if levels >= settings.AI_MAX_REDUCE_LEVELS:
+                raise PromptTooLarge(f'Post still exceeds {budget} tokens after {levels} reduce levels.')
+            parts = split_markdown(text, budget)
+            summaries = []
+            with ThreadPoolExecutor(max_workers=settings.AI_MAP_CONCURRENCY) as executor:
+                for summary in executor.map(self.summarize_chunk, parts):
+                    summaries.append(summary)
+                    if progress:
+                        progress('condensing', 10 + 50 * len(summaries) // len(parts))
+            chunks += len(parts)
+            levels += 1
+            text = '\n\n'.join(summaries)
+        return text, {'chunks': chunks, 'levels': levels}
+
+    def _analyze(self, content, stream=None):
+        """Combined analysis with concurrent fallback; returns (result, mode)."""
+        mode = settings.AI_ANALYSIS_MODE
+        if mode == 'combined':
+            result = self.analyze_content(content, stream=stream)
+            if not result.pop('invalid_response', False):
+                return result, mode
+            mode = 'fallback'
+            if stream:
+                stream.reset()
+        return self.analyze_concurrently(content, stream=stream), mode
+
+    def local_summary(self, content, mode='local', **extra):
+        """Summary, key points and sentiment from the offline extractive engine."""
+        return {'status': 'success', **extractive.analyze(content), 'mode': mode, **extra, 'usage': dict(self.usage)}
+
+    def generate_complete_summary(self, blog, use_cache=True, stream=None, progress=None):
+        """Generate a complete summary with key points and sentiment analysis.
+
+        AI_BACKEND selects the provider ('openai') or the offline extractive
+        engine ('local'). With AI_LOCAL_FALLBACK, the local engine also answers
+        when no API key is configured or the provider returns an error;
+        TransientAIError still propagates so the caller can retry first.
+        Provider summaries are streamed to `stream` as they are generated, and
+        `progress(step, percent)` is called as the work advances.
+        """
+        if settings.AI_BACKEND == 'local':
+            return self.local_summary(blog.content)
+        fallback = settings.AI_LOCAL_FALLBACK
+        if fallback and not self.provider.configured:
+            return self.local_summary(blog.content, 'local_fallback', fallback_reason='The AI provider is not configured.')
+
+        result = self._provider_summary(blog, use_cache, stream, progress)
+        if result['status'] != 'success' and fallback:
+            return self.local_summary(blog.content, 'local_fallback', fallback_reason=result.get('message', ''))
+        return result
+
+    def _provider_summary(self, blog, use_cache, stream=None, progress=None):
+        """Summary, key points and sentiment from the provider.
+
+        Results are served from the persistent result cache when the same
+        normalized content was analyzed with the same model and prompt version.
+        Posts over AI_LONG_DOCUMENT_TOKENS are first condensed by map_reduce.
+        In 'combined' mode one request returns all three parts; if its response
+        does not parse or validate, the three separate requests run concurrently
+        instead. 'concurrent' mode always uses the separate requests. Provider
+        errors that persist through retries raise TransientAIError.
+        """
+        key = cache_key(blog.content, self.model)
+        if use_cache:
+            cached = get_cached_result(key)
+            if cached is not None:
+                return {**cached, 'status': 'success', 'cache': {'hit': True, 'key': key}, 'usage': dict(self.usage)}
+
+        content, map_reduce = blog.content, None
+        try:
+            if estimate_tokens(content) > settings.AI_LONG_DOCUMENT_TOKENS:
+                if progress:
+                    progress('condensing')
+                content, map_reduce = self.map_reduce(content, progress)
+        except TransientAIError:
+            raise
+        except Exception as e:
+            return {'status': 'error', 'message': str(e), 'usage': dict(self.usage)}
+
+        if progress:
+            progress('analyzing')
+        result, mode = self._analyze(content, stream)
+        if use_cache and result['status'] == 'success':
+            store_result(key, self.model, result)
+        result['mode'] = mode
+        if map_reduce:
+            result['map_reduce'] = map_reduce
+        result['cache'] = {'hit': False, 'key': key}
+        result['usage'] = dict(self.usage)
+        return result
@@ -0,0 +1,328 @@
+"""
+Live progress of summarization tasks, relayed to clients over Server-Sent Events.
+
+The worker publishes events for an AITask to a broker channel as the model
+generates the summary; the SSE endpoint (apps.ai_service.async_views)
+subscribes and forwards them. Events:
+
+  status   the task changed state (processing, or pending before a retry)
+  progress the task's current step and percent done
+  token    the next piece of summary text
+  reset    discard the text received so far (a request is being retried)
+  done     final task status and result, as persisted; the stream ends
+
+Pub/sub does not replay, so the broker also keeps the text streamed so far and
+the final event. A subscriber first receives that snapshot, then only events
+with a higher sequence number than the snapshot's.
+
+RedisStreamBroker works across web and Celery processes; LocalStreamBroker is
+the in-process stand-in for development and tests (AI_STREAM_BROKER).
+"""
+import asyncio
+import json
+import logging
+import re
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Appends/clears the replay buffer and publishes atomically, so a snapshot and
+# the sequence numbers of published events always agree.
+PUBLISH_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+if ARGV[1] == 'token' then
+    redis.call('APPEND', KEYS[2], ARGV[4])
+elseif ARGV[1] == 'reset' then
+    redis.call('SET', KEYS[2], '')
+elseif ARGV[1] == 'done' then
+    redis.call('SET', KEYS[3], ARGV[2])
+end
+for i = 1, 3 do redis.call('EXPIRE', KEYS[i], tonumber(ARGV[3])) end
+redis.call('PUBLISH', ARGV[5], '{"seq":' .. seq .. ',"event":"' .. ARGV[1] .. '","data":' .. ARGV[2] .. '}')
+return seq
+"""
+
+
+class RedisStreamBroker:
+    """Task events over Redis pub/sub, with the replay buffer kept in Redis keys."""
+
+    def __init__(self, url, ttl=None, prefix='ai-stream'):
+        import redis
+        self.url = url
+        self.ttl = ttl or settings.AI_STREAM_TTL
+        self.prefix = prefix
+        self._publish = redis.Redis.from_url(url).register_script(PUBLISH_SCRIPT)
+
+    def _keys(self, channel):
+        # One hash slot per channel, so the script's keys are co-located on a cluster.
+        return [f'{self.prefix}:{{{channel}}}:{name}' for name in ('seq', 'text', 'final')]
+
+    def publish(self, channel, event, data):
+        return self._publish(
+            keys=self._keys(channel),
+            args=[event, json.dumps(data), self.ttl, data.get('delta', ''), f'{self.prefix}:{channel}']
+        )
+
+    async def listen(self, channel, heartbeat):
+        """Yield (event, data) pairs, starting with a snapshot; None after `heartbeat` idle seconds."""
+        import redis.asyncio as aioredis
+        client = aioredis.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        try:
+            # Subscribe before reading the snapshot so nothing falls in between.
+            await pubsub.subscribe(f'{self.prefix}:{channel}')
+            seq, text, final = await client.mget(self._keys(channel))
+            seq = int(seq or 0)
+            yield 'snapshot', {'text': (text or b'').decode()}
+            if final:
+                yield 'done', json.loads(final)
+                return
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=heartbeat)
+                if message is None:
+                    yield None
+                    continue
+                payload = json.loads(message['data'])
+                if payload['seq'] <= seq:
+                    continue
+                yield payload['event'], payload['data']
+                if payload['event'] == 'done':
+                    return
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+
+
+class LocalStreamBroker:
+    """In-process broker; only reaches subscribers in the publishing process.
+
+    A channel is dropped once its task is done and no subscriber is left, or
+    once nothing has been published to it for `ttl` seconds and nobody listens
+    (a worker that died mid-task); late subscribers then get the final state
+    from the task itself.
+    """
+
+    POLL_INTERVAL = 0.02
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl or settings.AI_STREAM_TTL
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def _state(self, channel):
+        state = self._channels.get(channel)
+        if state is None:
+            state = self._channels[channel] = {
+                'seq': 0, 'text': '', 'final': None, 'events': [], 'subscribers': 0, 'touched': time.monotonic(),
+            }
+        return state
+
+    def _discard(self, channel, state):
+        if self._channels.get(channel) is state:
+            del self._channels[channel]
+
+    def _prune(self, now):
+        for channel, state in list(self._channels.items()):
+            if not state['subscribers'] and now - state['touched'] > self.ttl:
+                del self._channels[channel]
+
+    def publish(self, channel, event, data):
+        with self._lock:
+            state = self._state(channel)
+            state['seq'] += 1
+            state['touched'] = time.monotonic()
+            if event == 'token':
+                state['text'] += data['delta']
+            elif event == 'reset':
+                state['text'] = ''
+            elif event == 'done':
+                # Subscribers pick the final event up from the snapshot; drop the backlog.
+                state['final'], state['events'], state['text'] = data, [], ''
+                if not state['subscribers']:
+                    self._discard(channel, state)
+                self._prune(state['touched'])
+                return state['seq']
+            state['events'].append((state['seq'], event, data))
+            return state['seq']
+
+    async def listen(self, channel, heartbeat):
+        with self._lock:
+            state = self._state(channel)
+            state['subscribers'] += 1
+            seq, text, final = state['seq'], state['text'], state['final']
+        try:
+            yield 'snapshot', {'text': text}
+            if final:
+                yield 'done', final
+                return
+            idle = 0.0
+            while True:
+                with self._lock:
+                    events = [event for event in state['events'] if event[0] > seq]
+                    final = state['final']
+                for seq, event, data in events:
+                    yield event, data
+                if final:
+                    yield 'done', final
+                    return
+                if events:
+                    idle = 0.0
+                elif idle >= heartbeat:
+                    idle = 0.0
+                    yield None
+                await asyncio.sleep(self.POLL_INTERVAL)
+                idle += self.POLL_INTERVAL
+        finally:
+            with self._lock:
+                state['subscribers'] -= 1
+                if not state['subscribers'] and (
+                    state['final'] or time.monotonic() - state['touched'] > self.ttl
+                ):
+                    self._discard(channel, state)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_stream_broker():
+    """Return the process's broker for task events (AI_STREAM_BROKER)."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                if settings.AI_STREAM_BROKER == 'redis':
+                    _broker = RedisStreamBroker(settings.REDIS_URL)
+                else:
+                    _broker = LocalStreamBroker()
+    return _broker
+
+
+def task_channel(task_id):
+    return f'ai-task:{task_id}'
+
+
+def done_event(task):
+    """Payload of the final event for a finished AITask."""
+    result = task.result or {}
+    return {
+        'task_id': task.id,
+        'status': task.status,
+        'summary': result.get('summary', ''),
+        'key_points': result.get('key_points', []),
+        'sentiment': result.get('sentiment', ''),
+        'mode': result.get('mode', ''),
+        'error': task.error,
+    }
+
+
+class TaskStream:
+    """Publishes one AITask's events; passed to AIService as the `stream` of a request.
+
+    Streaming is best effort: if the broker fails, publishing stops for this
+    task and summarization carries on.
+    """
+
+    def __init__(self, task_id, broker=None):
+        self.channel = task_channel(task_id)
+        self.broker = broker or get_stream_broker()
+        self.failed = False
+
+    def _publish(self, event, data):
+        if self.failed:
+            return
+        try:
+            self.broker.publish(self.channel, event, data)
+        except Exception:
+            logger.exception('Streaming %s stopped: could not publish %s event', self.channel, event)
+            self.failed = True
+
+    def status(self, status, **extra):
+        self._publish('status', {'status': status, **extra})
+
+    def progress(self, step, progress):
+        self._publish('progress', {'step': step, 'progress': progress})
+
+    def delta(self, text):
+        if text:
+            self._publish('token', {'delta': text})
+
+    def reset(self):
+        self._publish('reset', {})
+
+    def done(self, task):
+        self._publish('done', done_event(task))
+
+
+class JSONFieldStream:
+    """Forwards the decoded value of one string field of a streamed JSON object.
+
+    Wraps a stream so the combined analysis request (a JSON object whose first
+    field is the summary) can stream the summary text as it is generated.
+    """
+
+    ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+    def __init__(self, stream, field):
+        self.stream = stream
+        self.start_re = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._restart()
+
+    def _restart(self):
+        self.buffer = ''
+        self.position = None
+        self.finished = False
+
+    def _decode(self):
+        """Decode the value from `position` up to the closing quote or an incomplete escape."""
+        buffer, i, out = self.buffer, self.position, []
+        while i < len(buffer):
+            char = buffer[i]
+            if char == '"':
+                self.finished = True
+                break
+            if char != '\\':
+                out.append(char)
+                i += 1
+                continue
+            if i + 1 >= len(buffer):
+                break
+            if buffer[i + 1] != 'u':
+                out.append(self.ESCAPES.get(buffer[i + 1], buffer[i + 1]))
+                i += 2
+                continue
+            # \uXXXX, or a surrogate pair written as two escapes.
+            if i + 6 > len(buffer):
+                break
+            try:
+                code = int(buffer[i + 2:i + 6], 16)
+            except ValueError:
+                code = 0
+            length = 12 if 0xD800 <= code <= 0xDBFF else 6
+            if i + length > len(buffer):
+                break
+            try:
+                out.append(json.loads(f'"{buffer[i:i + length]}"'))
+            except ValueError:
+                pass
+            i += length
+        self.position = i
+        return ''.join(out)
+
+    def delta(self, text):
+        self.buffer += text
+        if self.finished:
+            return
+        if self.position is None:
+            match = self.start_re.search(self.buffer)
+            if not match:
+                return
+            self.position = match.end()
+        self.stream.delta(self._decode())
+
+    def reset(self):
+        self._restart()
+        self.stream.reset()
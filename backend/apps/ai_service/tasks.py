@@ -1,58 +1,305 @@
+import random
+import uuid
+from datetime import timedelta
+
 from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from apps.blogs.models import Blog, BlogSummary
-from apps.ai_service.models import AITask
-from apps.ai_service.service import AIService
+from apps.ai_service.accounting import USAGE_FIELDS, BudgetExceeded, budget_state, record_task_usage
+from apps.ai_service.cache import cache_key
+from apps.ai_service.lifecycle import STEP_PROGRESS, TaskProgress
+from apps.ai_service.models import AITask, AIBatchJob
+from apps.ai_service.providers import get_provider
+from apps.ai_service.service import AIService, TransientAIError
+from apps.ai_service.streaming import TaskStream
+
+
+# Claim attempts before a persistent IntegrityError is raised.
+CLAIM_ATTEMPTS = 3
+
+
+def summary_version():
+    """(model, prompt version) that summaries are currently generated with."""
+    return get_provider().model_for('analysis'), settings.AI_PROMPT_VERSION
+
+
+def summary_content_hash(blog):
+    """Hash identifying the blog's current content for summarization (see AITask.content_hash).
+
+    The same key AIService caches the summary under, so it follows AI_MODEL_ANALYSIS.
+    """
+    model, prompt_version = summary_version()
+    return cache_key(blog.content, model, prompt_version)
+
+
+def claim_summary_task(blog):
+    """Return (task, created): the active summarization task for the blog's current content.
+
+    At most one pending/processing task exists per blog and content version
+    (enforced by a partial unique constraint); concurrent callers get the same
+    task back. Active tasks untouched for AI_TASK_DEDUP_TIMEOUT are treated as
+    abandoned so a lost Celery message cannot block the blog forever.
+    """
+    content_hash = summary_content_hash(blog)
+    active = AITask.objects.filter(
+        blog=blog,
+        task_type='summarization',
+        content_hash=content_hash,
+        status__in=AITask.ACTIVE_STATUSES
+    )
+    cutoff = timezone.now() - timedelta(seconds=settings.AI_TASK_DEDUP_TIMEOUT)
+    active.filter(updated_at__lt=cutoff).update(
+        status=AITask.Status.FAILED,
+        error='Abandoned: no progress within the deduplication timeout.',
+        completed_at=timezone.now()
+    )
+
+    for attempt in range(CLAIM_ATTEMPTS):
+        task = active.first()
+        if task:
+            return task, False
+        try:
+            with transaction.atomic():
+                return AITask.objects.create(
+                    blog=blog, task_type='summarization', content_hash=content_hash, step='queued'
+                ), True
+        except IntegrityError:
+            # A concurrent caller won, and its task may already have finished: look again.
+            if attempt == CLAIM_ATTEMPTS - 1:
+                raise
+
+
+def request_summary(blog, priority=None):
+    """Queue summarization for a blog unless one is already in flight; return (task, created).
 
-@shared_task
-def generate_blog_summary_task(blog_id):
-    """Celery task to generate blog summary asynchronously."""
+    With AI_STREAMING the summary is streamed to the task's event channel as it
+    is generated (see apps.ai_service.streaming). `priority` overrides the
+    task's default (0 is served first).
+
+    Raises BudgetExceeded once the day's global or author budget is spent;
+    close to it, the task is queued at the lowest priority after
+    AI_BUDGET_THROTTLE_DELAY seconds.
+    """
+    budget = budget_state(blog.author_id)
+    if budget == 'exceeded':
+        raise BudgetExceeded('The daily AI budget has been spent; try again tomorrow.')
+    task, created = claim_summary_task(blog)
+    if created:
+        # Only when given: priority=None would override the task's own priority.
+        options = {} if priority is None else {'priority': priority}
+        if budget == 'throttle':
+            options = {'priority': 9, 'countdown': settings.AI_BUDGET_THROTTLE_DELAY}
+        args = [blog.id, task.id, settings.AI_STREAMING]
+        transaction.on_commit(lambda: generate_blog_summary_task.apply_async(args=args, **options))
+    return task, created
+
+
+def _auto_summary_key(blog_id):
+    return f'ai-auto-summary:{blog_id}'
+
+
+def summary_is_current(blog, content_hash=None):
+    """Whether the blog's BlogSummary was generated from its current content."""
+    content_hash = content_hash or summary_content_hash(blog)
+    return BlogSummary.objects.filter(blog=blog, content_hash=content_hash).exists()
+
+
+def schedule_auto_summary(blog):
+    """Queue a debounced summarization of a published blog whose summary is out of date.
+
+    Each call supersedes the previous one: the task runs AI_AUTO_SUMMARY_DEBOUNCE
+    seconds later and only if no newer call was made in the meantime and the
+    content is still the version it was scheduled for, so a burst of autosaves
+    produces a single summarization of the final text. Returns True if a task
+    was queued.
+    """
+    if not settings.AI_AUTO_SUMMARY or blog.status != 'published':
+        return False
+    content_hash = summary_content_hash(blog)
+    if summary_is_current(blog, content_hash):
+        return False
+    version = uuid.uuid4().hex
+    # Outlives the countdown comfortably, so a busy queue does not drop the check.
+    cache.set(_auto_summary_key(blog.id), version, timeout=settings.AI_AUTO_SUMMARY_DEBOUNCE * 10 + 60)
+    transaction.on_commit(lambda: auto_summarize_blog_task.apply_async(
+        args=[blog.id, content_hash, version], countdown=settings.AI_AUTO_SUMMARY_DEBOUNCE
+    ))
+    return True
+
+
+def summarize_blog(blog, service=None, task=None, final=True, stream=None):
+    """Run AI summarization for one blog, recording an AITask and updating its BlogSummary.
+
+    On a TransientAIError the task is left pending and the error re-raised so the
+    caller can retry, unless `final` is set, in which case the task falls back to
+    the local engine (AI_LOCAL_FALLBACK) or fails. Progress is published to
+    `stream` (a TaskStream), if given.
+    """
+    if task is None:
+        task, created = claim_summary_task(blog)
+        if not created:
+            return task, {'status': 'skipped', 'message': 'Summarization already in progress.'}
+    task.status = AITask.Status.PROCESSING
+    task.step, task.progress = 'started', max(task.progress, STEP_PROGRESS['started'])
+    task.save(update_fields=['status', 'step', 'progress', 'updated_at'])
+    if stream:
+        stream.reset()
+        stream.status(task.status)
+    progress = TaskProgress(task, stream)
+
+    service = service or AIService()
+    if task.result and 'usage' in task.result:
+        # Carry throttling, token counts and calls over from earlier attempts.
+        service.usage.update(task.result['usage'])
+        service.calls.extend(task.calls)
     try:
-        blog = Blog.objects.get(id=blog_id)
-        
-        # Create AI task record
-        task = AITask.objects.create(
-            blog=blog,
-            task_type='summarization',
-            status=AITask.Status.PROCESSING
-        )
-        
         # Generate summary using AI service
-        ai_service = AIService()
-        result = ai_service.generate_complete_summary(blog)
-        
-        if result['status'] == 'success':
-            # Update or create BlogSummary
-            blog_summary, created = BlogSummary.objects.update_or_create(
+        result = service.generate_complete_summary(blog, stream=stream, progress=progress)
+    except TransientAIError as e:
+        if not final:
+            task.status = AITask.Status.PENDING
+            task.step = 'retrying'
+            task.error = f'Retrying: {e}'
+            task.result = {'usage': service.usage}
+            task.calls = service.calls
+            task.save()
+            if stream:
+                stream.status(task.status, message=task.error)
+            raise
+        result = {'status': 'error', 'message': str(e), 'usage': service.usage}
+        if settings.AI_LOCAL_FALLBACK:
+            # Retries are exhausted; answer offline rather than fail.
+            result = service.local_summary(blog.content, 'local_fallback', fallback_reason=str(e))
+    except Exception as e:
+        result = {'status': 'error', 'message': str(e), 'usage': service.usage}
+
+    if result['status'] == 'success':
+        progress('saving')
+        # Update or create BlogSummary
+        try:
+            BlogSummary.objects.update_or_create(
                 blog=blog,
                 defaults={
                     'summary': result['summary'],
                     'key_points': result['key_points'],
-                    'sentiment': result['sentiment']
+                    'sentiment': result['sentiment'],
+                    'content_hash': task.content_hash,
+                    **dict(zip(('model', 'prompt_version'), summary_version())),
                 }
             )
-            
-            # Update task
-            task.status = AITask.Status.COMPLETED
-            task.result = result
-            task.completed_at = timezone.now()
-            task.save()
-            
-            return {'status': 'success', 'summary_id': blog_summary.id}
-        else:
-            # Task failed
-            task.status = AITask.Status.FAILED
-            task.error = result.get('message', 'Unknown error')
-            task.completed_at = timezone.now()
-            task.save()
-            
-            return {'status': 'error', 'message': result.get('message', 'Unknown error')}
+        except Exception as e:
+            # Don't leave the task active, or it would block this blog until the dedup timeout.
+            record_task_usage(task, service.calls)
+            AITask.objects.filter(pk=task.pk).update(
+                status=AITask.Status.FAILED, step='failed', error=str(e), completed_at=timezone.now(),
+                **{name: getattr(task, name) for name in USAGE_FIELDS}
+            )
+            if stream:
+                task.refresh_from_db()
+                stream.done(task)
+            raise
+        task.status = AITask.Status.COMPLETED
+        task.step, task.progress = 'completed', 100
+        task.error = ''
+    else:
+        # Task failed
+        task.status = AITask.Status.FAILED
+        task.step = 'failed'
+        task.error = result.get('message', 'Unknown error')
+    task.result = result
+    task.completed_at = timezone.now()
+    record_task_usage(task, service.calls)
+    task.save()
+    if stream:
+        stream.done(task)
+    return task, result
+
+
+@shared_task(
+    bind=True, max_retries=None, acks_late=True, priority=2,
+    soft_time_limit=settings.AI_TASK_TIME_LIMIT, time_limit=settings.AI_TASK_TIME_LIMIT + 30
+)
+def generate_blog_summary_task(self, blog_id, task_id=None, stream=False):
+    """Celery task to generate blog summary asynchronously.
+
+    Rate limits and transient provider errors are retried with backoff up to
+    AI_TASK_MAX_RETRIES times, reusing the same AITask. With `stream`, progress
+    and summary text are published to the task's event channel.
+    """
+    try:
+        blog = Blog.objects.get(id=blog_id)
     except Blog.DoesNotExist:
         return {'status': 'error', 'message': 'Blog not found'}
-    except Exception as e:
-        task.status = AITask.Status.FAILED
-        task.error = str(e)
-        task.completed_at = timezone.now()
-        task.save()
-        
-        return {'status': 'error', 'message': str(e)}
+
+    task = AITask.objects.filter(id=task_id).first() if task_id else None
+    if task is None:
+        task, created = claim_summary_task(blog)
+        if not created:
+            return {'status': 'skipped', 'task_id': task.id}
+    elif task.status not in AITask.ACTIVE_STATUSES:
+        return {'status': task.status, 'task_id': task.id}
+    retries = self.request.retries
+    try:
+        task, result = summarize_blog(
+            blog,
+            task=task,
+            final=retries >= settings.AI_TASK_MAX_RETRIES,
+            stream=TaskStream(task.id) if stream else None
+        )
+    except TransientAIError as e:
+        countdown = e.retry_after or random.uniform(0, settings.AI_TASK_RETRY_BACKOFF * 2 ** retries)
+        # Keep the wait well inside the dedup timeout, measured from now, so
+        # claim_summary_task does not take the task for abandoned meanwhile.
+        countdown = min(countdown, settings.AI_TASK_DEDUP_TIMEOUT / 2)
+        AITask.objects.filter(pk=task.pk).update(updated_at=timezone.now())
+        raise self.retry(args=[blog_id, task.id, stream], countdown=countdown, exc=e)
+
+    if result['status'] == 'success':
+        return {'status': 'success', 'summary_id': blog.ai_summary_record.id, 'task_id': task.id}
+    return {'status': 'error', 'message': task.error, 'task_id': task.id}
+
+
+@shared_task(acks_late=True, priority=6, soft_time_limit=60, time_limit=90)
+def auto_summarize_blog_task(blog_id, content_hash, version=None):
+    """Celery task to summarize a blog after an edit, unless a later edit superseded it.
+
+    The version check needs a cache shared with the web processes (CACHE_BACKEND
+    'redis'); without one it is skipped and the content hash check still drops
+    tasks for outdated content.
+    """
+    blog = Blog.objects.filter(id=blog_id, status='published').first()
+    if blog is None:
+        return {'status': 'skipped', 'message': 'Blog not found or not published.'}
+    latest = cache.get(_auto_summary_key(blog_id))
+    if (version and latest and latest != version) or summary_content_hash(blog) != content_hash:
+        return {'status': 'skipped', 'message': 'Superseded by a later edit.'}
+    if summary_is_current(blog, content_hash):
+        return {'status': 'skipped', 'message': 'Summary is up to date.'}
+    try:
+        # Nobody is waiting on it, so it yields to summaries requested from the API.
+        task, created = request_summary(blog, priority=6)
+    except BudgetExceeded as e:
+        return {'status': 'skipped', 'message': str(e)}
+    return {'status': 'queued' if created else 'skipped', 'task_id': task.id}
+
+
+@shared_task(soft_time_limit=1800, time_limit=1860)
+def archive_ai_tasks_task():
+    """Celery task to archive finished AI tasks past the retention window."""
+    from apps.ai_service.lifecycle import archive_tasks
+
+    return {'status': 'success', 'archived': archive_tasks()}
+
+
+# Runs for hours and resumes from its checkpoint, so no time limit and early ack
+# (a late ack would be redelivered after the broker's visibility timeout).
+@shared_task(priority=8)
+def run_summary_batch_task(job_id):
+    """Celery task to run (or resume) a batch summarization job."""
+    from apps.ai_service.batch import run_batch_job
+
+    job = run_batch_job(AIBatchJob.objects.get(id=job_id))
+    return {'status': job.status, 'processed': job.processed, 'throughput_per_minute': job.throughput_per_minute}
@@ -1,10 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AITaskViewSet
+from . import async_views
+from .views import AITaskViewSet, AIUsageViewSet
 
 router = DefaultRouter()
 router.register(r'tasks', AITaskViewSet, basename='ai-task')
+router.register(r'usage', AIUsageViewSet, basename='ai-usage')
 
 urlpatterns = [
+    path('tasks/<int:pk>/stream/', async_views.task_stream, name='ai-task-stream'),
     path('', include(router.urls)),
 ]
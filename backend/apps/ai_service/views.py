@@ -2,8 +2,11 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .models import AITask
-from .serializers import AITaskSerializer
+from django.conf import settings
+from .accounting import GROUP_BY, budget_state, spent_today, usage_report
+from .lifecycle import task_overview
+from .models import AITask, AIUsageDaily
+from .serializers import AITaskSerializer, AIUsageDailySerializer
 
 class AITaskViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for viewing AI tasks."""
@@ -13,16 +16,68 @@ class AITaskViewSet(viewsets.ReadOnlyModelViewSet):
     filterset_fields = ['blog', 'status', 'task_type']
     ordering = ['-created_at']
     
+    def _tasks_with_status(self, request, task_status):
+        """Paginated tasks with a status, or just their number with ?count_only=true."""
+        tasks = self.filter_queryset(self.get_queryset()).filter(status=task_status)
+        if request.query_params.get('count_only', '').lower() in ('1', 'true'):
+            return Response({'count': tasks.count()})
+        page = self.paginate_queryset(tasks)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+    
     @action(detail=False, methods=['get'])
     def pending(self, request):
         """Get pending AI tasks."""
-        tasks = self.queryset.filter(status=AITask.Status.PENDING)
-        serializer = self.get_serializer(tasks, many=True)
-        return Response(serializer.data)
+        return self._tasks_with_status(request, AITask.Status.PENDING)
     
     @action(detail=False, methods=['get'])
     def failed(self, request):
         """Get failed AI tasks."""
-        tasks = self.queryset.filter(status=AITask.Status.FAILED)
-        serializer = self.get_serializer(tasks, many=True)
-        return Response(serializer.data)
+        return self._tasks_with_status(request, AITask.Status.FAILED)
+    
+    @action(detail=False, methods=['get'])
+    def overview(self, request):
+        """Get task counts by status, the oldest pending task and tasks in progress."""
+        return Response(task_overview())
+
+
+class AIUsageViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet for AI token usage and spend; authors see their own, staff see everyone's."""
+    serializer_class = AIUsageDailySerializer
+    permission_classes = [IsAuthenticated]
+    filterset_fields = ['date', 'author', 'operation', 'model']
+    ordering = ['-date']
+    
+    def _author_id(self):
+        return None if self.request.user.is_staff else self.request.user.id
+    
+    def get_queryset(self):
+        rows = AIUsageDaily.objects.select_related('author')
+        if not self.request.user.is_staff:
+            rows = rows.filter(author=self.request.user)
+        return rows
+    
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """Get totals over the last ?days= (default 30) grouped by ?group_by=, and today's budgets."""
+        group_by = request.query_params.get('group_by', 'date')
+        try:
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            days = 0
+        if group_by not in GROUP_BY or not 1 <= days <= 366:
+            return Response(
+                {'error': f'group_by must be one of {", ".join(GROUP_BY)} and days between 1 and 366.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        author_id = self._author_id()
+        return Response({
+            'days': days,
+            'group_by': group_by,
+            'results': usage_report(days, group_by, author_id),
+            'budget': {
+                'state': budget_state(author_id),
+                'spent_today': spent_today(author_id),
+                'daily_budget': settings.AI_DAILY_BUDGET if author_id is None else settings.AI_AUTHOR_DAILY_BUDGET,
+            },
+        })
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import BlogDailyStats
+
+@admin.register(BlogDailyStats)
+class BlogDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ['blog', 'date', 'views', 'updated_at']
+    list_filter = ['date']
+    search_fields = ['blog__title']
+    readonly_fields = ['updated_at']
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('blogs', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogViewEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('viewed_at', models.DateTimeField(db_index=True)),
+                ('blog', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_events', to='blogs.blog')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['blog', 'viewed_at'], name='analytics_b_blog_id_f2c31c_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BlogDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('blog', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='blogs.blog')),
+            ],
+            options={
+                'verbose_name': 'Blog Daily Stats',
+                'verbose_name_plural': 'Blog Daily Stats',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date'], name='analytics_b_date_3fe090_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='blogdailystats',
+            constraint=models.UniqueConstraint(fields=('blog', 'date'), name='unique_blog_daily_stats'),
+        ),
+    ]
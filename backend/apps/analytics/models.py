@@ -0,0 +1,37 @@
+from django.db import models
+from apps.blogs.models import Blog
+
+class BlogViewEvent(models.Model):
+    """Raw blog view event, appended in batches and rolled up daily."""
+    blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='view_events')
+    viewed_at = models.DateTimeField(db_index=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['blog', 'viewed_at']),
+        ]
+    
+    def __str__(self):
+        return f"View of {self.blog_id} at {self.viewed_at}"
+
+
+class BlogDailyStats(models.Model):
+    """Per-day view rollup for a blog post."""
+    blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Blog Daily Stats'
+        verbose_name_plural = 'Blog Daily Stats'
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['blog', 'date'], name='unique_blog_daily_stats'),
+        ]
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.blog_id} on {self.date}: {self.views} views"
@@ -0,0 +1,17 @@
+from rest_framework import serializers
+from .models import BlogDailyStats
+
+class BlogDailyStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BlogDailyStats
+        fields = ['id', 'blog', 'date', 'views', 'updated_at']
+        read_only_fields = fields
+
+
+class TimeseriesQuerySerializer(serializers.Serializer):
+    blog = serializers.IntegerField(required=False)
+    author = serializers.IntegerField(required=False)
+    category = serializers.SlugField(required=False)
+    tag = serializers.SlugField(required=False)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
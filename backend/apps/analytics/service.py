@@ -0,0 +1,205 @@
+import atexit
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.blogs.models import Blog
+
+from .models import BlogViewEvent, BlogDailyStats
+
+logger = logging.getLogger(__name__)
+
+
+def _insert_events(events, batch_size):
+    """Insert (blog_id, viewed_at) pairs, skipping posts deleted since they were viewed; return how many."""
+    existing = set(Blog.objects.filter(id__in={blog_id for blog_id, _ in events}).values_list('id', flat=True))
+    rows = [BlogViewEvent(blog_id=blog_id, viewed_at=viewed_at) for blog_id, viewed_at in events if blog_id in existing]
+    BlogViewEvent.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+class LocalViewBuffer:
+    """In-process view buffer that appends events with batched inserts.
+
+    Events are written once batch_size have accumulated, or by a timer
+    flush_interval seconds after the first buffered event, so a quiet process
+    does not hold views in memory until its next request (or restart).
+    """
+
+    def __init__(self, batch_size, flush_interval):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._events = []
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def push(self, blog_id, viewed_at):
+        with self._lock:
+            self._events.append((blog_id, viewed_at))
+            due = len(self._events) >= self.batch_size
+            if not due and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if due:
+            self.flush()
+
+    def _flush_on_timer(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread opened its own connection; don't leak it.
+            connections.close_all()
+
+    def flush(self):
+        """Write buffered events to the database in one insert; never raises, as it runs inside requests."""
+        with self._lock:
+            events, self._events = self._events, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not events:
+            return 0
+        try:
+            return _insert_events(events, self.batch_size)
+        except Exception:
+            logger.exception('Could not write %d buffered view events', len(events))
+            return 0
+
+    def drain(self):
+        return self.flush()
+
+
+class RedisViewBuffer:
+    """Redis list buffer shared by all web workers, drained by Celery."""
+
+    KEY = 'analytics:view_events'
+
+    def __init__(self, url, batch_size):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.batch_size = batch_size
+
+    def push(self, blog_id, viewed_at):
+        self.client.rpush(self.KEY, json.dumps([blog_id, viewed_at.isoformat()]))
+
+    def flush(self):
+        return 0
+
+    def drain(self):
+        """Move buffered events into the database in batches."""
+        from django.utils.dateparse import parse_datetime
+
+        total = 0
+        while True:
+            pipe = self.client.pipeline()
+            pipe.lrange(self.KEY, 0, self.batch_size - 1)
+            pipe.ltrim(self.KEY, self.batch_size, -1)
+            items, _ = pipe.execute()
+            if not items:
+                break
+            events = []
+            for item in items:
+                blog_id, viewed_at = json.loads(item)
+                events.append((blog_id, parse_datetime(viewed_at)))
+            total += _insert_events(events, self.batch_size)
+            if len(items) < self.batch_size:
+                break
+        return total
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_view_buffer():
+    """Return the configured view buffer for this process."""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                if settings.ANALYTICS_VIEW_BUFFER == 'redis':
+                    _buffer = RedisViewBuffer(settings.REDIS_URL, settings.ANALYTICS_VIEW_BATCH_SIZE)
+                else:
+                    _buffer = LocalViewBuffer(
+                        settings.ANALYTICS_VIEW_BATCH_SIZE,
+                        settings.ANALYTICS_VIEW_FLUSH_INTERVAL
+                    )
+                    atexit.register(_buffer.flush)
+    return _buffer
+
+
+def record_view(blog_id, viewed_at=None):
+    """Append a view event for a blog post."""
+    get_view_buffer().push(blog_id, viewed_at or timezone.now())
+
+
+def rollup_daily_stats(since=None):
+    """Roll raw view events up into BlogDailyStats, one upsert per (blog, day).
+
+    Counts are recomputed from raw events for every day on or after `since`
+    (a date), so re-running the rollup is idempotent.
+    """
+    get_view_buffer().drain()
+
+    if since is None:
+        since = timezone.now().date() - timedelta(days=settings.ANALYTICS_ROLLUP_LOOKBACK_DAYS)
+    start = timezone.make_aware(datetime.combine(since, datetime.min.time()))
+
+    rows = (
+        BlogViewEvent.objects
+        .filter(viewed_at__gte=start)
+        .annotate(day=TruncDate('viewed_at'))
+        .values('blog_id', 'day')
+        .annotate(views=Count('id'))
+        .order_by()
+    )
+    stats = [BlogDailyStats(blog_id=row['blog_id'], date=row['day'], views=row['views']) for row in rows]
+    BlogDailyStats.objects.bulk_create(
+        stats,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['blog', 'date'],
+        update_fields=['views', 'updated_at']
+    )
+    return len(stats)
+
+
+def purge_view_events(retention_days=None):
+    """Delete raw view events older than the retention window."""
+    if retention_days is None:
+        retention_days = settings.ANALYTICS_RAW_RETENTION_DAYS
+    # Never purge days the rollup may still need to recompute.
+    retention_days = max(retention_days, settings.ANALYTICS_ROLLUP_LOOKBACK_DAYS + 1)
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    deleted, _ = BlogViewEvent.objects.filter(viewed_at__lt=cutoff).delete()
+    return deleted
+
+
+def views_timeseries(blog=None, author=None, category=None, tag=None, start=None, end=None):
+    """Daily view totals from the rollup table, optionally filtered."""
+    stats = BlogDailyStats.objects.all()
+    if blog:
+        stats = stats.filter(blog_id=blog)
+    if author:
+        stats = stats.filter(blog__author_id=author)
+    if category:
+        stats = stats.filter(blog__category__slug=category)
+    if tag:
+        stats = stats.filter(blog__tags__slug=tag)
+    if start:
+        stats = stats.filter(date__gte=start)
+    if end:
+        stats = stats.filter(date__lte=end)
+    return list(
+        stats.values('date')
+        .annotate(views=Sum('views'))
+        .order_by('date')
+    )
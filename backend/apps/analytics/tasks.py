@@ -0,0 +1,15 @@
+from celery import shared_task
+from apps.analytics.service import rollup_daily_stats, purge_view_events
+
+@shared_task(acks_late=True, soft_time_limit=600, time_limit=660)
+def rollup_daily_stats_task():
+    """Celery task to roll raw view events up into daily stats."""
+    rows = rollup_daily_stats()
+    return {'status': 'success', 'rows': rows}
+
+
+@shared_task(soft_time_limit=1800, time_limit=1860)
+def purge_view_events_task():
+    """Celery task to delete raw view events past the retention window."""
+    deleted = purge_view_events()
+    return {'status': 'success', 'deleted': deleted}
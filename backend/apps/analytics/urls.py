@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import BlogDailyStatsViewSet
+
+router = DefaultRouter()
+router.register(r'daily-stats', BlogDailyStatsViewSet, basename='blog-daily-stats')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
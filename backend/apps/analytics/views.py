@@ -0,0 +1,26 @@
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from .models import BlogDailyStats
+from .serializers import BlogDailyStatsSerializer, TimeseriesQuerySerializer
+from .service import views_timeseries
+
+
+class BlogDailyStatsViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet for daily blog view rollups."""
+    queryset = BlogDailyStats.objects.all()
+    serializer_class = BlogDailyStatsSerializer
+    permission_classes = [IsAuthenticated]
+    filterset_fields = ['blog', 'date']
+    ordering = ['-date']
+    
+    @action(detail=False, methods=['get'])
+    def timeseries(self, request):
+        """Get daily view totals filtered by blog, author, category or tag."""
+        query = TimeseriesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        series = views_timeseries(**query.validated_data)
+        return Response([
+            {'date': row['date'], 'views': row['views']} for row in series
+        ])
@@ -24,7 +24,7 @@ class BlogAdmin(admin.ModelAdmin):
 @admin.register(BlogSummary)
 class BlogSummaryAdmin(admin.ModelAdmin):
     list_display = ['blog', 'sentiment', 'generated_at']
-    readonly_fields = ['generated_at', 'updated_at']
+    readonly_fields = ['content_hash', 'generated_at', 'updated_at']
 
 
 @admin.register(Comment)
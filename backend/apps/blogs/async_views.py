@@ -0,0 +1,178 @@
+"""
+Async read-only endpoints for blogs, categories and tags.
+
+These mirror the public list/retrieve actions of the DRF viewsets but run as
+native Django async views, so under an ASGI server a slow client or a cache
+round-trip suspends a coroutine instead of blocking a whole worker. Errors
+are answered in DRF's JSON shape, e.g. {"detail": "Not found."} with a 404.
+
+Payloads are cached for ASYNC_READ_CACHE_TIMEOUT seconds under the version
+of the two-tier cache's 'blogs' namespace, so bulk writes that skip the
+model signals can drop them all with `two_tier_cache().bump('blogs')`.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch, Q
+from django.http import Http404, HttpResponseNotAllowed, JsonResponse
+
+from config.cache import two_tier_cache
+
+from .models import Blog, Category, Tag
+from .serializers import BlogListSerializer, BlogDetailSerializer, CategorySerializer, TagSerializer
+
+LIST_FILTERS = ['status', 'category', 'author', 'is_featured']
+# BlogViewSet.ordering_fields and BlogViewSet.ordering.
+ORDERING_FIELDS = ['created_at', 'published_at', 'views_count']
+DEFAULT_ORDERING = ['-published_at', '-created_at']
+
+
+def require_safe(view):
+    """Async-aware equivalent of django.views.decorators.http.require_safe."""
+    @wraps(view)
+    async def inner(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(['GET', 'HEAD'])
+        return await view(request, *args, **kwargs)
+    return inner
+
+
+def _blog_queryset():
+    return (
+        Blog.objects
+        .select_related('featured_image_asset')
+        .prefetch_related(Prefetch('tags', queryset=Tag.objects.only('id')))
+        .order_by(*DEFAULT_ORDERING)
+    )
+
+
+def _ordering(request):
+    """Parse `?ordering=` like DRF's OrderingFilter, ignoring unknown fields."""
+    terms = [term.strip() for term in request.GET.get('ordering', '').split(',')]
+    ordering = [term for term in terms if term.lstrip('-') in ORDERING_FIELDS]
+    return ordering or DEFAULT_ORDERING
+
+
+@sync_to_async
+def _serialize(serializer_class, instance, request, many=False):
+    # Serializers may fill the two-tier cache from the database on a miss.
+    return serializer_class(instance, many=many, context={'request': request}).data
+
+
+async def _cached(request, build):
+    """Serve a JSON payload from the cache, building it on a miss."""
+    # The version is normally an in-process L1 hit, so this does not block.
+    version = two_tier_cache().version('blogs')
+    key = f'async-read:v{version}:{request.get_full_path()}'
+    payload = await cache.aget(key)
+    if payload is None:
+        try:
+            payload = await build()
+        except Http404 as exc:
+            detail = str(exc) if exc.args else 'Not found.'
+            return JsonResponse({'detail': detail}, status=404)
+        await cache.aset(key, payload, settings.ASYNC_READ_CACHE_TIMEOUT)
+    return JsonResponse(payload, safe=False)
+
+
+async def _paginate(request, queryset, serializer_class):
+    """Return a payload shaped like DRF's PageNumberPagination."""
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    try:
+        page = int(request.GET.get('page', 1))
+        if page < 1:
+            raise ValueError
+    except ValueError:
+        raise Http404('Invalid page.')
+
+    count = await queryset.acount()
+    start = (page - 1) * page_size
+    if start and start >= count:
+        raise Http404('Invalid page.')
+    items = [obj async for obj in queryset[start:start + page_size]]
+
+    def page_url(number):
+        params = request.GET.copy()
+        params['page'] = number
+        return request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+
+    return {
+        'count': count,
+        'next': page_url(page + 1) if start + page_size < count else None,
+        'previous': page_url(page - 1) if page > 1 else None,
+        'results': await _serialize(serializer_class, items, request, many=True),
+    }
+
+
+@require_safe
+async def blog_list(request):
+    """List blogs with the same filters, search, ordering and pagination as BlogViewSet.list."""
+    async def build():
+        queryset = _blog_queryset()
+        for field in LIST_FILTERS:
+            value = request.GET.get(field)
+            if value not in (None, ''):
+                if field == 'is_featured':
+                    value = value.lower() in ('true', '1')
+                queryset = queryset.filter(**{field: value})
+        search = request.GET.get('search')
+        if search:
+            queryset = queryset.filter(
+                Q(title__icontains=search) | Q(description__icontains=search) | Q(content__icontains=search)
+            )
+        queryset = queryset.order_by(*_ordering(request))
+        return await _paginate(request, queryset, BlogListSerializer)
+
+    return await _cached(request, build)
+
+
+@require_safe
+async def blog_detail(request, pk):
+    """Retrieve a single blog with comments and AI summary."""
+    async def build():
+        queryset = (
+            Blog.objects
+            .select_related('author', 'category', 'featured_image_asset', 'ai_summary_record')
+            .prefetch_related('tags', 'comments__author')
+        )
+        try:
+            blog = await queryset.aget(pk=pk)
+        except Blog.DoesNotExist:
+            raise Http404
+        return await _serialize(BlogDetailSerializer, blog, request)
+
+    return await _cached(request, build)
+
+
+@require_safe
+async def category_list(request):
+    """List categories."""
+    async def build():
+        return await _paginate(request, Category.objects.order_by('name'), CategorySerializer)
+
+    return await _cached(request, build)
+
+
+@require_safe
+async def tag_list(request):
+    """List tags."""
+    async def build():
+        return await _paginate(request, Tag.objects.order_by('name'), TagSerializer)
+
+    return await _cached(request, build)
+
+
+@require_safe
+async def tag_blogs(request, slug):
+    """List published blogs with a tag."""
+    async def build():
+        try:
+            tag = await Tag.objects.aget(slug=slug)
+        except Tag.DoesNotExist:
+            raise Http404
+        blogs = [blog async for blog in _blog_queryset().filter(tags=tag, status='published')]
+        return await _serialize(BlogListSerializer, blogs, request, many=True)
+
+    return await _cached(request, build)
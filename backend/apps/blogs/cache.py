@@ -0,0 +1,36 @@
+from config.cache import two_tier_cache
+from .models import Category, Tag
+
+
+def cached_categories():
+    """All categories as serialized dicts, from the two-tier cache."""
+    from .serializers import CategorySerializer
+    return two_tier_cache().get_or_set(
+        'categories', 'all',
+        lambda: [dict(item) for item in CategorySerializer(Category.objects.all(), many=True).data]
+    )
+
+
+def category_by_id(category_id):
+    if category_id is None:
+        return None
+    by_id = two_tier_cache().get_or_set(
+        'categories', 'by_id', lambda: {item['id']: item for item in cached_categories()}
+    )
+    return by_id.get(category_id)
+
+
+def cached_tags():
+    """All tags as serialized dicts, from the two-tier cache."""
+    from .serializers import TagSerializer
+    return two_tier_cache().get_or_set(
+        'tags', 'all',
+        lambda: [dict(item) for item in TagSerializer(Tag.objects.all(), many=True).data]
+    )
+
+
+def tag_by_id(tag_id):
+    by_id = two_tier_cache().get_or_set(
+        'tags', 'by_id', lambda: {item['id']: item for item in cached_tags()}
+    )
+    return by_id.get(tag_id)
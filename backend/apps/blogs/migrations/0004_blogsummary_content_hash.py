@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0003_blog_featured_image_asset'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogsummary',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
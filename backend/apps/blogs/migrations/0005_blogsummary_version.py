@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0004_blogsummary_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogsummary',
+            name='model',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='blogsummary',
+            name='prompt_version',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+    ]
@@ -35,6 +35,9 @@ class Blog(models.Model):
     description = models.CharField(max_length=300, blank=True)
     content = models.TextField()
     featured_image = models.ImageField(upload_to='blog_images/', blank=True, null=True)
+    featured_image_asset = models.ForeignKey(
+        'media.ImageAsset', on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='blogs')
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name='blogs')
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.DRAFT)
@@ -74,6 +77,11 @@ class BlogSummary(models.Model):
     summary = models.TextField()
     key_points = models.JSONField(default=list)
     sentiment = models.CharField(max_length=20, blank=True)  # positive, negative, neutral
+    # Hash of the content (and model/prompt version) the summary was generated from.
+    content_hash = models.CharField(max_length=64, blank=True)
+    # Model and prompt version of content_hash, so batch runs can find summaries made with older ones.
+    model = models.CharField(max_length=100, blank=True)
+    prompt_version = models.CharField(max_length=20, blank=True)
     generated_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
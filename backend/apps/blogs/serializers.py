@@ -1,4 +1,7 @@
 from rest_framework import serializers
+from apps.media.service import variant_urls
+from apps.users.cache import user_label
+from .cache import category_by_id, tag_by_id
 from .models import Blog, Category, BlogSummary, Comment, Tag
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -32,15 +35,30 @@ class CommentSerializer(serializers.ModelSerializer):
 
 
 class BlogListSerializer(serializers.ModelSerializer):
-    author = serializers.StringRelatedField()
-    category = CategorySerializer(read_only=True)
-    tags = TagSerializer(many=True, read_only=True)
+    # Author, category and tags come from the two-tier cache rather than joined rows.
+    author = serializers.SerializerMethodField()
+    category = serializers.SerializerMethodField()
+    tags = serializers.SerializerMethodField()
+    featured_image_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = Blog
-        fields = ['id', 'title', 'slug', 'description', 'featured_image', 'author', 
-                  'category', 'tags', 'status', 'views_count', 'is_featured', 'created_at', 'published_at']
+        fields = ['id', 'title', 'slug', 'description', 'featured_image', 'featured_image_variants',
+                  'author', 'category', 'tags', 'status', 'views_count', 'is_featured', 'created_at',
+                  'published_at']
         read_only_fields = ['id', 'slug', 'created_at']
+    
+    def get_author(self, obj):
+        return user_label(obj.author_id)
+    
+    def get_category(self, obj):
+        return category_by_id(obj.category_id)
+    
+    def get_tags(self, obj):
+        return [tag_by_id(tag.id) for tag in obj.tags.all()]
+    
+    def get_featured_image_variants(self, obj):
+        return variant_urls(obj.featured_image_asset)
 
 
 class BlogDetailSerializer(serializers.ModelSerializer):
@@ -66,12 +84,37 @@ class BlogCreateUpdateSerializer(serializers.ModelSerializer):
         required=False,
         allow_empty=True
     )
+    featured_image_upload_id = serializers.UUIDField(write_only=True, required=False)
     
     class Meta:
         model = Blog
-        fields = ['title', 'description', 'content', 'featured_image', 
+        fields = ['title', 'description', 'content', 'featured_image', 'featured_image_upload_id',
                   'category_id', 'tag_ids', 'status', 'is_featured']
     
+    def validate_featured_image_upload_id(self, value):
+        from apps.media.models import ChunkedUpload
+        try:
+            upload = ChunkedUpload.objects.get(
+                id=value,
+                user=self.context['request'].user,
+                status=ChunkedUpload.Status.COMPLETE
+            )
+        except ChunkedUpload.DoesNotExist:
+            raise serializers.ValidationError('No completed upload with this id.')
+        # The upload bypassed ImageField, so check it is an image before attaching it.
+        from apps.media.uploads import UploadError, verify_image
+        try:
+            verify_image(upload)
+        except UploadError as e:
+            raise serializers.ValidationError(str(e))
+        return upload
+    
+    def validate(self, data):
+        upload = data.pop('featured_image_upload_id', None)
+        if upload is not None:
+            data['featured_image'] = upload.file
+        return data
+    
     def to_internal_value(self, data):
         import json
         from django.http import QueryDict
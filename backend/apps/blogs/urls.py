@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import BlogViewSet, CategoryViewSet, TagViewSet, CommentViewSet
+from . import async_views
 
 router = DefaultRouter()
 router.register(r'blogs', BlogViewSet, basename='blog')
@@ -8,6 +9,16 @@ router.register(r'categories', CategoryViewSet, basename='category')
 router.register(r'tags', TagViewSet, basename='tag')
 router.register(r'comments', CommentViewSet, basename='comment')
 
+# Async read endpoints, served natively when running under ASGI (config.asgi)
+async_urlpatterns = [
+    path('blogs/', async_views.blog_list, name='async-blog-list'),
+    path('blogs/<int:pk>/', async_views.blog_detail, name='async-blog-detail'),
+    path('categories/', async_views.category_list, name='async-category-list'),
+    path('tags/', async_views.tag_list, name='async-tag-list'),
+    path('tags/<slug:slug>/blogs/', async_views.tag_blogs, name='async-tag-blogs'),
+]
+
 urlpatterns = [
+    path('async/', include(async_urlpatterns)),
     path('', include(router.urls)),
 ]
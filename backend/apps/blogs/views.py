@@ -2,7 +2,12 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Prefetch
+from django.urls import reverse
 from django.utils import timezone
+from .cache import cached_categories, cached_tags, category_by_id, tag_by_id
 from .models import Blog, Category, BlogSummary, Comment, Tag
 from .serializers import (
     BlogListSerializer, BlogDetailSerializer, BlogCreateUpdateSerializer,
@@ -10,7 +15,27 @@ from .serializers import (
 )
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CachedListMixin:
+    """Serve unfiltered list/retrieve requests from the two-tier cache."""
+    
+    def get_cached_items(self):
+        raise NotImplementedError
+    
+    def list(self, request, *args, **kwargs):
+        if set(request.query_params) - {'page'}:
+            return super().list(request, *args, **kwargs)
+        page = self.paginate_queryset(self.get_cached_items())
+        return self.get_paginated_response(page)
+    
+    def retrieve(self, request, *args, **kwargs):
+        slug = kwargs[self.lookup_field]
+        for item in self.get_cached_items():
+            if item['slug'] == slug:
+                return Response(item)
+        return super().retrieve(request, *args, **kwargs)
+
+
+class CategoryViewSet(CachedListMixin, viewsets.ModelViewSet):
     """ViewSet for blog categories."""
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
@@ -23,17 +48,28 @@ class CategoryViewSet(viewsets.ModelViewSet):
         else:
             permission_classes = [IsAuthenticatedOrReadOnly]
         return [permission() for permission in permission_classes]
+    
+    def get_cached_items(self):
+        return cached_categories()
 
 
 class BlogViewSet(viewsets.ModelViewSet):
     """ViewSet for blog posts with AI summarization."""
-    queryset = Blog.objects.select_related('author', 'category').prefetch_related('tags', 'comments')
+    queryset = Blog.objects.select_related('author', 'category', 'featured_image_asset').prefetch_related('tags', 'comments')
     permission_classes = [IsAuthenticatedOrReadOnly]
     filterset_fields = ['status', 'category', 'author', 'is_featured']
     search_fields = ['title', 'description', 'content']
     ordering_fields = ['created_at', 'published_at', 'views_count']
     ordering = ['-published_at', '-created_at']
     
+    def get_queryset(self):
+        if self.action in ['list', 'featured', 'latest', 'semantic_search']:
+            # BlogListSerializer reads author, category and tags from the two-tier cache.
+            return Blog.objects.select_related('featured_image_asset').prefetch_related(
+                Prefetch('tags', queryset=Tag.objects.only('id'))
+            )
+        return super().get_queryset()
+    
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return BlogDetailSerializer
@@ -53,6 +89,8 @@ class BlogViewSet(viewsets.ModelViewSet):
         if blog.status == 'published':
             blog.published_at = timezone.now()
             blog.save()
+            from apps.ai_service.tasks import schedule_auto_summary
+            schedule_auto_summary(blog)
     
     def perform_update(self, serializer):
         # Check if user is the author or admin
@@ -60,11 +98,15 @@ class BlogViewSet(viewsets.ModelViewSet):
         if blog.author != self.request.user and not self.request.user.is_staff:
             from rest_framework.exceptions import PermissionDenied
             raise PermissionDenied("You don't have permission to edit this blog.")
+        was_published, old_content = blog.status == 'published', blog.content
         
         blog = serializer.save()
         if blog.status == 'published' and not blog.published_at:
             blog.published_at = timezone.now()
             blog.save()
+        if blog.status == 'published' and (not was_published or blog.content != old_content):
+            from apps.ai_service.tasks import schedule_auto_summary
+            schedule_auto_summary(blog)
     
     def perform_destroy(self, instance):
         # Check if user is the author or admin
@@ -79,13 +121,16 @@ class BlogViewSet(viewsets.ModelViewSet):
         blog = self.get_object()
         blog.views_count += 1
         blog.save(update_fields=['views_count'])
+        from apps.analytics.service import record_view
+        record_view(blog.id)
         return Response({'views_count': blog.views_count})
     
-    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def generate_summary(self, request, pk=None):
-        """Generate AI summary for the blog post."""
+        """Queue AI summary generation; repeated requests return the in-flight task."""
         blog = self.get_object()
-        from apps.ai_service.tasks import generate_blog_summary_task
+        from apps.ai_service.accounting import BudgetExceeded
+        from apps.ai_service.tasks import request_summary
         
         # Check if user has permission
         if blog.author != request.user and not request.user.is_staff:
@@ -94,13 +139,28 @@ class BlogViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Trigger background task
-        generate_blog_summary_task.delay(blog.id)
+        # Trigger background task (deduplicated per blog and content version)
+        try:
+            task, created = request_summary(blog)
+        except BudgetExceeded as e:
+            return Response({'error': str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        status_url = request.build_absolute_uri(reverse('ai-task-detail', args=[task.id]))
+        data = {
+            'status': 'Summary generation started' if created else 'Summary generation already in progress',
+            'blog_id': blog.id,
+            'task_id': task.id,
+            'task_status': task.status,
+            'status_url': status_url
+        }
+        # Only under ASGI: a sync worker would be held for the whole stream.
+        if settings.AI_STREAMING and isinstance(request._request, ASGIRequest):
+            data['stream_url'] = request.build_absolute_uri(reverse('ai-task-stream', args=[task.id]))
         
-        return Response({
-            'status': 'Summary generation started',
-            'blog_id': blog.id
-        })
+        return Response(
+            data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={'Location': status_url}
+        )
     
     @action(detail=True, methods=['post'])
     def comment(self, request, pk=None):
@@ -123,30 +183,84 @@ class BlogViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def featured(self, request):
         """Get featured blogs."""
-        blogs = self.queryset.filter(is_featured=True, status='published')
+        blogs = self.get_queryset().filter(is_featured=True, status='published')
         serializer = self.get_serializer(blogs, many=True)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def latest(self, request):
         """Get latest published blogs."""
-        blogs = self.queryset.filter(status='published')[:5]
+        blogs = self.get_queryset().filter(status='published')[:5]
         serializer = self.get_serializer(blogs, many=True)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'], url_path='semantic-search')
+    def semantic_search(self, request):
+        """Search published blogs by meaning (?q=, ?limit= up to 50), most similar first."""
+        from apps.search.service import SemanticIndexUnavailable, semantic_search
+        
+        query = request.query_params.get('q', '').strip()
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+        except ValueError:
+            limit = 10
+        if not query:
+            return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            hits = semantic_search(query, limit)
+        except SemanticIndexUnavailable as e:
+            return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        
+        blogs = self.get_queryset().filter(id__in=[blog_id for blog_id, _ in hits], status='published').in_bulk()
+        ranked = [(blogs[blog_id], score) for blog_id, score in hits if blog_id in blogs][:limit]
+        results = self.get_serializer([blog for blog, _ in ranked], many=True).data
+        for item, (_, score) in zip(results, ranked):
+            item['score'] = round(score, 4)
+        return Response({'query': query, 'count': len(results), 'results': results})
+    
+    @action(detail=False, methods=['post'], url_path='suggest-tags')
+    def suggest_tags(self, request):
+        """Suggest tags and a category for a post's title, description and content."""
+        from apps.search.embedding import document_text
+        from apps.search.suggest import SuggesterUnavailable, suggest_for_text
+        
+        fields = {name: str(request.data.get(name) or '') for name in ('title', 'description', 'content')}
+        if not any(value.strip() for value in fields.values()):
+            return Response({'error': 'title, description or content is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            tags, categories = suggest_for_text(document_text(**fields))
+        except SuggesterUnavailable as e:
+            return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        
+        # Labels deleted since the model was trained are dropped.
+        def with_scores(items, lookup):
+            return [{**lookup(item_id), 'score': round(score, 4)} for item_id, score in items if lookup(item_id)]
+        
+        return Response({
+            'tags': with_scores(tags, tag_by_id),
+            'categories': with_scores(categories, category_by_id),
+        })
 
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(CachedListMixin, viewsets.ModelViewSet):
     """ViewSet for blog tags."""
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = 'slug'
     
+    def get_cached_items(self):
+        return cached_tags()
+    
     @action(detail=True, methods=['get'])
     def blogs(self, request, slug=None):
         """Get all blogs with this tag."""
         tag = self.get_object()
-        blogs = tag.blogs.filter(status='published')
+        blogs = (
+            tag.blogs.filter(status='published')
+            .select_related('featured_image_asset')
+            .prefetch_related(Prefetch('tags', queryset=Tag.objects.only('id')))
+        )
         serializer = BlogListSerializer(blogs, many=True)
         return Response(serializer.data)
 
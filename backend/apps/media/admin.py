@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import ImageAsset
+
+@admin.register(ImageAsset)
+class ImageAssetAdmin(admin.ModelAdmin):
+    list_display = ['original', 'width', 'height', 'status', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['original', 'content_hash']
+    readonly_fields = ['content_hash', 'variants', 'placeholder', 'created_at', 'updated_at']
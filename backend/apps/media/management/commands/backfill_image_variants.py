@@ -0,0 +1,37 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from apps.media.service import attach_image
+from apps.media.tasks import IMAGE_FIELDS, backfill_image_variants_task
+
+
+class Command(BaseCommand):
+    help = 'Generate responsive variants for existing featured and profile images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--sync', action='store_true',
+            help='Process images in this process instead of queueing Celery tasks.'
+        )
+
+    def handle(self, *args, **options):
+        if not options['sync']:
+            result = backfill_image_variants_task.delay(options['batch_size'])
+            self.stdout.write(f"Backfill queued as task {result.id}")
+            return
+
+        processed = 0
+        for model_label, field_name, asset_field_name in IMAGE_FIELDS:
+            model = apps.get_model(model_label)
+            pending = (
+                model.objects
+                .exclude(**{field_name: ''})
+                .exclude(**{f'{field_name}__isnull': True})
+                .filter(**{f'{asset_field_name}__isnull': True})
+            )
+            for instance in pending.iterator(chunk_size=options['batch_size']):
+                asset = attach_image(instance, field_name, asset_field_name)
+                processed += 1
+                self.stdout.write(f"  {model_label} {instance.pk}: {asset.status}")
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} images"))
@@ -0,0 +1,62 @@
+import uuid
+from django.conf import settings
+from django.db import models
+
+class ImageAsset(models.Model):
+    """Processed image keyed by the content hash of its original upload."""
+    
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        READY = 'ready', 'Ready'
+        FAILED = 'failed', 'Failed'
+    
+    content_hash = models.CharField(max_length=64, unique=True)
+    original = models.CharField(max_length=255)  # storage name of the original upload
+    width = models.PositiveIntegerField(default=0)
+    height = models.PositiveIntegerField(default=0)
+    variants = models.JSONField(default=dict)  # {format: {width: storage name}}
+    placeholder = models.TextField(blank=True)  # LQIP data URI
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.original} ({self.width}x{self.height})"
+
+
+class ChunkedUpload(models.Model):
+    """Resumable upload assembled from sequential chunks."""
+    
+    class Status(models.TextChoices):
+        UPLOADING = 'uploading', 'Uploading'
+        COMPLETE = 'complete', 'Complete'
+        FAILED = 'failed', 'Failed'
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='chunked_uploads')
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    checksum = models.CharField(max_length=64)  # expected SHA-256 of the whole file
+    offset = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.UPLOADING)
+    file = models.CharField(max_length=255, blank=True)  # storage name once complete
+    multipart_id = models.CharField(max_length=255, blank=True)  # S3 multipart UploadId
+    parts = models.JSONField(default=list)  # S3 [{PartNumber, ETag, ChecksumSHA256}]
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.total_size})"
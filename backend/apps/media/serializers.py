@@ -0,0 +1,13 @@
+from rest_framework import serializers
+from .models import ChunkedUpload
+
+class ChunkedUploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChunkedUpload
+        fields = ['id', 'filename', 'total_size', 'chunk_size', 'checksum', 'offset',
+                  'status', 'file', 'error', 'created_at', 'updated_at', 'completed_at']
+        read_only_fields = ['id', 'chunk_size', 'offset', 'status', 'file', 'error',
+                            'created_at', 'updated_at', 'completed_at']
+        extra_kwargs = {
+            'checksum': {'min_length': 64, 'max_length': 64},
+        }
@@ -0,0 +1,149 @@
+import base64
+import hashlib
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageFilter, ImageOps
+
+from .models import ImageAsset
+
+# Pillow encoder settings for each variant format.
+VARIANT_FORMATS = {
+    'webp': {'format': 'WEBP', 'options': {'quality': 80, 'method': 4}},
+    'jpeg': {'format': 'JPEG', 'options': {'quality': 82, 'optimize': True, 'progressive': True}},
+}
+# Gaussian blur of the placeholder, in pixels of the MEDIA_PLACEHOLDER_WIDTH thumbnail.
+PLACEHOLDER_BLUR_RADIUS = 1
+
+
+def hash_file(file, chunk_size=64 * 1024):
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(chunk_size), b''):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def _load_image(file):
+    """Open an image, apply EXIF orientation and drop all metadata."""
+    image = Image.open(file)
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+    # Re-creating the image from pixel data discards EXIF, ICC and XMP blocks.
+    clean = Image.new(image.mode, image.size)
+    clean.paste(image)
+    return clean
+
+
+def _encode(image, fmt):
+    spec = VARIANT_FORMATS[fmt]
+    if spec['format'] == 'JPEG' and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+        image = background
+    buffer = BytesIO()
+    image.save(buffer, spec['format'], **spec['options'])
+    return buffer.getvalue()
+
+
+def build_placeholder(image, width=None):
+    """Return a tiny blurred JPEG data URI to show while variants load."""
+    width = width or settings.MEDIA_PLACEHOLDER_WIDTH
+    thumb = image.copy()
+    thumb.thumbnail((width, width))
+    # Blurred, so the browser's upscaling shows soft shapes rather than blocky pixels.
+    thumb = thumb.filter(ImageFilter.GaussianBlur(PLACEHOLDER_BLUR_RADIUS))
+    data = _encode(thumb, 'jpeg')
+    return 'data:image/jpeg;base64,' + base64.b64encode(data).decode('ascii')
+
+
+def generate_variants(image, content_hash):
+    """Write resized variants for each configured width and format."""
+    variants = {fmt: {} for fmt in VARIANT_FORMATS}
+    prefix = f"variants/{content_hash[:2]}/{content_hash}"
+    for width in settings.MEDIA_VARIANT_WIDTHS:
+        if width > image.width and variants['jpeg']:
+            break
+        resized = image.copy()
+        if width < image.width:
+            height = round(image.height * width / image.width)
+            resized = resized.resize((width, height), Image.LANCZOS)
+        for fmt in VARIANT_FORMATS:
+            name = f"{prefix}/{resized.width}.{fmt}"
+            if not default_storage.exists(name):
+                name = default_storage.save(name, ContentFile(_encode(resized, fmt)))
+            variants[fmt][str(resized.width)] = name
+    return variants
+
+
+def process_image(field_file):
+    """Process an uploaded image, reusing an existing asset with identical content."""
+    with field_file.open('rb') as file:
+        content_hash = hash_file(file)
+        asset = ImageAsset.objects.filter(content_hash=content_hash).first()
+        if asset and asset.status == ImageAsset.Status.READY:
+            return asset
+
+        if asset is None:
+            asset, _ = ImageAsset.objects.get_or_create(
+                content_hash=content_hash,
+                defaults={'original': field_file.name}
+            )
+        try:
+            image = _load_image(file)
+            asset.width, asset.height = image.size
+            asset.variants = generate_variants(image, content_hash)
+            asset.placeholder = build_placeholder(image)
+            asset.status = ImageAsset.Status.READY
+            asset.error = ''
+        except Exception as e:
+            asset.status = ImageAsset.Status.FAILED
+            asset.error = str(e)
+        asset.save()
+    return asset
+
+
+def attach_image(instance, field_name, asset_field_name):
+    """Process `instance.<field_name>` and link the resulting asset.
+
+    Identical uploads are deduplicated: the instance is pointed at the stored
+    original of the existing asset and the redundant copy is deleted.
+    """
+    field_file = getattr(instance, field_name)
+    if not field_file:
+        return None
+
+    model = type(instance)
+    asset = process_image(field_file)
+    updates = {asset_field_name: asset}
+    duplicate = None
+    if asset.original != field_file.name:
+        duplicate = field_file.name
+        updates[field_name] = asset.original
+
+    # Queryset update avoids re-triggering post_save processing.
+    model.objects.filter(pk=instance.pk).update(**updates)
+
+    if duplicate and not model.objects.filter(**{field_name: duplicate}).exists():
+        default_storage.delete(duplicate)
+    return asset
+
+
+def variant_urls(asset):
+    """Serializable variant URLs for an asset, or None if not processed yet."""
+    if asset is None or asset.status != ImageAsset.Status.READY:
+        return None
+    return {
+        'width': asset.width,
+        'height': asset.height,
+        'placeholder': asset.placeholder,
+        'variants': {
+            fmt: {width: default_storage.url(name) for width, name in sizes.items()}
+            for fmt, sizes in asset.variants.items()
+        },
+    }
@@ -0,0 +1,55 @@
+from django.db import transaction
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+from apps.blogs.models import Blog
+from apps.users.models import User
+
+
+def _remember_image(instance, field_name):
+    # Read from __dict__ so a deferred image field is not loaded.
+    value = instance.__dict__.get(field_name)
+    instance._stored_image = getattr(value, 'name', value)
+
+
+def _queue_processing(instance, update_fields, model_label, field_name, asset_field_name):
+    """Queue image processing when the image changed or has no asset yet.
+
+    Decided without a query, so saves that leave the image alone (logins,
+    view counts) cost nothing extra.
+    """
+    if update_fields is not None and field_name not in update_fields:
+        return
+    if field_name in instance.get_deferred_fields():
+        return
+    field_file = getattr(instance, field_name)
+    if not field_file:
+        return
+    stored = getattr(instance, '_stored_image', None)
+    instance._stored_image = field_file.name
+    if getattr(instance, f'{asset_field_name}_id') is not None and field_file.name == stored:
+        return
+    
+    from apps.media.tasks import process_image_task
+    transaction.on_commit(
+        lambda: process_image_task.delay(model_label, instance.pk, field_name, asset_field_name)
+    )
+
+
+@receiver(post_init, sender=Blog)
+def remember_featured_image(sender, instance, **kwargs):
+    _remember_image(instance, 'featured_image')
+
+
+@receiver(post_init, sender=User)
+def remember_profile_image(sender, instance, **kwargs):
+    _remember_image(instance, 'profile_image')
+
+
+@receiver(post_save, sender=Blog)
+def process_featured_image(sender, instance, update_fields=None, **kwargs):
+    _queue_processing(instance, update_fields, 'blogs.Blog', 'featured_image', 'featured_image_asset')
+
+
+@receiver(post_save, sender=User)
+def process_profile_image(sender, instance, update_fields=None, **kwargs):
+    _queue_processing(instance, update_fields, 'users.User', 'profile_image', 'profile_image_asset')
@@ -0,0 +1,51 @@
+from celery import shared_task
+from django.apps import apps
+from apps.media.service import attach_image
+
+# (model label, image field, asset field) pairs handled by the pipeline.
+IMAGE_FIELDS = [
+    ('blogs.Blog', 'featured_image', 'featured_image_asset'),
+    ('users.User', 'profile_image', 'profile_image_asset'),
+]
+
+
+@shared_task(acks_late=True, priority=3, soft_time_limit=120, time_limit=150)
+def process_image_task(model_label, pk, field_name, asset_field_name):
+    """Celery task to generate responsive variants for an uploaded image."""
+    model = apps.get_model(model_label)
+    try:
+        instance = model.objects.get(pk=pk)
+    except model.DoesNotExist:
+        return {'status': 'error', 'message': f'{model_label} not found'}
+    
+    asset = attach_image(instance, field_name, asset_field_name)
+    if asset is None:
+        return {'status': 'skipped'}
+    return {'status': asset.status, 'asset_id': asset.id}
+
+
+@shared_task(priority=8, soft_time_limit=600, time_limit=660)
+def backfill_image_variants_task(batch_size=100):
+    """Celery task to enqueue processing for images that have no asset yet."""
+    queued = 0
+    for model_label, field_name, asset_field_name in IMAGE_FIELDS:
+        model = apps.get_model(model_label)
+        pending = (
+            model.objects
+            .exclude(**{field_name: ''})
+            .exclude(**{f'{field_name}__isnull': True})
+            .filter(**{f'{asset_field_name}__isnull': True})
+            .values_list('pk', flat=True)
+        )
+        for pk in pending.iterator(chunk_size=batch_size):
+            process_image_task.delay(model_label, pk, field_name, asset_field_name)
+            queued += 1
+    return {'status': 'success', 'queued': queued}
+
+
+@shared_task(soft_time_limit=600, time_limit=660)
+def purge_stale_uploads_task():
+    """Celery task to abort chunked uploads that were never completed."""
+    from apps.media.uploads import purge_stale_uploads
+    purged = purge_stale_uploads()
+    return {'status': 'success', 'purged': purged}
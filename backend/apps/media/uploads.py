@@ -0,0 +1,268 @@
+import base64
+import hashlib
+import os
+from datetime import timedelta
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from django.core.files import File
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.core.validators import validate_image_file_extension
+from django.utils import timezone
+
+from .models import ChunkedUpload
+
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """Raised when a chunked upload request cannot be applied."""
+
+    def __init__(self, message, conflict=False):
+        super().__init__(message)
+        self.conflict = conflict
+
+
+class _PartFile(File):
+    """Assembled part file that FileSystemStorage can move instead of copy."""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def _destination(upload):
+    return os.path.join(settings.CHUNKED_UPLOAD_DESTINATION, str(upload.id), upload.filename)
+
+
+def _read_stream(stream, length):
+    """Yield blocks of exactly `length` bytes from a request stream."""
+    remaining = length
+    while remaining > 0:
+        block = stream.read(min(READ_BLOCK_SIZE, remaining))
+        if not block:
+            raise UploadError('Chunk body is shorter than Content-Length.')
+        remaining -= len(block)
+        yield block
+
+
+class LocalChunkStore:
+    """Appends chunks to a part file under CHUNKED_UPLOAD_TEMP_DIR and moves it into storage on completion."""
+
+    def _part_path(self, upload):
+        return Path(settings.CHUNKED_UPLOAD_TEMP_DIR) / f'{upload.id}.part'
+
+    def start(self, upload):
+        path = self._part_path(upload)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+
+    def write_chunk(self, upload, stream, length, chunk_checksum):
+        path = self._part_path(upload)
+        digest = hashlib.sha256()
+        with open(path, 'r+b') as part:
+            part.seek(upload.offset)
+            try:
+                for block in _read_stream(stream, length):
+                    digest.update(block)
+                    part.write(block)
+                if digest.hexdigest() != chunk_checksum:
+                    raise UploadError('Chunk checksum mismatch.')
+            except UploadError:
+                part.truncate(upload.offset)
+                raise
+            part.truncate(upload.offset + length)
+
+    def complete(self, upload, name):
+        path = self._part_path(upload)
+        digest = hashlib.sha256()
+        with open(path, 'rb') as part:
+            for block in iter(lambda: part.read(READ_BLOCK_SIZE), b''):
+                digest.update(block)
+        if digest.hexdigest() != upload.checksum:
+            raise UploadError('File checksum mismatch.')
+        with open(path, 'rb') as part:
+            return default_storage.save(name, _PartFile(part, name=upload.filename))
+
+    def abort(self, upload):
+        path = self._part_path(upload)
+        if path.exists():
+            path.unlink()
+
+
+class S3ChunkStore:
+    """Streams each chunk as one part of an S3 multipart upload via django-storages."""
+
+    def __init__(self, storage):
+        from storages.utils import clean_name
+        self.storage = storage
+        self.client = storage.connection.meta.client
+        self._key = lambda name: storage._normalize_name(clean_name(name))
+
+    def start(self, upload):
+        upload.file = self.storage.get_available_name(_destination(upload))
+        response = self.client.create_multipart_upload(
+            Bucket=self.storage.bucket_name,
+            Key=self._key(upload.file),
+            ChecksumAlgorithm='SHA256'
+        )
+        upload.multipart_id = response['UploadId']
+
+    def write_chunk(self, upload, stream, length, chunk_checksum):
+        digest = hashlib.sha256()
+        # Bounded spool: only the current chunk is held, and only up to 1 MB in memory.
+        with SpooledTemporaryFile(max_size=1024 * 1024) as spool:
+            for block in _read_stream(stream, length):
+                digest.update(block)
+                spool.write(block)
+            if digest.hexdigest() != chunk_checksum:
+                raise UploadError('Chunk checksum mismatch.')
+            spool.seek(0)
+            part_number = upload.offset // upload.chunk_size + 1
+            response = self.client.upload_part(
+                Bucket=self.storage.bucket_name,
+                Key=self._key(upload.file),
+                UploadId=upload.multipart_id,
+                PartNumber=part_number,
+                Body=spool,
+                ContentLength=length,
+                ChecksumSHA256=base64.b64encode(digest.digest()).decode('ascii')
+            )
+        part = {'PartNumber': part_number, 'ETag': response['ETag']}
+        if response.get('ChecksumSHA256'):
+            part['ChecksumSHA256'] = response['ChecksumSHA256']
+        upload.parts = [p for p in upload.parts if p['PartNumber'] != part_number] + [part]
+
+    def complete(self, upload, name):
+        # Each part was verified by SHA-256 on upload; S3 rejects the request if any part differs.
+        parts = sorted(upload.parts, key=lambda p: p['PartNumber'])
+        self.client.complete_multipart_upload(
+            Bucket=self.storage.bucket_name,
+            Key=self._key(upload.file),
+            UploadId=upload.multipart_id,
+            MultipartUpload={'Parts': parts}
+        )
+        return upload.file
+
+    def abort(self, upload):
+        if upload.multipart_id:
+            try:
+                self.client.abort_multipart_upload(
+                    Bucket=self.storage.bucket_name,
+                    Key=self._key(upload.file),
+                    UploadId=upload.multipart_id
+                )
+            except self.client.exceptions.NoSuchUpload:
+                pass  # already aborted or completed
+
+
+def get_chunk_store():
+    """Return the chunk store matching the configured default storage."""
+    try:
+        from storages.backends.s3boto3 import S3Boto3Storage
+    except ImportError:
+        return LocalChunkStore()
+    if isinstance(default_storage, S3Boto3Storage):
+        return S3ChunkStore(default_storage)
+    return LocalChunkStore()
+
+
+def init_upload(user, filename, total_size, checksum):
+    """Create a chunked upload session."""
+    if total_size > settings.CHUNKED_UPLOAD_MAX_SIZE:
+        raise UploadError('File exceeds the maximum upload size.')
+    upload = ChunkedUpload(
+        user=user,
+        filename=os.path.basename(filename),
+        total_size=total_size,
+        chunk_size=settings.CHUNKED_UPLOAD_CHUNK_SIZE,
+        checksum=checksum.lower()
+    )
+    get_chunk_store().start(upload)
+    upload.save()
+    return upload
+
+
+def write_chunk(upload, offset, stream, length, chunk_checksum):
+    """Append one chunk at `offset`, which must equal the current upload offset."""
+    if upload.status != ChunkedUpload.Status.UPLOADING:
+        raise UploadError('Upload is not accepting chunks.', conflict=True)
+    if offset != upload.offset:
+        raise UploadError(f'Expected offset {upload.offset}.', conflict=True)
+    if length <= 0 or length > upload.chunk_size:
+        raise UploadError(f'Chunk size must be between 1 and {upload.chunk_size} bytes.')
+    if offset + length > upload.total_size:
+        raise UploadError('Chunk exceeds declared file size.')
+    if length < upload.chunk_size and offset + length != upload.total_size:
+        raise UploadError('Only the final chunk may be smaller than the chunk size.')
+
+    store = get_chunk_store()
+    store.write_chunk(upload, stream, length, chunk_checksum.lower())
+
+    # Optimistic update so two concurrent writers of the same chunk cannot both advance.
+    updated = ChunkedUpload.objects.filter(pk=upload.pk, offset=offset).update(
+        offset=offset + length,
+        parts=upload.parts,
+        updated_at=timezone.now()
+    )
+    if not updated:
+        raise UploadError('Chunk was already written by another request.', conflict=True)
+    upload.offset = offset + length
+    return upload
+
+
+def complete_upload(upload):
+    """Verify and finalize an upload into storage."""
+    if upload.status == ChunkedUpload.Status.COMPLETE:
+        return upload
+    if upload.offset != upload.total_size:
+        raise UploadError(f'Upload incomplete: {upload.offset}/{upload.total_size} bytes.', conflict=True)
+
+    store = get_chunk_store()
+    try:
+        upload.file = store.complete(upload, _destination(upload))
+    except UploadError as e:
+        store.abort(upload)
+        upload.status = ChunkedUpload.Status.FAILED
+        upload.error = str(e)
+        upload.save()
+        raise
+    upload.status = ChunkedUpload.Status.COMPLETE
+    upload.completed_at = timezone.now()
+    upload.save()
+    return upload
+
+
+def verify_image(upload):
+    """Raise UploadError unless a completed upload is an image that may be used as a featured image."""
+    if upload.total_size > settings.CHUNKED_UPLOAD_MAX_IMAGE_SIZE:
+        raise UploadError(f'Images may be at most {settings.CHUNKED_UPLOAD_MAX_IMAGE_SIZE} bytes.')
+    try:
+        validate_image_file_extension(File(None, name=upload.filename))
+    except ValidationError as e:
+        raise UploadError(e.messages[0])
+    from PIL import Image
+    try:
+        with default_storage.open(upload.file, 'rb') as file:
+            Image.open(file).verify()
+    except Exception:
+        # Pillow raises a variety of errors for broken or non-image files (as forms.ImageField does).
+        raise UploadError('Upload is not a valid image.')
+
+
+def purge_stale_uploads(hours=None):
+    """Abort unfinished uploads that have not received a chunk within the expiry window, and drop failed ones."""
+    hours = hours or settings.CHUNKED_UPLOAD_EXPIRY_HOURS
+    cutoff = timezone.now() - timedelta(hours=hours)
+    stale = ChunkedUpload.objects.filter(
+        status__in=[ChunkedUpload.Status.UPLOADING, ChunkedUpload.Status.FAILED],
+        updated_at__lt=cutoff
+    )
+    store = get_chunk_store()
+    count = 0
+    for upload in stale.iterator():
+        store.abort(upload)
+        upload.delete()
+        count += 1
+    return count
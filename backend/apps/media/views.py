@@ -0,0 +1,75 @@
+from rest_framework import mixins, viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from .models import ChunkedUpload
+from .serializers import ChunkedUploadSerializer
+from .uploads import UploadError, init_upload, write_chunk, complete_upload
+
+
+def _upload_error_response(error):
+    return Response(
+        {'error': str(error)},
+        status=status.HTTP_409_CONFLICT if error.conflict else status.HTTP_400_BAD_REQUEST
+    )
+
+
+class ChunkedUploadViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                           mixins.ListModelMixin, viewsets.GenericViewSet):
+    """ViewSet for resumable chunked uploads (init / put chunk / complete)."""
+    serializer_class = ChunkedUploadSerializer
+    permission_classes = [IsAuthenticated]
+    filterset_fields = ['status']
+    ordering = ['-created_at']
+    
+    def get_queryset(self):
+        return ChunkedUpload.objects.filter(user=self.request.user)
+    
+    def create(self, request, *args, **kwargs):
+        """Start an upload; the response carries the id, chunk size and offset."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            upload = init_upload(request.user, **serializer.validated_data)
+        except UploadError as e:
+            return _upload_error_response(e)
+        return Response(self.get_serializer(upload).data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['put'])
+    def chunk(self, request, pk=None):
+        """Append a raw chunk body at the `Upload-Offset` header position.
+        
+        The `X-Chunk-Checksum` header carries the SHA-256 hex digest of the body.
+        """
+        upload = self.get_object()
+        try:
+            offset = int(request.META.get('HTTP_UPLOAD_OFFSET', ''))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return Response(
+                {'error': 'Upload-Offset and Content-Length headers are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        checksum = request.META.get('HTTP_X_CHUNK_CHECKSUM', '')
+        if not checksum:
+            return Response(
+                {'error': 'X-Chunk-Checksum header is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            # Read the body straight from the WSGI stream so the chunk is never buffered whole.
+            write_chunk(upload, offset, request.stream, length, checksum)
+        except UploadError as e:
+            return _upload_error_response(e)
+        return Response({'offset': upload.offset, 'total_size': upload.total_size})
+    
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        """Verify the assembled file and move it into media storage."""
+        upload = self.get_object()
+        try:
+            complete_upload(upload)
+        except UploadError as e:
+            return _upload_error_response(e)
+        return Response(self.get_serializer(upload).data)
@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import BlogEmbedding
+
+
+@admin.register(BlogEmbedding)
+class BlogEmbeddingAdmin(admin.ModelAdmin):
+    list_display = ['blog', 'model_version', 'updated_at']
+    list_filter = ['model_version']
+    search_fields = ['blog__title']
+    exclude = ['vector']
+    readonly_fields = ['blog', 'content_hash', 'model_version', 'updated_at']
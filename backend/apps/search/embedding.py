@@ -0,0 +1,186 @@
+"""
+Local text embeddings: hashed TF-IDF features projected onto an SVD basis (LSA).
+
+Words and adjacent word pairs are hashed (CRC32, signed) into 2**SEMANTIC_HASH_BITS
+buckets, weighted by sublinear term frequency and inverse document frequency,
+and projected onto the top SEMANTIC_DIMENSIONS right singular vectors of the
+corpus matrix, found by randomized SVD. Embeddings are unit-length float32
+vectors, so cosine similarity is a dot product. Nothing leaves the process; a
+query embeds in well under a millisecond.
+
+The fitted model (idf weights and projection matrix) is saved as .npy files
+and memory-mapped by every process that loads it.
+"""
+import json
+import math
+import os
+import re
+import uuid
+import zlib
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+from django.utils import timezone
+
+from apps.ai_service.extractive import STOPWORDS
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#']*[a-z0-9+#]|[a-z0-9]")
+# Title words count this many times, so a post's subject outweighs passing mentions.
+TITLE_WEIGHT = 3
+# Nonzeros per sparse-dense product step; bounds memory during fitting.
+CHUNK_NNZ = 100_000
+
+
+def tokenize(text, bigrams=True):
+    """Lowercase words without stopwords, plus bigrams of adjacent words."""
+    words = [word for word in TOKEN_RE.findall(text.lower()) if word not in STOPWORDS and len(word) > 1]
+    return words + [f'{a} {b}' for a, b in zip(words, words[1:])] if bigrams else words
+
+
+def document_text(title, description='', content=''):
+    return '\n'.join([title] * TITLE_WEIGHT + [description, content])
+
+
+def _hashed(counts, mask):
+    """Bucket indices and signed sublinear weights of a token Counter."""
+    indices = np.empty(len(counts), dtype=np.int64)
+    weights = np.empty(len(counts), dtype=np.float32)
+    for i, (token, count) in enumerate(counts.items()):
+        digest = zlib.crc32(token.encode('utf-8'))
+        indices[i] = digest & mask
+        weights[i] = (1.0 + math.log(count)) * (1.0 if digest & 0x80000000 else -1.0)
+    return indices, weights
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def _segment_dot(indptr, index, values, dense):
+    """Rows of (sparse matrix in indptr/index/values form) @ dense, summed block by block."""
+    rows = len(indptr) - 1
+    out = np.zeros((rows, dense.shape[1]), dtype=np.float32)
+    step = max(1, CHUNK_NNZ * rows // max(len(values), 1))
+    for first in range(0, rows, step):
+        last = min(first + step, rows)
+        lo, hi = indptr[first], indptr[last]
+        if lo == hi:
+            continue
+        starts = indptr[first:last] - lo
+        nonempty = indptr[first + 1:last + 1] > indptr[first:last]
+        products = values[lo:hi, None] * dense[index[lo:hi]]
+        out[first:last][nonempty] = np.add.reduceat(products, starts[nonempty], axis=0)
+    return out
+
+
+class SparseRows:
+    """Sparse matrix of hashed documents, kept in both row and column order (no scipy dependency)."""
+
+    def __init__(self, documents, features, idf=None, bigrams=True):
+        mask = features - 1
+        cols, vals, lengths = [], [], []
+        for text in documents:
+            indices, weights = _hashed(Counter(tokenize(text, bigrams)), mask)
+            cols.append(indices)
+            vals.append(weights)
+            lengths.append(len(indices))
+        self.shape = (len(documents), features)
+        self.cols = np.concatenate(cols) if cols else np.empty(0, dtype=np.int64)
+        self.vals = np.concatenate(vals) if vals else np.empty(0, dtype=np.float32)
+        self.indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self.rows = np.repeat(np.arange(len(documents)), lengths)
+        if idf is not None:
+            self.vals = self.vals * idf[self.cols]
+        # Unit-length rows, as in the embeddings themselves.
+        norms = np.sqrt(np.bincount(self.rows, weights=self.vals ** 2, minlength=self.shape[0]))
+        self.vals = (self.vals / np.maximum(norms, 1e-12)[self.rows]).astype(np.float32)
+        order = np.argsort(self.cols, kind='stable')
+        self.col_indptr = np.concatenate([[0], np.cumsum(np.bincount(self.cols, minlength=features))])
+        self.col_rows, self.col_vals = self.rows[order], self.vals[order]
+
+    def document_frequency(self):
+        return np.bincount(self.cols, minlength=self.shape[1])
+
+    def dot(self, dense):
+        """self @ dense, for a (features, k) array."""
+        return _segment_dot(self.indptr, self.cols, self.vals, dense)
+
+    def tdot(self, dense):
+        """self.T @ dense, for a (documents, k) array."""
+        return _segment_dot(self.col_indptr, self.col_rows, self.col_vals, dense)
+
+
+class Embedder:
+    """A fitted embedding model; see the module docstring."""
+
+    def __init__(self, idf, projection, version, meta=None):
+        self.idf = idf
+        self.projection = projection
+        self.version = version
+        self.meta = meta or {}
+        self.features, self.dimensions = projection.shape
+        self._mask = self.features - 1
+
+    @classmethod
+    def fit(cls, documents, features, dimensions, power_iterations=2, seed=0):
+        """Fit idf weights and the SVD projection to `documents` (an iterable of texts)."""
+        documents = list(documents)
+        rng = np.random.default_rng(seed)
+        counts = SparseRows(documents, features)
+        df = counts.document_frequency()
+        idf = (np.log((1 + len(documents)) / (1 + df)) + 1).astype(np.float32)
+        matrix = SparseRows(documents, features, idf)
+
+        # Randomized range finder (Halko et al.) on the documents x features matrix.
+        rank = min(dimensions + 10, len(documents))
+        sample = matrix.dot(rng.standard_normal((features, rank), dtype=np.float32))
+        for _ in range(power_iterations):
+            basis, _ = np.linalg.qr(sample)
+            basis, _ = np.linalg.qr(matrix.tdot(basis))
+            sample = matrix.dot(basis)
+        basis, _ = np.linalg.qr(sample)
+        # basis.T @ matrix is small (rank x features); its right singular vectors span the topics.
+        _, _, components = np.linalg.svd(matrix.tdot(basis).T, full_matrices=False)
+        projection = np.zeros((features, dimensions), dtype=np.float32)
+        kept = min(dimensions, components.shape[0])
+        projection[:, :kept] = components[:kept].T
+        meta = {'documents': len(documents), 'fitted_at': timezone.now().isoformat()}
+        return cls(idf, projection, uuid.uuid4().hex[:12], meta)
+
+    def embed(self, text):
+        """Unit-length float32 embedding of `text`."""
+        counts = Counter(tokenize(text))
+        if not counts:
+            return np.zeros(self.dimensions, dtype=np.float32)
+        indices, weights = _hashed(counts, self._mask)
+        weights *= self.idf[indices]
+        vector = weights @ self.projection[indices]
+        return _normalize(vector).astype(np.float32)
+
+    def embed_many(self, texts):
+        return np.stack([self.embed(text) for text in texts]) if texts else np.empty((0, self.dimensions), np.float32)
+
+    def save(self, directory):
+        """Write the model to `directory` (created if needed)."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / 'idf.npy', self.idf)
+        np.save(directory / 'projection.npy', self.projection)
+        meta = {**self.meta, 'version': self.version, 'features': self.features, 'dimensions': self.dimensions}
+        tmp = directory / 'embedder.json.tmp'
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, directory / 'embedder.json')
+
+    @classmethod
+    def load(cls, directory):
+        """Load a saved model, memory-mapping its arrays, or return None if there is none."""
+        directory = Path(directory)
+        try:
+            meta = json.loads((directory / 'embedder.json').read_text())
+        except FileNotFoundError:
+            return None
+        idf = np.load(directory / 'idf.npy', mmap_mode='r')
+        projection = np.load(directory / 'projection.npy', mmap_mode='r')
+        return cls(idf, projection, meta['version'], meta)
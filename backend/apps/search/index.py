@@ -0,0 +1,137 @@
+"""
+Inverted-file (IVF) approximate nearest-neighbour index over blog embeddings.
+
+Embeddings are clustered with spherical k-means into about 2*sqrt(N) lists;
+vectors are stored grouped by list, so a query scores the centroids, picks the
+SEMANTIC_NPROBE closest lists and only reads those contiguous slices. All
+arrays are .npy files memory-mapped read-only, so web processes share one copy
+through the page cache and a 100k-post index loads instantly.
+
+A build writes a new directory and then replaces current.json, which names
+the embedder and index directories in use; readers notice the change and
+switch, and files of older builds stay valid for readers still mapping them.
+"""
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 50_000
+
+
+def list_count(size):
+    return max(1, min(size, round(2 * size ** 0.5)))
+
+
+def spherical_kmeans(vectors, lists, iterations=KMEANS_ITERATIONS, seed=0):
+    """Unit-length centroids of `lists` clusters of unit vectors, by cosine similarity."""
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(len(vectors), min(len(vectors), KMEANS_SAMPLE), replace=False)]
+    centroids = sample[rng.choice(len(sample), lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        empty = ~sums.any(axis=1)
+        # Re-seed empty lists with random points rather than lose them.
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+    return centroids.astype(np.float32)
+
+
+def _assign(vectors, centroids, batch=20_000):
+    return np.concatenate([
+        np.argmax(vectors[start:start + batch] @ centroids.T, axis=1)
+        for start in range(0, len(vectors), batch)
+    ]) if len(vectors) else np.empty(0, dtype=np.int64)
+
+
+def top_k(scores, ids, k):
+    """(ids, scores) of the k best scores, best first."""
+    if len(scores) > k:
+        best = np.argpartition(-scores, k - 1)[:k]
+        scores, ids = scores[best], ids[best]
+    order = np.argsort(-scores)
+    return ids[order], scores[order]
+
+
+class IVFIndex:
+    def __init__(self, centroids, vectors, ids, offsets):
+        self.centroids = centroids
+        self.vectors = vectors
+        self.ids = ids
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, ids, vectors, lists=None):
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        lists = lists or list_count(len(ids))
+        if not len(ids):
+            return cls(np.zeros((1, vectors.shape[1]), np.float32), vectors, ids, np.zeros(2, np.int64))
+        centroids = spherical_kmeans(vectors, lists)
+        assignment = _assign(vectors, centroids)
+        order = np.argsort(assignment, kind='stable')
+        offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(assignment, minlength=len(centroids)))
+        return cls(centroids, vectors[order], ids[order], offsets)
+
+    def search(self, query, k, nprobe):
+        """(ids, scores) of about the k vectors most similar to `query`, best first."""
+        if not len(self.ids):
+            return np.empty(0, np.int64), np.empty(0, np.float32)
+        centroid_scores = self.centroids @ query
+        nprobe = min(nprobe, len(self.centroids))
+        probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        ids, scores = [], []
+        for probe in probes:
+            start, end = self.offsets[probe], self.offsets[probe + 1]
+            if start < end:
+                ids.append(self.ids[start:end])
+                scores.append(self.vectors[start:end] @ query)
+        if not ids:
+            return np.empty(0, np.int64), np.empty(0, np.float32)
+        return top_k(np.concatenate(scores), np.concatenate(ids), k)
+
+    def save(self, directory):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in ('centroids', 'vectors', 'ids', 'offsets'):
+            np.save(directory / f'{name}.npy', getattr(self, name))
+
+    @classmethod
+    def load(cls, directory):
+        directory = Path(directory)
+        return cls(*(
+            np.load(directory / f'{name}.npy', mmap_mode='r')
+            for name in ('centroids', 'vectors', 'ids', 'offsets')
+        ))
+
+
+def read_current(root):
+    """The current build's description (for the semantic index: embedder, index, built_at, count), or None."""
+    try:
+        return json.loads((Path(root) / 'current.json').read_text())
+    except FileNotFoundError:
+        return None
+
+
+def publish(root, current, prefixes=('embedder-', 'index-'), keep=2):
+    """Make `current` the build in use and delete all but the `keep` newest build directories."""
+    root = Path(root)
+    tmp = root / 'current.json.tmp'
+    tmp.write_text(json.dumps(current))
+    os.replace(tmp, root / 'current.json')
+    in_use = {value for value in current.values() if isinstance(value, str)}
+    for prefix in prefixes:
+        builds = sorted(root.glob(f'{prefix}*'), key=lambda path: path.stat().st_mtime, reverse=True)
+        for path in builds[keep:]:
+            if path.name not in in_use:
+                # Processes still mapping these files keep them until they switch.
+                shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from apps.search.service import build_index
+
+
+class Command(BaseCommand):
+    help = 'Embed new and changed posts and rebuild the semantic search index.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--refit', action='store_true',
+            help='Fit a new embedding model to the current posts and re-embed all of them.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        result = build_index(refit=options['refit'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {result['indexed']} posts in {result['lists']} lists "
+            f"({result['embedded']} embedded{', new model fitted' if result['fitted'] else ''})"
+        ))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.search.suggest import SuggesterUnavailable, tag_backlog
+
+
+class Command(BaseCommand):
+    help = 'Suggest tags and categories for published posts that have none, and optionally apply them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--apply', action='store_true', help='Save the suggestions (default: dry run).')
+        parser.add_argument('--tag-threshold', type=float, help='Defaults to SUGGEST_AUTO_TAG_THRESHOLD.')
+        parser.add_argument('--category-threshold', type=float, help='Defaults to SUGGEST_AUTO_CATEGORY_THRESHOLD.')
+        parser.add_argument('--limit', type=int, help='Only look at this many posts.')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        try:
+            result = tag_backlog(
+                apply=options['apply'],
+                tag_threshold=options['tag_threshold'],
+                category_threshold=options['category_threshold'],
+                batch_size=options['batch_size'],
+                limit=options['limit'],
+            )
+        except SuggesterUnavailable as e:
+            raise CommandError(str(e))
+        for item in result.get('sample', []):
+            self.stdout.write(f"  blog {item['blog']}: tags {item['tags']}, category {item['category']}")
+        verb = 'Applied' if options['apply'] else 'Would apply'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result['tag_links']} tags to {result['tagged']} posts and categories to "
+            f"{result['categorized']} posts ({result['scanned']} posts scanned)"
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from apps.search.suggest import train
+
+
+class Command(BaseCommand):
+    help = 'Train the tag and category suggester on published posts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Train from scratch (refitting idf) instead of continuing from the current model.'
+        )
+
+    def handle(self, *args, **options):
+        result = train(full=options['full'])
+        if result['status'] != 'trained':
+            self.stdout.write(f"Nothing to train ({result['status']}, {result['posts']} labeled posts)")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Trained on {result['posts']} posts: {result['tags']} tags, {result['categories']} categories"
+            f"{' (continued from the previous model)' if result['warm_start'] else ''}"
+        ))
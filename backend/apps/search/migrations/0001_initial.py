@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('blogs', '0004_blogsummary_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogEmbedding',
+            fields=[
+                ('blog', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='embedding', serialize=False, to='blogs.blog')),
+                ('vector', models.BinaryField()),
+                ('content_hash', models.CharField(max_length=32)),
+                ('model_version', models.CharField(max_length=20)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+        ),
+    ]
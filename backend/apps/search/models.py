@@ -0,0 +1,16 @@
+from django.db import models
+from apps.blogs.models import Blog
+
+
+class BlogEmbedding(models.Model):
+    """A blog's semantic-search embedding: float32 values packed as bytes."""
+    blog = models.OneToOneField(Blog, on_delete=models.CASCADE, primary_key=True, related_name='embedding')
+    vector = models.BinaryField()
+    # Hash of the embedded text; unchanged posts are not re-embedded.
+    content_hash = models.CharField(max_length=32)
+    # Embedder that produced the vector; vectors of other versions are ignored.
+    model_version = models.CharField(max_length=20)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"Embedding of blog {self.blog_id} ({self.model_version})"
@@ -0,0 +1,241 @@
+"""
+Semantic search over published posts.
+
+BlogEmbedding rows are the source of truth. build_index embeds new and
+changed posts, fitting the embedder first if there is none yet (or on
+refit), and writes a fresh IVF index under SEMANTIC_INDEX_DIR. Posts saved
+after a build are embedded by a Celery task queued on save (see signals);
+each process keeps those in a small delta that is scanned exhaustively
+alongside the index and reloaded from the database every
+SEMANTIC_DELTA_REFRESH seconds. The nightly rebuild folds the
+delta back into the index.
+"""
+import hashlib
+import logging
+import random
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from apps.blogs.models import Blog
+
+from .embedding import Embedder, document_text
+from .index import IVFIndex, publish, read_current, top_k
+from .models import BlogEmbedding
+
+logger = logging.getLogger(__name__)
+
+BLOG_TEXT_FIELDS = ('id', 'title', 'description', 'content')
+
+
+class SemanticIndexUnavailable(Exception):
+    """Raised when searching before the first index build."""
+
+
+def blog_text(blog):
+    return document_text(blog.title, blog.description or '', blog.content)
+
+
+def text_hash(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _vectors(rows, dimensions):
+    """(ids, vectors) arrays from (blog_id, packed vector) pairs."""
+    rows = list(rows)
+    if not rows:
+        return np.empty(0, np.int64), np.empty((0, dimensions), np.float32)
+    ids = np.fromiter((blog_id for blog_id, _ in rows), dtype=np.int64, count=len(rows))
+    vectors = np.frombuffer(b''.join(bytes(vector) for _, vector in rows), dtype=np.float32)
+    return ids, vectors.reshape(len(rows), dimensions)
+
+
+class SemanticSearcher:
+    """The process's view of the current build plus the delta of posts saved since."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.current = None
+        self.embedder = None
+        self.index = None
+        self.delta_ids = np.empty(0, np.int64)
+        self.delta_vectors = None
+        self._checked = None
+        self._lock = threading.Lock()
+
+    def refresh(self, force=False):
+        """Switch to a new build and reload the delta, at most every SEMANTIC_DELTA_REFRESH seconds."""
+        now = time.monotonic()
+        if not force and self._checked is not None and now - self._checked < settings.SEMANTIC_DELTA_REFRESH:
+            return
+        with self._lock:
+            current = read_current(self.root)
+            if current != self.current:
+                self.embedder = Embedder.load(self.root / current['embedder']) if current else None
+                self.index = IVFIndex.load(self.root / current['index']) if current else None
+                self.current = current
+            if self.embedder is not None:
+                self.delta_ids, self.delta_vectors = _vectors(
+                    BlogEmbedding.objects.filter(
+                        updated_at__gt=datetime.fromisoformat(current['built_at']),
+                        model_version=self.embedder.version
+                    ).values_list('blog_id', 'vector'),
+                    self.embedder.dimensions
+                )
+            self._checked = now
+
+    def add(self, blog_id, vector):
+        """Make a just-saved embedding searchable in this process right away."""
+        with self._lock:
+            keep = self.delta_ids != blog_id
+            self.delta_ids = np.append(self.delta_ids[keep], blog_id)
+            self.delta_vectors = np.vstack([self.delta_vectors[keep], vector[None, :]])
+
+    def search(self, query, k):
+        """(blog id, score) pairs of the posts most similar to `query`, best first."""
+        self.refresh()
+        embedder, index, delta_ids, delta_vectors = self.embedder, self.index, self.delta_ids, self.delta_vectors
+        if index is None:
+            raise SemanticIndexUnavailable('The semantic index has not been built yet; run build_semantic_index.')
+        vector = embedder.embed(query)
+        if not vector.any():
+            return []
+        ids, scores = index.search(vector, k + len(delta_ids), settings.SEMANTIC_NPROBE)
+        if len(delta_ids):
+            # Indexed vectors of posts edited since the build are stale.
+            fresh = ~np.isin(ids, delta_ids)
+            ids = np.concatenate([ids[fresh], delta_ids])
+            scores = np.concatenate([scores[fresh], delta_vectors @ vector])
+        ids, scores = top_k(scores, ids, k)
+        return list(zip(ids.tolist(), scores.tolist()))
+
+
+_searcher = None
+_searcher_lock = threading.Lock()
+
+
+def get_searcher():
+    """Return the process's SemanticSearcher."""
+    global _searcher
+    if _searcher is None:
+        with _searcher_lock:
+            if _searcher is None:
+                _searcher = SemanticSearcher(settings.SEMANTIC_INDEX_DIR)
+    return _searcher
+
+
+def semantic_search(query, limit=10):
+    """Ids and scores of published-post candidates for `query`; over-fetched, since some may be unpublished."""
+    return get_searcher().search(query, limit * 2)
+
+
+def update_blog_embedding(blog):
+    """Embed a saved post if its text changed. Best effort: failures are logged, not raised."""
+    try:
+        searcher = get_searcher()
+        searcher.refresh()
+        embedder = searcher.embedder
+        if embedder is None:
+            return
+        text = blog_text(blog)
+        digest = text_hash(text)
+        stored = BlogEmbedding.objects.filter(blog_id=blog.pk).values_list('content_hash', 'model_version').first()
+        if stored == (digest, embedder.version):
+            return
+        vector = embedder.embed(text)
+        BlogEmbedding.objects.update_or_create(
+            blog_id=blog.pk,
+            defaults={'vector': vector.tobytes(), 'content_hash': digest, 'model_version': embedder.version}
+        )
+        searcher.add(blog.pk, vector)
+    except Exception:
+        logger.exception('Could not update the embedding of blog %s', blog.pk)
+
+
+def _fit_embedder(published):
+    ids = list(published.values_list('id', flat=True))
+    sample = random.Random(0).sample(ids, min(len(ids), settings.SEMANTIC_FIT_SAMPLE))
+    texts = (blog_text(blog) for blog in Blog.objects.filter(id__in=sample).only(*BLOG_TEXT_FIELDS).iterator())
+    return Embedder.fit(texts, 2 ** settings.SEMANTIC_HASH_BITS, settings.SEMANTIC_DIMENSIONS)
+
+
+def _embed_stale(published, embedder, batch_size):
+    """Embed published posts whose text or embedder version changed; return how many."""
+    stored = dict(
+        (blog_id, (digest, version))
+        for blog_id, digest, version in BlogEmbedding.objects.values_list('blog_id', 'content_hash', 'model_version')
+    )
+    created, updated = [], []
+    embedded = 0
+    now = timezone.now()
+
+    def flush():
+        BlogEmbedding.objects.bulk_create(created)
+        BlogEmbedding.objects.bulk_update(updated, ['vector', 'content_hash', 'model_version', 'updated_at'])
+        created.clear()
+        updated.clear()
+
+    for blog in published.only(*BLOG_TEXT_FIELDS).iterator(chunk_size=batch_size):
+        text = blog_text(blog)
+        digest = text_hash(text)
+        if stored.get(blog.id) == (digest, embedder.version):
+            continue
+        row = BlogEmbedding(
+            blog_id=blog.id, vector=embedder.embed(text).tobytes(),
+            content_hash=digest, model_version=embedder.version, updated_at=now
+        )
+        (updated if blog.id in stored else created).append(row)
+        embedded += 1
+        if len(created) + len(updated) >= batch_size:
+            flush()
+    flush()
+    return embedded
+
+
+def build_index(refit=False, batch_size=1000):
+    """Embed new and changed posts and publish a fresh index.
+
+    The embedder is fitted first if there is none, on `refit`, or once the
+    corpus has doubled since it was fitted (up to SEMANTIC_FIT_SAMPLE posts).
+    """
+    root = Path(settings.SEMANTIC_INDEX_DIR)
+    root.mkdir(parents=True, exist_ok=True)
+    published = Blog.objects.filter(status='published')
+    total = published.count()
+    if not total:
+        return {'indexed': 0, 'embedded': 0, 'fitted': False, 'lists': 0}
+    current = read_current(root)
+    embedder = None if refit or current is None else Embedder.load(root / current['embedder'])
+    # A model fitted on a much smaller corpus misses the topics written about since.
+    if embedder and min(total, settings.SEMANTIC_FIT_SAMPLE) >= 2 * embedder.meta.get('documents', 0):
+        embedder = None
+    fitted = embedder is None
+    if fitted:
+        embedder = _fit_embedder(published)
+        embedder.save(root / f'embedder-{embedder.version}')
+    embedded = _embed_stale(published, embedder, batch_size)
+
+    # Embeddings saved from here on are newer than the build and go to the delta.
+    built_at = timezone.now()
+    ids, vectors = _vectors(
+        BlogEmbedding.objects.filter(model_version=embedder.version, blog__status='published')
+        .values_list('blog_id', 'vector').iterator(chunk_size=batch_size),
+        embedder.dimensions
+    )
+    index = IVFIndex.build(ids, vectors)
+    name = f'index-{built_at:%Y%m%d%H%M%S}-{uuid.uuid4().hex[:6]}'
+    index.save(root / name)
+    publish(root, {
+        'embedder': f'embedder-{embedder.version}',
+        'index': name,
+        'built_at': built_at.isoformat(),
+        'count': len(index),
+    })
+    get_searcher().refresh(force=True)
+    return {'indexed': len(index), 'embedded': embedded, 'fitted': fitted, 'lists': len(index.centroids)}
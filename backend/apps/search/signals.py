@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from apps.blogs.models import Blog
+
+# Saves limited to other fields (views_count on every page view) cannot change the embedding.
+EMBEDDED_FIELDS = {'title', 'description', 'content', 'status', 'category'}
+
+
+@receiver(post_save, sender=Blog)
+def update_embedding(sender, instance, update_fields=None, **kwargs):
+    """Queue re-embedding of published posts on save, so they are searchable before the next index build."""
+    if instance.status != 'published':
+        return
+    if update_fields is not None and not EMBEDDED_FIELDS & set(update_fields):
+        return
+    from apps.search.tasks import update_blog_embedding_task
+    blog_id = instance.pk
+    transaction.on_commit(lambda: update_blog_embedding_task.delay(blog_id))
@@ -0,0 +1,411 @@
+"""
+Tag and category suggestions from post text.
+
+Linear classifiers over the hashed TF-IDF features of apps.search.embedding:
+one-vs-rest logistic regression for tags (a post has several) and softmax
+regression for the category (it has one), trained on published posts with
+mini-batch AdaGrad that updates only the features each batch touches.
+Retraining continues from the previous weights, AdaGrad state and idf, so the
+periodic job needs only a pass or two over the posts; a full
+retrain refits the idf as well, on demand or once the labeled corpus has
+doubled. The weights are .npy files memory-mapped by every process, and a
+suggestion is one sparse row times the weight matrix.
+"""
+import json
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from apps.blogs.models import Blog, Category, Tag
+from config.cache import two_tier_cache
+
+from .embedding import SparseRows
+from .index import publish, read_current
+from .service import BLOG_TEXT_FIELDS, blog_text
+
+# How often a process checks for a newly trained model, in seconds.
+RELOAD_INTERVAL = 30
+LEARNING_RATE = 0.5
+BATCH_SIZE = 256
+# Small corpora get extra passes so that training always takes at least this many steps.
+MIN_STEPS = 200
+L2 = 1e-6
+
+
+class SuggesterUnavailable(Exception):
+    """Raised when suggesting before the first training run."""
+
+
+def fit_idf(texts):
+    df = SparseRows(texts, 2 ** settings.SUGGEST_HASH_BITS, bigrams=False).document_frequency()
+    return (np.log((1 + len(texts)) / (1 + df)) + 1).astype(np.float32)
+
+
+def feature_matrix(texts, idf):
+    """Unit-length TF-IDF rows of `texts`. Words only: bigrams, mostly unique to one post, would drown them out."""
+    return SparseRows(texts, len(idf), idf, bigrams=False)
+
+
+def _sigmoid(logits):
+    return 0.5 * (1.0 + np.tanh(0.5 * logits))
+
+
+def _softmax(logits):
+    exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class Head:
+    """A linear layer over the hashed features with one output per label id."""
+
+    def __init__(self, weights, bias, labels, multilabel):
+        self.weights = weights
+        self.bias = bias
+        self.labels = labels
+        self.multilabel = multilabel
+        self.accumulator = None
+
+    def probabilities(self, matrix):
+        """(documents, labels) probabilities for the rows of a SparseRows matrix."""
+        logits = matrix.dot(self.weights) + self.bias
+        return _sigmoid(logits) if self.multilabel else _softmax(logits)
+
+    @classmethod
+    def train(cls, matrix, targets, labels, multilabel, epochs, previous=None, seed=0):
+        """Fit to a (documents, labels) 0/1 `targets` array with mini-batch AdaGrad.
+
+        Labels known to `previous` start from its weights and AdaGrad state, so
+        retraining continues where the last run stopped.
+        """
+        features = matrix.shape[1]
+        weights = np.zeros((features, len(labels)), dtype=np.float32)
+        bias = np.zeros(len(labels), dtype=np.float32)
+        # Sums of squared gradients; the last row is the bias's.
+        accumulator = np.zeros((features + 1, len(labels)), dtype=np.float32)
+        if previous is not None and previous.accumulator is not None:
+            known = {label: column for column, label in enumerate(previous.labels.tolist())}
+            pairs = [(column, known[label]) for column, label in enumerate(labels.tolist()) if label in known]
+            if pairs:
+                new, old = (list(side) for side in zip(*pairs))
+                weights[:, new] = previous.weights[:, old]
+                bias[new] = previous.bias[old]
+                accumulator[:, new] = previous.accumulator[:, old]
+        activation = _sigmoid if multilabel else _softmax
+        batches = list(_batches(matrix, BATCH_SIZE))
+        if batches:
+            epochs = max(epochs, -(-MIN_STEPS // len(batches)))
+        rng = np.random.default_rng(seed)
+        for _ in range(epochs):
+            for i in rng.permutation(len(batches)):
+                rows, columns, inverse, values, starts, row_of_value, order, column_starts = batches[i]
+                local = weights[columns]
+                logits = np.add.reduceat(values[:, None] * local[inverse], starts, axis=0) + bias
+                error = activation(logits) - targets[rows]
+                # Gradient of each touched feature: its values times the errors of their rows.
+                products = (values[:, None] * error[row_of_value])[order]
+                gradient = np.add.reduceat(products, column_starts, axis=0) / len(rows) + L2 * local
+                bias_gradient = error.mean(axis=0)
+                accumulator[columns] += gradient ** 2
+                accumulator[-1] += bias_gradient ** 2
+                weights[columns] = local - LEARNING_RATE * gradient / np.sqrt(accumulator[columns] + 1e-8)
+                bias -= LEARNING_RATE * bias_gradient / np.sqrt(accumulator[-1] + 1e-8)
+        head = cls(weights, bias, labels, multilabel)
+        head.accumulator = accumulator
+        return head
+
+    def save(self, directory, name):
+        for part in ('weights', 'bias', 'labels', 'accumulator'):
+            np.save(directory / f'{name}_{part}.npy', getattr(self, part))
+
+    @classmethod
+    def load(cls, directory, name, multilabel):
+        head = cls(*(
+            np.load(directory / f'{name}_{part}.npy', mmap_mode='r') for part in ('weights', 'bias', 'labels')
+        ), multilabel)
+        head.accumulator = np.load(directory / f'{name}_accumulator.npy', mmap_mode='r')
+        return head
+
+
+def _batches(matrix, size):
+    """Mini-batches of a SparseRows matrix with the indexing their gradient steps need.
+
+    Each is (rows, columns, inverse, values, starts, row_of_value, order,
+    column_starts): the batch's non-empty rows, the features they touch, each
+    value's position in `columns`, the values, where each row's values start,
+    each value's row within the batch, and the values' order and starts when
+    grouped by feature.
+    """
+    indptr = matrix.indptr
+    for first in range(0, matrix.shape[0], size):
+        last = min(first + size, matrix.shape[0])
+        lo, hi = indptr[first], indptr[last]
+        lengths = np.diff(indptr[first:last + 1])
+        if lo == hi:
+            continue
+        rows = first + np.flatnonzero(lengths)
+        columns, inverse = np.unique(matrix.cols[lo:hi], return_inverse=True)
+        order = np.argsort(inverse, kind='stable')
+        column_starts = np.concatenate([[0], np.cumsum(np.bincount(inverse))[:-1]])
+        yield (
+            rows, columns, inverse, matrix.vals[lo:hi], indptr[rows] - lo,
+            np.repeat(np.arange(len(rows)), lengths[lengths > 0]), order, column_starts,
+        )
+
+
+class Suggester:
+    """A trained tag head and category head sharing one idf."""
+
+    def __init__(self, idf, tags, categories, meta):
+        self.idf = idf
+        self.tags = tags
+        self.categories = categories
+        self.meta = meta
+
+    def matrix(self, texts):
+        return feature_matrix(texts, self.idf)
+
+    def predict(self, texts):
+        """(tag, category) probability arrays for `texts`; either is None without labels to learn."""
+        matrix = self.matrix(texts)
+        return tuple(
+            head.probabilities(matrix) if head is not None and len(head.labels) else None
+            for head in (self.tags, self.categories)
+        )
+
+    def suggest(self, text, tag_threshold, limit=5):
+        """Tag (id, probability) pairs above `tag_threshold` and the most likely categories, best first."""
+        tag_probs, category_probs = self.predict([text])
+        return _ranked(self.tags, tag_probs, limit, tag_threshold), _ranked(self.categories, category_probs, 3)
+
+    def save(self, directory):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / 'idf.npy', self.idf)
+        self.tags.save(directory, 'tag')
+        self.categories.save(directory, 'category')
+        (directory / 'suggester.json').write_text(json.dumps(self.meta))
+
+    @classmethod
+    def load(cls, directory):
+        directory = Path(directory)
+        return cls(
+            np.load(directory / 'idf.npy', mmap_mode='r'),
+            Head.load(directory, 'tag', multilabel=True),
+            Head.load(directory, 'category', multilabel=False),
+            json.loads((directory / 'suggester.json').read_text()),
+        )
+
+
+def _ranked(head, probabilities, limit, threshold=0.0):
+    if probabilities is None:
+        return []
+    row = probabilities[0]
+    best = np.argsort(-row)[:limit]
+    return [(int(head.labels[i]), float(row[i])) for i in best if row[i] >= threshold]
+
+
+_suggester = None
+_checked = None
+_suggester_lock = threading.Lock()
+
+
+def get_suggester():
+    """Return the current trained Suggester, reloading it when a new one is published."""
+    global _suggester, _checked
+    now = time.monotonic()
+    if _checked is None or now - _checked >= RELOAD_INTERVAL:
+        with _suggester_lock:
+            current = read_current(settings.SUGGEST_MODEL_DIR)
+            if current is None:
+                _suggester = None
+            elif _suggester is None or _suggester.meta['version'] != current['version']:
+                _suggester = Suggester.load(Path(settings.SUGGEST_MODEL_DIR) / current['model'])
+            _checked = now
+    if _suggester is None:
+        raise SuggesterUnavailable('No tag suggestion model has been trained yet; run train_tag_suggester.')
+    return _suggester
+
+
+def suggest_for_text(text):
+    """(tags, categories) as (id, probability) pairs for a post's text."""
+    return get_suggester().suggest(text, settings.SUGGEST_TAG_THRESHOLD)
+
+
+def _labeled_posts():
+    return (
+        Blog.objects.filter(status='published')
+        .annotate(tag_count=Count('tags'))
+        .exclude(tag_count=0, category__isnull=True)
+    )
+
+
+def _corpus_state(posts):
+    """What retraining depends on: a changed post, tag link or label set changes this."""
+    state = posts.aggregate(posts=Count('id', distinct=True), last_updated=Max('updated_at'))
+    return {
+        'posts': state['posts'],
+        'last_updated': state['last_updated'].isoformat() if state['last_updated'] else None,
+        'tag_links': Tag.blogs.through.objects.count(),
+        'tags': Tag.objects.count(),
+    }
+
+
+def label_targets(label_sets, min_examples):
+    """(labels, targets) for labels with at least `min_examples` posts."""
+    counts = {}
+    for labels in label_sets:
+        for label in labels:
+            counts[label] = counts.get(label, 0) + 1
+    kept = np.array(sorted(label for label, count in counts.items() if count >= min_examples), dtype=np.int64)
+    column = {label: i for i, label in enumerate(kept.tolist())}
+    targets = np.zeros((len(label_sets), len(kept)), dtype=np.float32)
+    for row, labels in enumerate(label_sets):
+        for label in labels:
+            if label in column:
+                targets[row, column[label]] = 1.0
+    return kept, targets
+
+
+def train(full=False):
+    """Train the tag and category classifiers and publish them, unless nothing changed since the last run."""
+    root = Path(settings.SUGGEST_MODEL_DIR)
+    root.mkdir(parents=True, exist_ok=True)
+    posts = _labeled_posts()
+    state = _corpus_state(posts)
+    current = read_current(root)
+    previous = None
+    if current is not None and not full:
+        previous = Suggester.load(root / current['model'])
+        if previous.meta.get('corpus') == state:
+            return {'status': 'unchanged', 'posts': state['posts']}
+        # The idf of a much smaller corpus misses the vocabulary written since.
+        if min(state['posts'], settings.SUGGEST_TRAIN_SAMPLE) >= 2 * previous.meta.get('idf_posts', 0):
+            previous = None
+    if not state['posts']:
+        return {'status': 'skipped', 'posts': 0}
+
+    ids = list(posts.order_by('-updated_at').values_list('id', flat=True)[:settings.SUGGEST_TRAIN_SAMPLE])
+    texts, tag_sets, categories = [], [], []
+    tags_by_blog = {}
+    for blog_id, tag_id in Tag.blogs.through.objects.filter(blog_id__in=ids).values_list('blog_id', 'tag_id'):
+        tags_by_blog.setdefault(blog_id, []).append(tag_id)
+    for blog in Blog.objects.filter(id__in=ids).only(*BLOG_TEXT_FIELDS, 'category_id').iterator(chunk_size=1000):
+        texts.append(blog_text(blog))
+        tag_sets.append(tags_by_blog.get(blog.id, []))
+        categories.append([blog.category_id] if blog.category_id else [])
+
+    if previous is not None:
+        idf, idf_posts = np.array(previous.idf), previous.meta['idf_posts']
+    else:
+        idf, idf_posts = fit_idf(texts), len(texts)
+    epochs = settings.SUGGEST_EPOCHS if previous is None else settings.SUGGEST_WARM_EPOCHS
+
+    heads = []
+    for label_sets, multilabel, name in ((tag_sets, True, 'tags'), (categories, False, 'categories')):
+        # Each head learns only from posts with at least one of its labels.
+        labels, targets = label_targets(label_sets, settings.SUGGEST_MIN_EXAMPLES)
+        rows = np.flatnonzero(targets.any(axis=1))
+        heads.append(Head.train(
+            feature_matrix([texts[i] for i in rows], idf), targets[rows], labels, multilabel, epochs,
+            getattr(previous, name) if previous is not None else None
+        ))
+
+    version = uuid.uuid4().hex[:12]
+    meta = {
+        'version': version, 'trained_at': timezone.now().isoformat(), 'posts': len(texts),
+        'idf_posts': idf_posts, 'epochs': epochs, 'warm_start': previous is not None, 'corpus': state,
+    }
+    Suggester(idf, heads[0], heads[1], meta).save(root / f'model-{version}')
+    publish(root, {'model': f'model-{version}', 'version': version}, prefixes=('model-',))
+    return {
+        'status': 'trained', 'posts': len(texts), 'tags': len(heads[0].labels),
+        'categories': len(heads[1].labels), 'warm_start': previous is not None,
+    }
+
+
+def tag_backlog(apply=False, tag_threshold=None, category_threshold=None, batch_size=500, limit=None):
+    """Suggest tags for published posts without tags and a category for those without one.
+
+    With `apply`, suggestions above the thresholds are saved; otherwise they
+    are only counted. Returns counts and, without `apply`, a sample of them.
+    """
+    suggester = get_suggester()
+    tag_threshold = settings.SUGGEST_AUTO_TAG_THRESHOLD if tag_threshold is None else tag_threshold
+    if category_threshold is None:
+        category_threshold = settings.SUGGEST_AUTO_CATEGORY_THRESHOLD
+    posts = (
+        Blog.objects.filter(status='published')
+        .annotate(tag_count=Count('tags'))
+        .filter(Q(tag_count=0) | Q(category__isnull=True))
+        .order_by('id')
+    )
+    if limit:
+        posts = posts[:limit]
+    result = {'scanned': 0, 'tagged': 0, 'tag_links': 0, 'categorized': 0, 'sample': []}
+    batch = []
+
+    def flush():
+        tag_probs, category_probs = suggester.predict([blog_text(blog) for blog in batch])
+        suggestions = []
+        for row, blog in enumerate(batch):
+            tags = []
+            if tag_probs is not None and not blog.tag_count:
+                best = np.argsort(-tag_probs[row])[:settings.SUGGEST_MAX_AUTO_TAGS]
+                tags = [int(suggester.tags.labels[i]) for i in best if tag_probs[row, i] >= tag_threshold]
+            category = None
+            if category_probs is not None and blog.category_id is None:
+                best = int(np.argmax(category_probs[row]))
+                if category_probs[row, best] >= category_threshold:
+                    category = int(suggester.categories.labels[best])
+            suggestions.append((blog, tags, category))
+
+        # Skip tags and categories deleted since the model was trained.
+        valid_tags = set(
+            Tag.objects.filter(id__in={tag for _, tags, _ in suggestions for tag in tags}).values_list('id', flat=True)
+        )
+        valid_categories = set(
+            Category.objects.filter(id__in={category for _, _, category in suggestions if category})
+            .values_list('id', flat=True)
+        )
+        links, categorized = [], []
+        now = timezone.now()
+        for blog, tags, category in suggestions:
+            tags = [tag for tag in tags if tag in valid_tags]
+            category = category if category in valid_categories else None
+            if tags:
+                result['tagged'] += 1
+                links.extend(Tag.blogs.through(blog_id=blog.id, tag_id=tag_id) for tag_id in tags)
+            if category:
+                blog.category_id = category
+                # bulk_update skips auto_now, so updated_at is set here.
+                blog.updated_at = now
+                categorized.append(blog)
+            if (tags or category) and len(result['sample']) < 20:
+                result['sample'].append({'blog': blog.id, 'tags': tags, 'category': category})
+        result['scanned'] += len(batch)
+        result['tag_links'] += len(links)
+        result['categorized'] += len(categorized)
+        if apply and (links or categorized):
+            with transaction.atomic():
+                Tag.blogs.through.objects.bulk_create(links, ignore_conflicts=True)
+                Blog.objects.bulk_update(categorized, ['category', 'updated_at'])
+            # Neither write sends post_save, so cached blog payloads are dropped here.
+            two_tier_cache().bump('blogs')
+        batch.clear()
+
+    for blog in posts.only(*BLOG_TEXT_FIELDS, 'category_id').iterator(chunk_size=batch_size):
+        batch.append(blog)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    if apply:
+        del result['sample']
+    return result
@@ -0,0 +1,27 @@
+from celery import shared_task
+
+
+@shared_task(soft_time_limit=3600, time_limit=3660)
+def rebuild_semantic_index_task(refit=False):
+    """Celery task to re-embed changed posts and rebuild the semantic search index."""
+    from apps.search.service import build_index
+    return {'status': 'success', **build_index(refit=refit)}
+
+
+@shared_task(soft_time_limit=3600, time_limit=3660)
+def train_tag_suggester_task(full=False):
+    """Celery task to retrain the tag and category suggester if labeled posts changed."""
+    from apps.search.suggest import train
+    return train(full=full)
+
+
+@shared_task(soft_time_limit=60, time_limit=90)
+def update_blog_embedding_task(blog_id):
+    """Celery task to embed a saved post, if it is still published and its text changed."""
+    from apps.blogs.models import Blog
+    from apps.search.service import update_blog_embedding
+    blog = Blog.objects.filter(pk=blog_id, status='published').only('id', 'title', 'description', 'content').first()
+    if blog is None:
+        return {'status': 'skipped'}
+    update_blog_embedding(blog)
+    return {'status': 'success'}
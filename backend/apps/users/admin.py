@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import User
+from .models import User, UserImportJob
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
@@ -12,3 +12,14 @@ class UserAdmin(admin.ModelAdmin):
         ('Permissions', {'fields': ('is_active_user', 'is_staff', 'is_superuser', 'groups', 'user_permissions', 'role')}),
         ('Important dates', {'fields': ('last_login', 'date_joined')}),
     )
+
+
+@admin.register(UserImportJob)
+class UserImportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'status', 'format', 'filename', 'dry_run', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['status', 'format', 'dry_run']
+    exclude = ['data']
+    readonly_fields = [
+        'status', 'format', 'filename', 'dry_run', 'report', 'error', 'created_by',
+        'created_at', 'updated_at', 'finished_at'
+    ]
@@ -0,0 +1,64 @@
+"""
+JWT authentication without a database query per request.
+
+Tokens carry the user's token version (and role claims). request.user is
+built from the user's AUTH_FIELDS in the shared cache (auth_state), with
+every other field deferred until first accessed, so an authenticated read
+costs no query on a cache hit. A save of a user deletes their cached state,
+so deactivation takes effect on their next request; changing the password,
+the role claims or the active flags (anywhere, see apps.users.signals) also
+revokes the tokens issued before (User.revoke_tokens). With a per-process cache (locmem) the state is read
+from the database on every request instead. With AUTH_TRUST_TOKEN_CLAIMS,
+the username, role and staff flags come from the token itself and the cache
+is only consulted for the token version and active flags.
+"""
+from django.conf import settings
+from django.db import router
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import AUTH_FIELDS, auth_state
+from .models import User
+
+TOKEN_VERSION_CLAIM = 'ver'
+ROLE_CLAIMS = ('username', 'role', 'is_staff', 'is_superuser')
+
+
+def add_token_claims(token, user):
+    """Add the token version and role claims of `user` to a new token."""
+    token[TOKEN_VERSION_CLAIM] = user.token_version
+    for claim in ROLE_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def check_token_version(state, token):
+    """Raise AuthenticationFailed unless the token's user exists, is active and the token is not revoked."""
+    if state is None:
+        raise AuthenticationFailed('User not found', code='user_not_found')
+    if not (state['is_active'] and state['is_active_user']):
+        raise AuthenticationFailed('User is inactive', code='user_inactive')
+    if token.get(TOKEN_VERSION_CLAIM, 0) != state['token_version']:
+        raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+
+
+def _deferred_user(values):
+    """A User with only `values` loaded; other fields are fetched on first access and save() writes only these."""
+    fields = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+    return User.from_db(router.db_for_read(User), fields, [values[name] for name in fields])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that resolves the user from the two-tier cache instead of the database."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+        state = auth_state(user_id)
+        check_token_version(state, validated_token)
+        if settings.AUTH_TRUST_TOKEN_CLAIMS and all(claim in validated_token for claim in ROLE_CLAIMS):
+            state = {**state, **{claim: validated_token[claim] for claim in ROLE_CLAIMS}}
+        return _deferred_user({name: state[name] for name in AUTH_FIELDS})
@@ -0,0 +1,29 @@
+from django.conf import settings
+from config.cache import two_tier_cache
+from .models import User
+
+
+def user_label(user_id):
+    """str(user) for a user id, from the two-tier cache."""
+    if user_id is None:
+        return None
+    return two_tier_cache().get_or_set('users', user_id, lambda: str(User.objects.get(pk=user_id)))
+
+
+# Fields the JWT authentication builds request.user from; the rest are loaded on first access.
+AUTH_FIELDS = ('id', 'username', 'role', 'is_active', 'is_active_user', 'is_staff', 'is_superuser', 'token_version')
+
+
+def auth_state(user_id):
+    """AUTH_FIELDS of a user as a dict, or None if there is no such user.
+
+    Kept in the shared cache only (not in L1), so deleting it on a save of the
+    user takes effect in every process at once. Without a shared cache that
+    could not happen, so every call queries the database instead.
+    """
+    def load():
+        return User.objects.filter(pk=user_id).values(*AUTH_FIELDS).first()
+    cache = two_tier_cache()
+    if not cache.shared:
+        return load()
+    return cache.get_or_set('auth', user_id, load, timeout=settings.AUTH_USER_CACHE_TTL, local=False)
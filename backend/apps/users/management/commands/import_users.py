@@ -0,0 +1,41 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.users import provisioning
+
+
+class Command(BaseCommand):
+    help = 'Create users from a CSV or NDJSON file, hashing their passwords in parallel.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV with a header row, or one JSON object per line.')
+        parser.add_argument('--format', choices=provisioning.FORMATS, help='Defaults to the file extension.')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only; create nothing.')
+        parser.add_argument('--workers', type=int, help='Defaults to USER_IMPORT_WORKERS.')
+        parser.add_argument('--pool', choices=('process', 'thread'), help='Defaults to USER_IMPORT_POOL.')
+        parser.add_argument('--chunk-size', type=int, help='Defaults to USER_IMPORT_CHUNK_SIZE.')
+        parser.add_argument('--skip-password-validation', action='store_true',
+                            help='Accept passwords that fail AUTH_PASSWORD_VALIDATORS.')
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or provisioning.detect_format(options['path'])
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                report = provisioning.import_users(
+                    stream, fmt,
+                    dry_run=options['dry_run'],
+                    validate_passwords=not options['skip_password_validation'],
+                    chunk_size=options['chunk_size'],
+                    workers=options['workers'],
+                    pool=options['pool'],
+                )
+        except (OSError, ValueError, ImproperlyConfigured) as e:
+            raise CommandError(str(e))
+        for error in report['errors']:
+            self.stderr.write(f"  line {error['line']} ({error['username']}): {error['errors']}")
+        if report['failed'] > len(report['errors']):
+            self.stderr.write(f"  ... and {report['failed'] - len(report['errors'])} more")
+        verb = 'Would create' if options['dry_run'] else 'Created'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {report['created']} users; {report['failed']} of {report['rows']} rows failed"
+        ))
@@ -30,7 +30,12 @@ class User(AbstractUser):
     )
     bio = models.TextField(blank=True, null=True)
     profile_image = models.ImageField(upload_to='profile_images/', blank=True, null=True)
+    profile_image_asset = models.ForeignKey(
+        'media.ImageAsset', on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
     is_active_user = models.BooleanField(default=True)
+    # Carried in JWTs; tokens with an older version are rejected (see revoke_tokens).
+    token_version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -42,6 +47,10 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
     
+    def revoke_tokens(self):
+        """Invalidate every token issued to this user so far; takes effect when the user is saved."""
+        self.token_version += 1
+    
     def has_permission(self, permission):
         """Check if user has specific permission based on role."""
         permissions = {
@@ -51,3 +60,35 @@ class User(AbstractUser):
             'viewer': ['read'],
         }
         return permission in permissions.get(self.role, [])
+
+
+class UserImportJob(models.Model):
+    """A bulk user import uploaded through the API and run by a Celery worker."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        COMPLETED = 'completed', 'Completed'
+        FAILED = 'failed', 'Failed'
+
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    format = models.CharField(max_length=10)
+    filename = models.CharField(max_length=255, blank=True)
+    dry_run = models.BooleanField(default=False)
+    # The uploaded file, passwords included; cleared once the import has run.
+    data = models.TextField(blank=True)
+    # apps.users.provisioning.import_users report, updated after every chunk.
+    report = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'User Import Job'
+        verbose_name_plural = 'User Import Jobs'
+
+    def __str__(self):
+        return f"User import {self.id} ({self.status})"
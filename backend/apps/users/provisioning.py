@@ -0,0 +1,236 @@
+"""
+Bulk user import from CSV or NDJSON.
+
+Rows are read and validated a chunk at a time: field errors are reported per
+row (with its line number), and usernames must be unique within the file and
+not taken, checked with one query per chunk. The chunk's passwords are then
+hashed in parallel and its users inserted with a single bulk_create; if a
+username was taken in the meantime, that chunk falls back to row-by-row
+inserts and reports the conflicting rows. Password hashing is what takes the
+time (PBKDF2 runs 600,000 iterations per password), and the hashers spend it
+in C with the GIL released, so a thread pool scales too; it is used where
+processes cannot be started, e.g. inside Celery's prefork workers.
+
+Imports uploaded through the API are far too slow for a web request, so they
+are stored as a UserImportJob and run by import_users_task (run_import_job).
+"""
+import csv
+import io
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice, repeat
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from config.cache import two_tier_cache
+from .models import User, UserImportJob
+from .serializers import UserImportRowSerializer
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('csv', 'ndjson')
+# Password slices per worker, so a slow slice does not leave the other workers idle.
+SLICES_PER_WORKER = 4
+
+
+class ImportFormatError(ValueError):
+    """Raised for an unknown import format."""
+
+
+def detect_format(filename, default='csv'):
+    """'ndjson' for .ndjson/.jsonl files, 'csv' for .csv, else `default`."""
+    extension = os.path.splitext(filename or '')[1].lower()
+    return {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}.get(extension, default)
+
+
+def read_rows(stream, fmt):
+    """Yield (line, row, error) for each record of a text stream; row is a dict, or None with an error."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {key.strip(): value for key, value in row.items() if key}, None
+    elif fmt == 'ndjson':
+        for line, text in enumerate(stream, start=1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError as e:
+                yield line, None, f'Invalid JSON: {e}'
+                continue
+            if isinstance(row, dict):
+                yield line, row, None
+            else:
+                yield line, None, 'Expected a JSON object.'
+    else:
+        raise ImportFormatError(f'Unknown format {fmt!r}; expected one of {", ".join(FORMATS)}.')
+
+
+def text_stream(upload):
+    """A text stream over an uploaded (binary) file, tolerating a UTF-8 byte order mark."""
+    return io.TextIOWrapper(upload, encoding='utf-8-sig', newline='')
+
+
+def check_hasher():
+    """Fail early if the default hasher's library (argon2-cffi, bcrypt) is not installed."""
+    hasher = get_hasher('default')
+    if hasher.library:
+        hasher._load_library()
+    return hasher.algorithm
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def _hash_slice(passwords, algorithm):
+    # A blank password gives an unusable one, which costs no hashing.
+    return [make_password(password or None, hasher=algorithm) for password in passwords]
+
+
+def password_pool(workers, pool=None):
+    """An executor for hash_passwords: processes by default, threads inside daemon processes or on request."""
+    pool = pool or settings.USER_IMPORT_POOL
+    if pool == 'process' and not multiprocessing.current_process().daemon:
+        return ProcessPoolExecutor(workers, initializer=_init_worker)
+    return ThreadPoolExecutor(workers)
+
+
+def hash_passwords(passwords, executor, workers, algorithm):
+    """Hashes of `passwords` in order, computed in slices across `executor`'s `workers` workers."""
+    if not passwords:
+        return []
+    slices = max(1, workers * SLICES_PER_WORKER)
+    size = -(-len(passwords) // slices)
+    parts = [passwords[start:start + size] for start in range(0, len(passwords), size)]
+    return [hashed for part in executor.map(_hash_slice, parts, repeat(algorithm)) for hashed in part]
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _insert(users, lines, fail):
+    """Insert `users` with one bulk_create, or one by one if a username was taken meanwhile; return those created."""
+    try:
+        with transaction.atomic():
+            return User.objects.bulk_create(users)
+    except IntegrityError:
+        pass
+    created = []
+    for user, line in zip(users, lines):
+        try:
+            with transaction.atomic():
+                user.save(force_insert=True)
+        except IntegrityError:
+            fail(line, user.username, {'username': ['A user with that username already exists.']})
+        else:
+            created.append(user)
+    return created
+
+
+def import_users(stream, fmt, dry_run=False, validate_passwords=True, chunk_size=None, workers=None, pool=None,
+                 progress=None):
+    """Validate and create the users of a CSV or NDJSON text stream.
+
+    Returns {rows, created, failed, errors, dry_run}; `errors` lists
+    {line, username, errors} for the first USER_IMPORT_MAX_ERRORS failed rows.
+    A dry run only validates, without hashing or writing anything.
+    `progress`, if given, is called with the report after every chunk.
+    """
+    algorithm = check_hasher()
+    chunk_size = chunk_size or settings.USER_IMPORT_CHUNK_SIZE
+    workers = workers or settings.USER_IMPORT_WORKERS or os.cpu_count() or 1
+    report = {'rows': 0, 'created': 0, 'failed': 0, 'errors': [], 'dry_run': dry_run}
+    seen = set()
+
+    def fail(line, username, errors):
+        report['failed'] += 1
+        if len(report['errors']) < settings.USER_IMPORT_MAX_ERRORS:
+            report['errors'].append({'line': line, 'username': username, 'errors': errors})
+
+    executor = None if dry_run else password_pool(workers, pool)
+    try:
+        for chunk in _chunks(read_rows(stream, fmt), chunk_size):
+            report['rows'] += len(chunk)
+            valid = []
+            for line, row, error in chunk:
+                if error:
+                    fail(line, None, {'row': [error]})
+                    continue
+                serializer = UserImportRowSerializer(data=row, context={'validate_passwords': validate_passwords})
+                if not serializer.is_valid():
+                    errors = {field: [str(message) for message in messages]
+                              for field, messages in serializer.errors.items()}
+                    fail(line, row.get('username'), errors)
+                    continue
+                data = serializer.validated_data
+                if data['username'] in seen:
+                    fail(line, data['username'], {'username': ['Duplicate username in this file.']})
+                    continue
+                seen.add(data['username'])
+                valid.append((line, data))
+
+            taken = set(
+                User.objects.filter(username__in=[data['username'] for _, data in valid])
+                .values_list('username', flat=True)
+            )
+            for line, data in valid:
+                if data['username'] in taken:
+                    fail(line, data['username'], {'username': ['A user with that username already exists.']})
+            valid = [(line, data) for line, data in valid if data['username'] not in taken]
+            if dry_run:
+                report['created'] += len(valid)
+            elif valid:
+                hashes = hash_passwords([data['password'] for _, data in valid], executor, workers, algorithm)
+                users = [User(**{**data, 'password': hashed}) for (_, data), hashed in zip(valid, hashes)]
+                created = _insert(users, [line for line, _ in valid], fail)
+                report['created'] += len(created)
+                # bulk_create sends no post_save, so invalidate the user caches here.
+                pks = [user.pk for user in created if user.pk is not None]
+                two_tier_cache().delete('users', *pks)
+                two_tier_cache().delete('auth', *pks)
+            if progress:
+                progress(report)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return report
+
+
+def run_import_job(job):
+    """Run a pending UserImportJob, recording its report; the uploaded data is cleared either way."""
+    claimed = UserImportJob.objects.filter(pk=job.pk, status=UserImportJob.Status.PENDING).update(
+        status=UserImportJob.Status.RUNNING, updated_at=timezone.now()
+    )
+    if not claimed:
+        # Already run, or running elsewhere (a redelivered message).
+        job.refresh_from_db()
+        return job
+
+    def progress(report):
+        UserImportJob.objects.filter(pk=job.pk).update(report=report, updated_at=timezone.now())
+
+    job.status = UserImportJob.Status.RUNNING
+    try:
+        job.report = import_users(io.StringIO(job.data), job.format, dry_run=job.dry_run, progress=progress)
+        job.status = UserImportJob.Status.COMPLETED
+    except Exception as e:
+        # Chunks inserted so far stay; the last progress report says how far it got.
+        logger.exception('User import %s failed', job.pk)
+        job.refresh_from_db(fields=['report'])
+        job.status = UserImportJob.Status.FAILED
+        job.error = str(e)
+    job.data = ''
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'report', 'error', 'data', 'finished_at', 'updated_at'])
+    return job
@@ -1,15 +1,27 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
-from .models import User
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.media.service import variant_urls
+from .authentication import add_token_claims, check_token_version
+from .cache import auth_state
+from .models import User, UserImportJob
 
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for user model."""
+    profile_image_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'role', 
-                  'bio', 'profile_image', 'is_active_user', 'created_at', 'updated_at']
+                  'bio', 'profile_image', 'profile_image_variants', 'is_active_user',
+                  'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+    
+    def get_profile_image_variants(self, obj):
+        return variant_urls(obj.profile_image_asset)
 
 
 class UserCreateSerializer(serializers.ModelSerializer):
@@ -30,8 +42,7 @@ class UserCreateSerializer(serializers.ModelSerializer):
         # Remove password from validated_data
         password = validated_data.pop('password')
         
-        # Create user without password first
-        user = User.objects.create(
+        user = User(
             username=validated_data['username'],
             email=validated_data['email'],
             first_name=validated_data.get('first_name', ''),
@@ -40,13 +51,44 @@ class UserCreateSerializer(serializers.ModelSerializer):
             is_active=True
         )
         
-        # Set password properly (this hashes it)
+        # Hash before the first save, so the user is written with one INSERT
         user.set_password(password)
         user.save()
         
         return user
 
 
+class UserImportRowSerializer(serializers.Serializer):
+    """One row of a bulk user import; uniqueness is checked per chunk by apps.users.provisioning."""
+    username = serializers.CharField(max_length=150, validators=[User.username_validator])
+    email = serializers.EmailField(required=False, allow_blank=True, default='')
+    # Blank means an unusable password: the user sets one through a password reset.
+    password = serializers.CharField(required=False, allow_blank=True, default='', trim_whitespace=False)
+    first_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default='')
+    last_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default='')
+    role = serializers.ChoiceField(choices=User.Role.choices, required=False, default=User.Role.VIEWER)
+    
+    def validate(self, data):
+        if data['password'] and self.context.get('validate_passwords', True):
+            user = User(username=data['username'], email=data['email'],
+                        first_name=data['first_name'], last_name=data['last_name'])
+            try:
+                validate_password(data['password'], user)
+            except DjangoValidationError as e:
+                raise serializers.ValidationError({'password': list(e.messages)})
+        return data
+
+
+class UserImportJobSerializer(serializers.ModelSerializer):
+    """Status and report of a bulk user import."""
+
+    class Meta:
+        model = UserImportJob
+        fields = ['id', 'status', 'format', 'filename', 'dry_run', 'report', 'error',
+                  'created_at', 'updated_at', 'finished_at']
+        read_only_fields = fields
+
+
 class UserDetailSerializer(serializers.ModelSerializer):
     """Serializer for user detail with all fields."""
     
@@ -55,3 +97,33 @@ class UserDetailSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'role', 
                   'bio', 'profile_image', 'is_active_user', 'is_staff', 'is_superuser',
                   'created_at', 'updated_at']
+
+
+class ChangePasswordSerializer(serializers.Serializer):
+    """Serializer for changing the current user's password."""
+    old_password = serializers.CharField(write_only=True)
+    new_password = serializers.CharField(write_only=True, validators=[validate_password])
+    
+    def validate_old_password(self, value):
+        if not self.context['request'].user.check_password(value):
+            raise serializers.ValidationError('Current password is incorrect.')
+        return value
+
+
+class VersionedTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Login serializer whose tokens carry the user's token version and role claims."""
+    
+    @classmethod
+    def get_token(cls, user):
+        return add_token_claims(super().get_token(user), user)
+
+
+class VersionedTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh serializer that refuses refresh tokens revoked since they were issued."""
+    
+    def validate(self, attrs):
+        refresh = RefreshToken(attrs['refresh'])
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        if user_id is not None:
+            check_token_version(auth_state(user_id), refresh.payload)
+        return super().validate(attrs)
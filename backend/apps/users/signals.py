@@ -0,0 +1,39 @@
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from config.cache import two_tier_cache
+from .authentication import ROLE_CLAIMS
+from .models import User
+
+# Tokens carry the role claims and are only accepted for active users, so a
+# change to any of these, from the API, the admin site or a shell, revokes them.
+TOKEN_FIELDS = (*ROLE_CLAIMS, 'is_active', 'is_active_user')
+
+
+@receiver(pre_save, sender=User)
+def detect_token_field_changes(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._revoke_tokens = False
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    # Fields not loaded on the instance are not written, so they cannot change.
+    fields = set(TOKEN_FIELDS) - instance.get_deferred_fields()
+    if update_fields is not None:
+        fields &= set(update_fields)
+    if not fields:
+        return
+    stored = User.objects.filter(pk=instance.pk).values(*fields).first()
+    instance._revoke_tokens = stored is not None and any(
+        stored[name] != getattr(instance, name) for name in fields
+    )
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_users(sender, instance, **kwargs):
+    if getattr(instance, '_revoke_tokens', False):
+        # An update, so it works whatever update_fields the save was given.
+        User.objects.filter(pk=instance.pk).update(token_version=F('token_version') + 1)
+        instance.refresh_from_db(fields=['token_version'])
+        instance._revoke_tokens = False
+    two_tier_cache().delete('users', instance.pk)
+    # Deactivation, role changes and revoked tokens take effect on the user's next request.
+    two_tier_cache().delete('auth', instance.pk)
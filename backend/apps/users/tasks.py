@@ -0,0 +1,10 @@
+from celery import shared_task
+from apps.users.models import UserImportJob
+from apps.users.provisioning import run_import_job
+
+
+@shared_task(soft_time_limit=3600, time_limit=3660)
+def import_users_task(job_id):
+    """Celery task to run a bulk user import uploaded through the API."""
+    job = run_import_job(UserImportJob.objects.get(id=job_id))
+    return {'status': job.status, 'created': (job.report or {}).get('created', 0)}
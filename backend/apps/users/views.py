@@ -2,15 +2,23 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
+from django.conf import settings
+from django.db import transaction
 from django.shortcuts import get_object_or_404
-from .models import User
-from .serializers import UserSerializer, UserCreateSerializer, UserDetailSerializer
+from django.urls import reverse
+from . import provisioning
+from .models import User, UserImportJob
+from .serializers import (
+    UserSerializer, UserCreateSerializer, UserDetailSerializer, ChangePasswordSerializer,
+    UserImportJobSerializer, VersionedTokenObtainPairSerializer
+)
+from .tasks import import_users_task
 
 
 class UserViewSet(viewsets.ModelViewSet):
     """ViewSet for managing users with role-based access control."""
     
-    queryset = User.objects.all()
+    queryset = User.objects.select_related('profile_image_asset')
     permission_classes = [IsAuthenticated]
     filterset_fields = ['role', 'is_active_user']
     search_fields = ['username', 'email', 'first_name', 'last_name']
@@ -28,7 +36,7 @@ class UserViewSet(viewsets.ModelViewSet):
         """Assign permissions based on action."""
         if self.action == 'create':
             permission_classes = [AllowAny]  # Allow user registration
-        elif self.action in ['destroy', 'update', 'partial_update']:
+        elif self.action in ['destroy', 'update', 'partial_update', 'bulk_import', 'bulk_import_status']:
             permission_classes = [IsAdminUser]
         elif self.action == 'register':
             permission_classes = [AllowAny]
@@ -36,6 +44,10 @@ class UserViewSet(viewsets.ModelViewSet):
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
     
+    def get_current_user(self):
+        # request.user holds only the fields authentication needs; load the full row once.
+        return self.get_queryset().get(pk=self.request.user.pk)
+    
     @action(detail=False, methods=['post'], permission_classes=[AllowAny])
     def register(self, request):
         """Register a new user."""
@@ -53,19 +65,36 @@ class UserViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def profile(self, request):
         """Get current user's profile."""
-        serializer = self.get_serializer(request.user)
+        serializer = self.get_serializer(self.get_current_user())
         return Response(serializer.data)
     
     @action(detail=False, methods=['put'], permission_classes=[IsAuthenticated])
     def profile_update(self, request):
         """Update current user's profile."""
-        user = request.user
+        user = self.get_current_user()
         serializer = self.get_serializer(user, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def change_password(self, request):
+        """Change the current user's password, revoking all their tokens, and return new ones."""
+        serializer = ChangePasswordSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        # Not request.user: its role fields may come from the token and must not be written back.
+        user = self.get_current_user()
+        user.set_password(serializer.validated_data['new_password'])
+        user.revoke_tokens()
+        user.save(update_fields=['password', 'token_version'])
+        refresh = VersionedTokenObtainPairSerializer.get_token(user)
+        return Response({
+            'status': 'password changed',
+            'refresh': str(refresh),
+            'access': str(refresh.access_token),
+        })
+    
     @action(detail=True, methods=['post'], permission_classes=[IsAdminUser])
     def deactivate(self, request, pk=None):
         """Deactivate a user."""
@@ -97,3 +126,47 @@ class UserViewSet(viewsets.ModelViewSet):
         user.role = role
         user.save()
         return Response({'status': f'user role set to {role}'})
+    
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser], url_path='bulk-import')
+    def bulk_import(self, request):
+        """Queue an import of users from an uploaded CSV or NDJSON file; see apps.users.provisioning."""
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if upload.size > settings.USER_IMPORT_MAX_UPLOAD_MB * 1024 * 1024:
+            return Response(
+                {'error': f'File is larger than {settings.USER_IMPORT_MAX_UPLOAD_MB} MB; use the import_users command'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        fmt = request.data.get('format') or provisioning.detect_format(upload.name)
+        if fmt not in provisioning.FORMATS:
+            return Response(
+                {'error': f'Unknown format {fmt!r}; expected one of {", ".join(provisioning.FORMATS)}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            data = upload.read().decode('utf-8-sig')
+        except UnicodeDecodeError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        # Hashing runs at a few passwords per second per CPU, far too slow for a request.
+        job = UserImportJob.objects.create(
+            format=fmt,
+            filename=upload.name[:255],
+            dry_run=str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes'),
+            data=data,
+            created_by=request.user,
+        )
+        transaction.on_commit(lambda: import_users_task.delay(job.id))
+        status_url = request.build_absolute_uri(reverse('user-bulk-import-status', args=[job.id]))
+        return Response(
+            {**UserImportJobSerializer(job).data, 'status_url': status_url},
+            status=status.HTTP_202_ACCEPTED,
+            headers={'Location': status_url}
+        )
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser],
+            url_path=r'bulk-import/(?P<job_id>[0-9]+)', url_name='bulk-import-status')
+    def bulk_import_status(self, request, job_id=None):
+        """Status of a bulk import, with its report (so far, while it runs)."""
+        job = get_object_or_404(UserImportJob, pk=job_id)
+        return Response(UserImportJobSerializer(job).data)
@@ -0,0 +1,111 @@
+"""
+Compare AI analysis strategies per blog against the local mock OpenAI server.
+
+  sequential   summary, key points and sentiment requests one after another
+  concurrent   the same three requests in parallel threads
+  combined     one JSON-schema request (AI_ANALYSIS_MODE=combined)
+  combined+N%  combined with N% malformed replies, exercising the concurrent fallback
+
+Reports end-to-end latency per blog and tokens spent per blog:
+
+    python benchmarks/ai_analysis.py --posts 30 --latency-ms 300 --token-ms 5
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+
+from apps.ai_service.mock_server import start_server  # noqa: E402
+from apps.ai_service.providers import OpenAIProvider  # noqa: E402
+from apps.ai_service.service import AIService  # noqa: E402
+
+WORDS = (
+    'django query cache index latency worker request database model view token '
+    'async pool replica thread process memory network server client schema'
+).split()
+
+
+def make_post(rng, paragraphs):
+    sentences = [
+        ' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 18))).capitalize() + '.'
+        for _ in range(paragraphs * 5)
+    ]
+    return SimpleNamespace(content='\n\n'.join(
+        ' '.join(sentences[i:i + 5]) for i in range(0, len(sentences), 5)
+    ))
+
+
+def run_sequential(service, blog):
+    service.generate_summary(blog.content)
+    service.extract_key_points(blog.content)
+    service.analyze_sentiment(blog.content)
+
+
+def run_strategy(provider, posts, strategy):
+    latencies, tokens, fallbacks = [], [], 0
+    for blog in posts:
+        service = AIService(provider=provider)
+        started = time.perf_counter()
+        if strategy == 'sequential':
+            run_sequential(service, blog)
+        else:
+            settings.AI_ANALYSIS_MODE = strategy
+            result = service.generate_complete_summary(blog, use_cache=False)
+            assert result['status'] == 'success', result
+            fallbacks += result['mode'] == 'fallback'
+        latencies.append(time.perf_counter() - started)
+        tokens.append(service.usage['prompt_tokens'] + service.usage['completion_tokens'])
+    return {
+        'p50_ms': statistics.median(latencies) * 1000,
+        'mean_ms': statistics.mean(latencies) * 1000,
+        'tokens': statistics.mean(tokens),
+        'fallbacks': fallbacks,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=30)
+    parser.add_argument('--paragraphs', type=int, default=8)
+    parser.add_argument('--latency-ms', type=float, default=300)
+    parser.add_argument('--token-ms', type=float, default=5)
+    parser.add_argument('--malformed-rate', type=float, default=0.1)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    posts = [make_post(rng, args.paragraphs) for _ in range(args.posts)]
+    runs = [
+        ('sequential', 'sequential', 0.0),
+        ('concurrent', 'concurrent', 0.0),
+        ('combined', 'combined', 0.0),
+        (f'combined+{args.malformed_rate:.0%}', 'combined', args.malformed_rate),
+    ]
+
+    print(f"{'strategy':<14} {'p50 ms':>8} {'mean ms':>8} {'tokens/blog':>12} {'fallbacks':>10}")
+    for label, strategy, malformed_rate in runs:
+        server = start_server(
+            latency_ms=args.latency_ms, token_ms=args.token_ms, malformed_rate=malformed_rate
+        )
+        provider = OpenAIProvider(api_key='mock', base_url=f'http://127.0.0.1:{server.server_port}/v1')
+        result = run_strategy(provider, posts, strategy)
+        server.shutdown()
+        print(
+            f"{label:<14} {result['p50_ms']:>8.0f} {result['mean_ms']:>8.0f} "
+            f"{result['tokens']:>12.0f} {result['fallbacks']:>10}"
+        )
+
+
+if __name__ == '__main__':
+    main()
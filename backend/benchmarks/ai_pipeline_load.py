@@ -0,0 +1,149 @@
+"""
+Load test of the AI summarization pipeline against the bundled mock server.
+
+Runs generate_complete_summary for many posts from a pool of worker threads
+(as Celery worker threads or a batch job would) with injected 500s and 429s,
+and reports posts/sec, latency percentiles, retries, failures and how many TCP
+connections the provider opened. 'pooled' is the shared keep-alive client;
+'no-keepalive' closes the connection after every request, as a client created
+per call does. Both are capped at AI_HTTP_MAX_CONNECTIONS concurrent requests.
+The mock server runs in a child process so it does not compete with the
+client for the GIL.
+
+    python benchmarks/ai_pipeline_load.py --posts 200 --concurrency 32 --error-rate 0.05
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+import httpx  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+from apps.ai_service.mock_server import start_server  # noqa: E402
+from apps.ai_service.providers import OpenAIProvider  # noqa: E402
+from apps.ai_service.service import AIService, TransientAIError  # noqa: E402
+
+WORDS = (
+    'django query cache index latency worker request database model view token '
+    'async pool replica thread process memory network server client schema'
+).split()
+
+
+class NoKeepAliveProvider(OpenAIProvider):
+    """OpenAIProvider that opens a new connection for every request."""
+
+    def http_client(self):
+        return httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=settings.AI_HTTP_MAX_CONNECTIONS, max_keepalive_connections=0),
+            timeout=httpx.Timeout(settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT)
+        )
+
+
+def make_post(rng, paragraphs):
+    sentences = [
+        ' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 18))).capitalize() + '.'
+        for _ in range(paragraphs * 5)
+    ]
+    return SimpleNamespace(content='\n\n'.join(
+        ' '.join(sentences[i:i + 5]) for i in range(0, len(sentences), 5)
+    ))
+
+
+def serve(faults, ports):
+    ports.put(start_server(**faults).server_port)
+    threading.Event().wait()
+
+
+def summarize(provider, blog):
+    service = AIService(provider=provider)
+    started = time.perf_counter()
+    try:
+        result = service.generate_complete_summary(blog, use_cache=False)
+        ok = result['status'] == 'success' and result['mode'] != 'local_fallback'
+    except TransientAIError:
+        ok = False
+    return time.perf_counter() - started, ok, service.usage['retries']
+
+
+def run(provider_class, posts, args):
+    faults = dict(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, token_ms=args.token_ms,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, retry_after=0.2
+    )
+    ports = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(faults, ports), daemon=True)
+    server.start()
+    port = ports.get()
+    base_url = f'http://127.0.0.1:{port}/v1'
+    settings.OPENAI_BASE_URL = base_url
+    provider = provider_class(api_key='mock', base_url=base_url)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(lambda blog: summarize(provider, blog), posts))
+    elapsed = time.perf_counter() - started
+    stats = json.loads(httpx.get(f'http://127.0.0.1:{port}/stats').text)
+    server.terminate()
+
+    latencies = sorted(latency for latency, _, _ in results)
+    return {
+        'posts_per_s': len(posts) / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        'retries': sum(retries for _, _, retries in results),
+        'failed': sum(not ok for _, ok, _ in results),
+        'requests': stats.get('requests', 0),
+        'connections': stats.get('connections', 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=200)
+    parser.add_argument('--paragraphs', type=int, default=8)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--latency-ms', type=float, default=200)
+    parser.add_argument('--jitter-ms', type=float, default=100)
+    parser.add_argument('--token-ms', type=float, default=1)
+    parser.add_argument('--error-rate', type=float, default=0.05, help='Fraction of requests answered with 500.')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.02, help='Fraction answered with 429.')
+    args = parser.parse_args()
+
+    settings.AI_BACKEND = 'openai'
+    settings.AI_ANALYSIS_MODE = 'combined'
+    settings.AI_RATE_LIMITER = 'none'
+    settings.AI_LOCAL_FALLBACK = True
+    settings.AI_BACKOFF_BASE = 0.05
+    settings.AI_BACKOFF_MAX = 1.0
+
+    rng = random.Random(0)
+    posts = [make_post(rng, args.paragraphs) for _ in range(args.posts)]
+
+    print(
+        f"{'client':<14} {'posts/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'retries':>8} "
+        f"{'failed':>7} {'requests':>9} {'connections':>12}"
+    )
+    for label, provider_class in (('pooled', OpenAIProvider), ('no-keepalive', NoKeepAliveProvider)):
+        result = run(provider_class, posts, args)
+        print(
+            f"{label:<14} {result['posts_per_s']:>8.1f} {result['p50_ms']:>8.0f} {result['p95_ms']:>8.0f} "
+            f"{result['retries']:>8} {result['failed']:>7} {result['requests']:>9} {result['connections']:>12}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Time to first token with streamed summaries, against the bundled mock server.
+
+For each post, runs generate_complete_summary with a TaskStream on the local
+broker and records when the first summary token was published and when the
+full result was ready; without streaming, clients see nothing until the end.
+
+    python benchmarks/ai_streaming.py --posts 20 --latency-ms 300 --token-ms 10
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+
+from apps.ai_service.mock_server import start_server  # noqa: E402
+from apps.ai_service.providers import OpenAIProvider  # noqa: E402
+from apps.ai_service.service import AIService  # noqa: E402
+from apps.ai_service.streaming import LocalStreamBroker, TaskStream  # noqa: E402
+
+WORDS = (
+    'django query cache index latency worker request database model view token '
+    'async pool replica thread process memory network server client schema'
+).split()
+
+
+class TimedBroker(LocalStreamBroker):
+    """Records when the first token of each channel was published."""
+
+    def __init__(self):
+        super().__init__()
+        self.first_token = {}
+
+    def publish(self, channel, event, data):
+        if event == 'token':
+            self.first_token.setdefault(channel, time.perf_counter())
+        return super().publish(channel, event, data)
+
+
+def make_post(rng, paragraphs):
+    sentences = [
+        ' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 18))).capitalize() + '.'
+        for _ in range(paragraphs * 5)
+    ]
+    return SimpleNamespace(content='\n\n'.join(
+        ' '.join(sentences[i:i + 5]) for i in range(0, len(sentences), 5)
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=20)
+    parser.add_argument('--paragraphs', type=int, default=8)
+    parser.add_argument('--latency-ms', type=float, default=300)
+    parser.add_argument('--token-ms', type=float, default=10)
+    args = parser.parse_args()
+
+    settings.AI_RATE_LIMITER = 'none'
+    server = start_server(latency_ms=args.latency_ms, token_ms=args.token_ms)
+    base_url = f'http://127.0.0.1:{server.server_port}/v1'
+    settings.OPENAI_BASE_URL = base_url
+    provider = OpenAIProvider(api_key='mock', base_url=base_url)
+    broker = TimedBroker()
+
+    rng = random.Random(0)
+    print(f"{'mode':<10} {'first token p50 ms':>19} {'complete p50 ms':>16}")
+    for mode in ('combined', 'concurrent'):
+        settings.AI_ANALYSIS_MODE = mode
+        first, complete = [], []
+        for i in range(args.posts):
+            stream = TaskStream(f'{mode}-{i}', broker)
+            started = time.perf_counter()
+            result = AIService(provider=provider).generate_complete_summary(
+                make_post(rng, args.paragraphs), use_cache=False, stream=stream
+            )
+            assert result['status'] == 'success', result
+            complete.append(time.perf_counter() - started)
+            first.append(broker.first_token[stream.channel] - started)
+        print(f"{mode:<10} {statistics.median(first) * 1000:>19.0f} {statistics.median(complete) * 1000:>16.0f}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
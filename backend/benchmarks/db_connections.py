@@ -0,0 +1,100 @@
+"""
+Requests/sec with and without database connection reuse and pooling.
+
+Runs the full Django request cycle (test client -> GET /api/blogs/blogs/)
+from several threads in a fresh process per profile, so each profile gets
+its own settings:
+
+    direct      DB_CONN_MAX_AGE=0, a new connection per request (old default)
+    persistent  DB_CONN_MAX_AGE=60 with health checks
+    pooled      DB_POOL=True, in-process psycopg2 pool
+
+Point it at PostgreSQL via the usual DB_* environment variables:
+
+    DB_ENGINE=django.db.backends.postgresql DB_HOST=localhost \
+        python benchmarks/db_connections.py --threads 4 --requests 500
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+PROFILES = {
+    'direct': {'DB_CONN_MAX_AGE': '0', 'DB_POOL': 'False'},
+    'persistent': {'DB_CONN_MAX_AGE': '60', 'DB_POOL': 'False'},
+    'pooled': {'DB_POOL': 'True'},
+}
+
+
+def run_profile(threads, requests):
+    import django
+    django.setup()
+    from django.test import Client
+    from config.db import connection_stats
+
+    per_thread = requests // threads
+    errors = []
+
+    def worker():
+        client = Client()
+        for _ in range(per_thread):
+            response = client.get('/api/blogs/blogs/')
+            if response.status_code != 200:
+                errors.append(response.status_code)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'requests': per_thread * threads,
+        'errors': len(errors),
+        'rps': per_thread * threads / elapsed,
+        'connections': connection_stats().get('default', {}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--profile', choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        print(json.dumps(run_profile(args.threads, args.requests)))
+        return
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    print(f"{'profile':<11} {'req/s':>8} {'connects':>9} {'avg acquire ms':>15} {'max acquire ms':>15}")
+    for name, env in PROFILES.items():
+        output = subprocess.run(
+            [sys.executable, __file__, '--profile', name,
+             '--threads', str(args.threads), '--requests', str(args.requests)],
+            env={
+                **os.environ, **env,
+                'DJANGO_SETTINGS_MODULE': 'config.settings',
+                'DEBUG': 'False',
+                'ALLOWED_HOSTS': 'testserver',
+                'DB_CONNECTION_METRICS_LOG_EVERY': '0',
+                'PYTHONPATH': backend_dir,
+            },
+            cwd=backend_dir, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        conns = result['connections']
+        print(
+            f"{name:<11} {result['rps']:>8.1f} {conns.get('count', 0):>9} "
+            f"{conns.get('avg_ms', 0):>15.2f} {conns.get('max_ms', 0):>15.2f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Throughput of the offline extractive engine (apps.ai_service.extractive).
+
+Analyzes a corpus of posts in one process and reports posts/sec and latency
+percentiles. By default the corpus is the bundled sample posts
+(create_sample_blogs.py) repeated with shuffled paragraphs; --from-db uses
+the published posts in the configured database instead.
+
+    python benchmarks/extractive_summaries.py --posts 5000
+"""
+import argparse
+import ast
+import os
+import random
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+
+def sample_posts():
+    """Contents of SAMPLE_BLOGS, read without running the script."""
+    with open(os.path.join(BACKEND_DIR, 'create_sample_blogs.py')) as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and getattr(node.targets[0], 'id', None) == 'SAMPLE_BLOGS':
+            return [blog['content'] for blog in ast.literal_eval(node.value)]
+    raise RuntimeError('SAMPLE_BLOGS not found')
+
+
+def synthetic_corpus(count, seed=0):
+    rng = random.Random(seed)
+    paragraphs = [p for content in sample_posts() for p in content.split('\n\n')]
+    return ['\n\n'.join(rng.sample(paragraphs, rng.randint(15, 40))) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=2000)
+    parser.add_argument('--from-db', action='store_true')
+    args = parser.parse_args()
+
+    import django
+    django.setup()
+    from apps.ai_service import extractive
+
+    if args.from_db:
+        from apps.blogs.models import Blog
+        corpus = list(Blog.objects.filter(status='published').values_list('content', flat=True)[:args.posts])
+    else:
+        corpus = synthetic_corpus(args.posts)
+
+    latencies = []
+    started = time.perf_counter()
+    for content in corpus:
+        t = time.perf_counter()
+        extractive.analyze(content)
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    words = statistics.mean(len(content.split()) for content in corpus)
+    print(f"{len(corpus)} posts (avg {words:.0f} words) in {elapsed:.2f}s: {len(corpus) / elapsed:.0f} posts/s")
+    print(
+        f"p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+        f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.1f} ms, "
+        f"max {latencies[-1] * 1000:.1f} ms"
+    )
+
+
+if __name__ == '__main__':
+    main()
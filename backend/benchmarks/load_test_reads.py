@@ -0,0 +1,87 @@
+"""
+Load test for the public read endpoints.
+
+Opens a fixed number of concurrent keep-alive connections against one or more
+base URLs and reports requests/sec and latency percentiles. Compare the sync
+WSGI deployment with the ASGI one at equal worker counts, e.g.:
+
+    gunicorn --workers 4 --bind 127.0.0.1:8000 config.wsgi:application
+    gunicorn --workers 4 -k uvicorn.workers.UvicornWorker --bind 127.0.0.1:8001 config.asgi:application
+
+    python benchmarks/load_test_reads.py \
+        --target wsgi=http://127.0.0.1:8000/api/blogs/ \
+        --target asgi=http://127.0.0.1:8001/api/blogs/async/ \
+        --concurrency 64 --duration 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+DEFAULT_PATHS = ['blogs/?status=published', 'categories/', 'tags/']
+
+
+async def _worker(client, urls, deadline, latencies, errors):
+    i = 0
+    while time.perf_counter() < deadline:
+        url = urls[i % len(urls)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            response = await client.get(url)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+                continue
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(base_url, paths, concurrency, duration):
+    urls = [base_url.rstrip('/') + '/' + path for path in paths]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    latencies, errors = [], []
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*[
+            _worker(client, urls, deadline, latencies, errors) for _ in range(concurrency)
+        ])
+
+    if not latencies:
+        return {'rps': 0.0, 'errors': len(errors)}
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': len(latencies) / duration,
+        'mean_ms': statistics.mean(latencies) * 1000,
+        'p50_ms': pct(0.50),
+        'p95_ms': pct(0.95),
+        'p99_ms': pct(0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', action='append', required=True, help='name=base_url')
+    parser.add_argument('--path', action='append', dest='paths', help='path relative to the base URL')
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=20)
+    args = parser.parse_args()
+
+    print(f"{'target':<10} {'req/s':>9} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for target in args.target:
+        name, base_url = target.split('=', 1)
+        result = asyncio.run(run(base_url, args.paths or DEFAULT_PATHS, args.concurrency, args.duration))
+        print(
+            f"{name:<10} {result['rps']:>9.1f} {result.get('mean_ms', 0):>9.1f} {result.get('p50_ms', 0):>8.1f} "
+            f"{result.get('p95_ms', 0):>8.1f} {result.get('p99_ms', 0):>8.1f} {result['errors']:>7}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Password hashing throughput and bulk user import time.
+
+Hashes the same batch of passwords with each available hasher (PBKDF2 and
+scrypt always; Argon2 and bcrypt when argon2-cffi and bcrypt are installed)
+sequentially, across a thread pool and across a process pool, and reports
+hashes/sec for each. Then imports a generated CSV of users with
+apps.users.provisioning inside a transaction that is rolled back, so the
+database is left as it was.
+
+    python benchmarks/password_hashing.py --passwords 64 --workers 4 --users 2000
+"""
+import argparse
+import io
+import os
+import secrets
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import transaction  # noqa: E402
+from django.utils.module_loading import import_string  # noqa: E402
+
+from apps.users.provisioning import _hash_slice, _init_worker, hash_passwords, import_users  # noqa: E402
+
+
+class Rollback(Exception):
+    pass
+
+
+def available_hashers():
+    """(profile, algorithm) for each hasher profile whose library is installed."""
+    for profile, path in settings.PASSWORD_HASHER_PROFILES.items():
+        hasher = import_string(path)()
+        try:
+            if hasher.library:
+                hasher._load_library()
+        except ValueError as e:
+            print(f"{profile:8} skipped: {e}")
+            continue
+        yield profile, hasher.algorithm
+
+
+def rate(count, started):
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--passwords', type=int, default=32, help='Passwords hashed per hasher and mode.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--users', type=int, default=1000, help='Rows in the import run (0 skips it).')
+    args = parser.parse_args()
+
+    passwords = [secrets.token_urlsafe(12) for _ in range(args.passwords)]
+    print(f"{os.cpu_count()} CPUs, {args.workers} workers, {args.passwords} passwords per run")
+    for profile, algorithm in available_hashers():
+        started = time.perf_counter()
+        _hash_slice(passwords, algorithm)
+        results = [f"sequential {rate(len(passwords), started):7.1f}/s"]
+        for name, executor in (
+            ('threads', ThreadPoolExecutor(args.workers)),
+            ('processes', ProcessPoolExecutor(args.workers, initializer=_init_worker)),
+        ):
+            with executor:
+                hash_passwords(passwords[:args.workers], executor, args.workers, algorithm)  # start the workers
+                started = time.perf_counter()
+                hash_passwords(passwords, executor, args.workers, algorithm)
+                results.append(f"{name} {rate(len(passwords), started):7.1f}/s")
+        print(f"{profile:8} " + ', '.join(results))
+
+    if args.users:
+        csv = io.StringIO('username,email,password,role\n' + ''.join(
+            f"bench{i},bench{i}@example.com,{secrets.token_urlsafe(12)},viewer\n" for i in range(args.users)
+        ))
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                report = import_users(csv, 'csv', workers=args.workers)
+                raise Rollback
+        except Rollback:
+            pass
+        elapsed = time.perf_counter() - started
+        print(f"import   {report['created']} users ({settings.PASSWORD_HASHER_PROFILE}, {settings.USER_IMPORT_POOL} "
+              f"pool) in {elapsed:.1f}s, {report['created'] / elapsed:.1f} users/s (rolled back)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Semantic search latency and accuracy on a synthetic corpus.
+
+Generates posts on a few hundred topics (each with its own vocabulary, mixed
+with shared filler words), fits the embedder on a sample, embeds every post,
+builds the IVF index, memory-maps it back from disk and runs keyword-free
+queries of topic words. Reports query latency (embedding plus index search),
+recall@10 against an exhaustive scan of all embeddings, and topic precision
+(the share of results on the query's topic).
+
+    python benchmarks/semantic_search.py --posts 100000 --nprobe 16
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+import numpy as np  # noqa: E402
+
+from apps.search.embedding import Embedder, document_text  # noqa: E402
+from apps.search.index import IVFIndex  # noqa: E402
+
+
+def make_vocabulary(rng, size):
+    syllables = ['ka', 'lo', 'mi', 'ne', 'ru', 'si', 'ta', 'vo', 'ze', 'pa', 'qui', 'dor', 'fen', 'gal', 'hux']
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def make_corpus(rng, posts, topics, words_per_topic, length):
+    vocabulary = make_vocabulary(rng, topics * words_per_topic + 2000)
+    topic_words = [vocabulary[i * words_per_topic:(i + 1) * words_per_topic] for i in range(topics)]
+    filler = vocabulary[topics * words_per_topic:]
+    labels = [rng.randrange(topics) for _ in range(posts)]
+    texts = []
+    for topic in labels:
+        words = [
+            rng.choice(topic_words[topic]) if rng.random() < 0.35 else rng.choice(filler)
+            for _ in range(length)
+        ]
+        texts.append(document_text(' '.join(rng.sample(topic_words[topic], 3)), '', ' '.join(words)))
+    return texts, np.array(labels), topic_words
+
+
+def percentile(values, fraction):
+    return sorted(values)[int(len(values) * fraction) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=100_000)
+    parser.add_argument('--topics', type=int, default=300)
+    parser.add_argument('--length', type=int, default=120, help='Words per post.')
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--fit-sample', type=int, default=20_000)
+    parser.add_argument('--hash-bits', type=int, default=16)
+    parser.add_argument('--dimensions', type=int, default=128)
+    parser.add_argument('--nprobe', type=int, default=16)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    started = time.perf_counter()
+    texts, labels, topic_words = make_corpus(rng, args.posts, args.topics, 25, args.length)
+    print(f"corpus     {args.posts} posts, {args.topics} topics ({time.perf_counter() - started:.1f}s)")
+
+    started = time.perf_counter()
+    embedder = Embedder.fit(rng.sample(texts, min(args.fit_sample, len(texts))), 2 ** args.hash_bits, args.dimensions)
+    print(f"fit        {min(args.fit_sample, len(texts))} posts in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    vectors = embedder.embed_many(texts)
+    elapsed = time.perf_counter() - started
+    print(f"embed      {elapsed:.1f}s ({elapsed / len(texts) * 1e6:.0f} us/post)")
+
+    started = time.perf_counter()
+    ids = np.arange(len(texts), dtype=np.int64)
+    index = IVFIndex.build(ids, vectors)
+    print(f"build      {len(index.centroids)} lists in {time.perf_counter() - started:.1f}s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        embedder.save(os.path.join(directory, 'embedder'))
+        index.save(os.path.join(directory, 'index'))
+        embedder = Embedder.load(os.path.join(directory, 'embedder'))
+        index = IVFIndex.load(os.path.join(directory, 'index'))
+        size = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names)
+        print(f"on disk    {size / 2 ** 20:.0f} MiB (memory-mapped)")
+
+        queries = []
+        for _ in range(args.queries):
+            topic = rng.randrange(args.topics)
+            queries.append((topic, ' '.join(rng.sample(topic_words[topic], rng.randint(2, 4)))))
+        for _, query in queries[:20]:
+            index.search(embedder.embed(query), 10, args.nprobe)  # warm the page cache
+
+        latencies, recalls, precisions = [], [], []
+        for topic, query in queries:
+            started = time.perf_counter()
+            vector = embedder.embed(query)
+            found, _ = index.search(vector, 10, args.nprobe)
+            latencies.append((time.perf_counter() - started) * 1000)
+            exact = np.argsort(-(vectors @ vector))[:10]
+            recalls.append(len(set(found.tolist()) & set(exact.tolist())) / 10)
+            precisions.append(float(np.mean(labels[found] == topic)) if len(found) else 0.0)
+
+    print(
+        f"query      p50 {statistics.median(latencies):.2f} ms, p95 {percentile(latencies, 0.95):.2f} ms, "
+        f"p99 {percentile(latencies, 0.99):.2f} ms"
+    )
+    print(f"recall@10  {statistics.mean(recalls):.3f} (vs exhaustive scan, nprobe {args.nprobe})")
+    print(f"precision  {statistics.mean(precisions):.3f} (results on the query's topic)")
+
+
+if __name__ == '__main__':
+    main()
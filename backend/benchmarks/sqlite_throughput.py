@@ -0,0 +1,120 @@
+"""
+Mixed read/write throughput on SQLite: default settings vs performance mode.
+
+Each profile gets a fresh database file and a fresh process (settings are read
+at startup). Several worker processes then run a mix of list reads and
+read-modify-write transactions on blog rows for a fixed duration, the way
+gunicorn workers and a Celery worker share one SQLite file.
+
+    python benchmarks/sqlite_throughput.py --processes 4 --duration 10 --write-ratio 0.2
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+PROFILES = {
+    'default': {'SQLITE_PERFORMANCE_MODE': 'False'},
+    'performance': {'SQLITE_PERFORMANCE_MODE': 'True'},
+}
+
+
+def _worker(args):
+    duration, write_ratio, blog_ids, seed = args
+    from django.db import OperationalError, connections, transaction
+    from apps.blogs.models import Blog
+
+    connections.close_all()
+    rng = random.Random(seed)
+    reads = writes = locked = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        try:
+            if rng.random() < write_ratio:
+                with transaction.atomic():
+                    blog = Blog.objects.get(pk=rng.choice(blog_ids))
+                    blog.views_count += 1
+                    blog.save(update_fields=['views_count'])
+                writes += 1
+            else:
+                list(Blog.objects.filter(status='published').select_related('author')[:10])
+                reads += 1
+        except OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            locked += 1
+    connections.close_all()
+    return reads, writes, locked
+
+
+def run_profile(processes, duration, write_ratio):
+    import django
+    django.setup()
+    from django.core.management import call_command
+    from django.db import connections
+    from apps.blogs.models import Blog
+    from apps.users.models import User
+
+    call_command('migrate', verbosity=0)
+    author = User.objects.create(username='bench')
+    Blog.objects.bulk_create([
+        Blog(title=f'Post {i}', slug=f'post-{i}', content='x' * 2000, author=author, status='published')
+        for i in range(200)
+    ])
+    blog_ids = list(Blog.objects.values_list('id', flat=True))
+    connections.close_all()
+
+    with multiprocessing.get_context('fork').Pool(processes) as pool:
+        results = pool.map(_worker, [(duration, write_ratio, blog_ids, seed) for seed in range(processes)])
+    reads, writes, locked = (sum(column) for column in zip(*results))
+    return {
+        'reads_per_sec': reads / duration,
+        'writes_per_sec': writes / duration,
+        'ops_per_sec': (reads + writes) / duration,
+        'locked_errors': locked,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--profile', choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        print(json.dumps(run_profile(args.processes, args.duration, args.write_ratio)))
+        return
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    print(f"{'profile':<12} {'ops/s':>9} {'reads/s':>9} {'writes/s':>9} {'locked':>7}")
+    for name, env in PROFILES.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            output = subprocess.run(
+                [sys.executable, __file__, '--profile', name, '--processes', str(args.processes),
+                 '--duration', str(args.duration), '--write-ratio', str(args.write_ratio)],
+                env={
+                    **os.environ, **env,
+                    'DJANGO_SETTINGS_MODULE': 'config.settings',
+                    'DB_ENGINE': 'django.db.backends.sqlite3',
+                    'DB_NAME': os.path.join(tmp, 'bench.sqlite3'),
+                    'DB_REPLICAS': '',
+                    'PYTHONPATH': backend_dir,
+                },
+                cwd=backend_dir, capture_output=True, text=True, check=True
+            ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{name:<12} {result['ops_per_sec']:>9.1f} {result['reads_per_sec']:>9.1f} "
+            f"{result['writes_per_sec']:>9.1f} {result['locked_errors']:>7}"
+        )
+
+
+if __name__ == '__main__':
+    main()
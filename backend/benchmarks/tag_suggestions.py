@@ -0,0 +1,119 @@
+"""
+Tag and category suggestion accuracy, training time and latency on a synthetic corpus.
+
+Generates posts in categories that each have their own tags (every post has
+one category and one to three of its tags), writing each post from category
+words, tag words and shared filler. Trains the classifiers from scratch, then
+retrains from the trained weights as the periodic job does, and scores a
+held-out set: tag precision and recall at SUGGEST_TAG_THRESHOLD, category
+accuracy, single-post suggestion latency and batch (backlog) throughput.
+
+    python benchmarks/tag_suggestions.py --posts 20000 --categories 20 --tags-per-category 10
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+import numpy as np  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+from apps.search.embedding import document_text  # noqa: E402
+from apps.search.suggest import Head, Suggester, feature_matrix, fit_idf, label_targets  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from semantic_search import make_vocabulary, percentile  # noqa: E402
+
+
+def make_corpus(rng, posts, categories, tags_per_category, length):
+    vocabulary = make_vocabulary(rng, categories * (1 + tags_per_category) * 15 + 2000)
+    words = iter([vocabulary[i:i + 15] for i in range(0, len(vocabulary) - 2000, 15)])
+    category_words = [next(words) for _ in range(categories)]
+    tag_words = [next(words) for _ in range(categories * tags_per_category)]
+    filler = vocabulary[-2000:]
+    texts, tag_sets, labels = [], [], []
+    for _ in range(posts):
+        category = rng.randrange(categories)
+        tags = rng.sample(range(category * tags_per_category, (category + 1) * tags_per_category), rng.randint(1, 3))
+        body = []
+        for _ in range(length):
+            roll = rng.random()
+            if roll < 0.1:
+                body.append(rng.choice(category_words[category]))
+            elif roll < 0.25:
+                body.append(rng.choice(tag_words[rng.choice(tags)]))
+            else:
+                body.append(rng.choice(filler))
+        texts.append(document_text(' '.join(rng.sample(filler, 4)), '', ' '.join(body)))
+        tag_sets.append(tags)
+        labels.append([category])
+    return texts, tag_sets, labels
+
+
+def train(texts, tag_sets, categories, idf, epochs, previous=None):
+    heads = []
+    for label_sets, multilabel, name in ((tag_sets, True, 'tags'), (categories, False, 'categories')):
+        labels, targets = label_targets(label_sets, settings.SUGGEST_MIN_EXAMPLES)
+        heads.append(Head.train(feature_matrix(texts, idf), targets, labels, multilabel, epochs, getattr(previous, name, None)))
+    return Suggester(idf, heads[0], heads[1], {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=20_000)
+    parser.add_argument('--categories', type=int, default=20)
+    parser.add_argument('--tags-per-category', type=int, default=10)
+    parser.add_argument('--length', type=int, default=120, help='Words per post.')
+    parser.add_argument('--held-out', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    texts, tag_sets, categories = make_corpus(
+        rng, args.posts + args.held_out, args.categories, args.tags_per_category, args.length
+    )
+    train_texts, test_texts = texts[:args.posts], texts[args.posts:]
+    idf = fit_idf(train_texts)
+
+    started = time.perf_counter()
+    suggester = train(train_texts, tag_sets[:args.posts], categories[:args.posts], idf, settings.SUGGEST_EPOCHS)
+    print(f"train      {args.posts} posts, {len(suggester.tags.labels)} tags, {settings.SUGGEST_EPOCHS} epochs "
+          f"in {time.perf_counter() - started:.1f}s")
+    started = time.perf_counter()
+    suggester = train(
+        train_texts, tag_sets[:args.posts], categories[:args.posts], idf, settings.SUGGEST_WARM_EPOCHS, suggester
+    )
+    print(f"retrain    {settings.SUGGEST_WARM_EPOCHS} epochs from previous weights "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    latencies, hits, suggested, relevant, correct = [], 0, 0, 0, 0
+    for text, tags, category in zip(test_texts, tag_sets[args.posts:], categories[args.posts:]):
+        started = time.perf_counter()
+        tag_scores, category_scores = suggester.suggest(text, settings.SUGGEST_TAG_THRESHOLD)
+        latencies.append((time.perf_counter() - started) * 1000)
+        found = {tag for tag, _ in tag_scores}
+        hits += len(found & set(tags))
+        suggested += len(found)
+        relevant += len(tags)
+        correct += bool(category_scores) and category_scores[0][0] == category[0]
+    print(f"suggest    p50 {statistics.median(latencies):.2f} ms, p95 {percentile(latencies, 0.95):.2f} ms")
+    print(f"tags       precision {hits / max(suggested, 1):.3f}, recall {hits / relevant:.3f} "
+          f"(threshold {settings.SUGGEST_TAG_THRESHOLD})")
+    print(f"category   accuracy {correct / len(test_texts):.3f}")
+
+    started = time.perf_counter()
+    suggester.predict(test_texts)
+    elapsed = time.perf_counter() - started
+    print(f"batch      {len(test_texts)} posts in {elapsed:.2f}s ({elapsed / len(test_texts) * 1e6:.0f} us/post)")
+
+
+if __name__ == '__main__':
+    main()
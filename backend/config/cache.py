@@ -0,0 +1,215 @@
+"""
+Two-tier cache for small, hot lookups (categories, tags, users by id, ...).
+
+L1 is a bounded in-process LRU with TTL; L2 is the shared Django cache
+(Redis in production). Entries live in namespaces with a version number kept
+in L2: writers call `bump(namespace)`, which changes the version and makes
+every process miss on its next read. Each process remembers a namespace's
+version for CACHE_L1_VERSION_TTL seconds, so cross-process invalidation takes
+effect within that window without an L2 round-trip on every L1 hit. Single
+entries are invalidated with `delete(namespace, key)`: at once in L2, and in
+other processes' L1 when their copy expires (CACHE_L1_TTL).
+
+Cross-process invalidation needs a shared L2. With a process-local backend
+(locmem, the development default) L2 entries also expire after CACHE_L1_TTL,
+so other processes serve stale values for at most that long.
+"""
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache import cache as l2_cache
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+_MISSING = object()
+# Backends that keep entries per process, so no write reaches the other processes.
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+def _new_version():
+    return time.time_ns() // 1000
+
+
+class LRUCache:
+    """Thread-safe bounded LRU mapping with per-entry expiry."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=_MISSING):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [key for key in self._data if key.startswith(prefix)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class TwoTierCache:
+    """In-process LRU (L1) in front of the shared Django cache (L2)."""
+
+    STATS_KEY = 'two-tier-stats'
+
+    def __init__(self):
+        self.l1 = LRUCache(settings.CACHE_L1_MAX_ENTRIES)
+        self.shared = not isinstance(caches[DEFAULT_CACHE_ALIAS], PROCESS_LOCAL_BACKENDS)
+        self._stats = defaultdict(int)
+        self._unflushed = 0
+        self._stats_lock = threading.Lock()
+
+    def _count(self, namespace, event):
+        with self._stats_lock:
+            self._stats[f'{namespace}:{event}'] += 1
+            self._unflushed += 1
+            flush = self._unflushed >= settings.CACHE_STATS_FLUSH_EVERY
+        if flush:
+            self.flush_stats()
+
+    def _version(self, namespace):
+        key = f'version:{namespace}'
+        version = self.l1.get(key)
+        if version is _MISSING:
+            version = l2_cache.get(f'cache-version:{namespace}')
+            if version is None:
+                # Seeded from the clock, not 1: if the version key is evicted, entries
+                # written under an earlier version must not become valid again.
+                version = _new_version()
+                if not l2_cache.add(f'cache-version:{namespace}', version, None):
+                    version = l2_cache.get(f'cache-version:{namespace}', version)
+            self.l1.set(key, version, settings.CACHE_L1_VERSION_TTL)
+        return version
+
+    def version(self, namespace):
+        """Current version of `namespace`, for caches keyed outside this class."""
+        return self._version(namespace)
+
+    def _key(self, namespace, key):
+        return f'{namespace}:v{self._version(namespace)}:{key}'
+
+    def _l2_timeout(self, timeout):
+        timeout = timeout or settings.CACHE_L2_TTL
+        return timeout if self.shared else min(timeout, settings.CACHE_L1_TTL)
+
+    def get_or_set(self, namespace, key, loader, timeout=None, local=True):
+        """Return the cached value for (namespace, key), calling `loader()` on a miss.
+
+        With local=False the value is kept in L2 only, so `delete` reaches every
+        process at once, at the cost of an L2 round-trip per read.
+        """
+        full_key = self._key(namespace, key)
+
+        if local:
+            value = self.l1.get(full_key)
+            if value is not _MISSING:
+                self._count(namespace, 'l1_hit')
+                return value
+            self._count(namespace, 'l1_miss')
+
+        value = l2_cache.get(full_key, _MISSING)
+        if value is _MISSING:
+            self._count(namespace, 'l2_miss')
+            value = loader()
+            l2_cache.set(full_key, value, self._l2_timeout(timeout))
+        else:
+            self._count(namespace, 'l2_hit')
+
+        if local:
+            self.l1.set(full_key, value, settings.CACHE_L1_TTL)
+        return value
+
+    def delete(self, namespace, *keys):
+        """Invalidate single entries of `namespace` (see the module docstring)."""
+        full_keys = [self._key(namespace, key) for key in keys]
+        l2_cache.delete_many(full_keys)
+        for full_key in full_keys:
+            self.l1.delete(full_key)
+
+    def bump(self, namespace):
+        """Invalidate every entry in `namespace` across all processes."""
+        try:
+            l2_cache.incr(f'cache-version:{namespace}')
+        except ValueError:
+            l2_cache.set(f'cache-version:{namespace}', _new_version(), None)
+        self.l1.delete_prefix(f'{namespace}:')
+        self.l1.delete_prefix(f'version:{namespace}')
+
+    def flush_stats(self):
+        """Add this process's counters to the shared totals in L2."""
+        with self._stats_lock:
+            stats, self._stats = self._stats, defaultdict(int)
+            self._unflushed = 0
+        for name, count in stats.items():
+            key = f'{self.STATS_KEY}:{name}'
+            if not l2_cache.add(key, count, None):
+                try:
+                    l2_cache.incr(key, count)
+                except ValueError:
+                    l2_cache.set(key, count, None)
+            names = l2_cache.get(self.STATS_KEY) or set()
+            if name not in names:
+                l2_cache.set(self.STATS_KEY, names | {name}, None)
+
+    def stats(self):
+        """Shared per-namespace hit ratios for each tier."""
+        self.flush_stats()
+        names = l2_cache.get(self.STATS_KEY) or set()
+        counts = l2_cache.get_many([f'{self.STATS_KEY}:{name}' for name in names])
+        totals = defaultdict(lambda: defaultdict(int))
+        for name in names:
+            namespace, event = name.rsplit(':', 1)
+            totals[namespace][event] = counts.get(f'{self.STATS_KEY}:{name}', 0)
+
+        def ratio(hits, misses):
+            return hits / (hits + misses) if hits + misses else None
+
+        return {
+            namespace: {
+                **counts,
+                'l1_hit_ratio': ratio(counts['l1_hit'], counts['l1_miss']),
+                'l2_hit_ratio': ratio(counts['l2_hit'], counts['l2_miss']),
+            }
+            for namespace, counts in totals.items()
+        }
+
+
+_instance = None
+_instance_lock = threading.Lock()
+
+
+def two_tier_cache():
+    """Return this process's TwoTierCache."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = TwoTierCache()
+    return _instance
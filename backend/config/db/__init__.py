@@ -0,0 +1,51 @@
+"""
+Database connection helpers shared by the custom backends.
+
+Connection acquisition times are collected per process (each gunicorn and
+Celery worker keeps its own counters) and logged every
+DB_CONNECTION_METRICS_LOG_EVERY acquisitions.
+"""
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_stats = {}
+
+
+def record_acquisition(alias, seconds, pooled):
+    """Record how long it took to obtain a database connection."""
+    from django.conf import settings
+
+    with _lock:
+        stats = _stats.setdefault(alias, {
+            'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0, 'pooled': pooled,
+        })
+        stats['count'] += 1
+        stats['total_seconds'] += seconds
+        stats['max_seconds'] = max(stats['max_seconds'], seconds)
+        count = stats['count']
+
+    log_every = getattr(settings, 'DB_CONNECTION_METRICS_LOG_EVERY', 0)
+    if log_every and count % log_every == 0:
+        logger.info('db connection stats pid=%s %s', os.getpid(), connection_stats().get(alias))
+
+
+def connection_stats():
+    """Return acquisition counters for this process, keyed by database alias."""
+    with _lock:
+        return {
+            alias: {
+                **stats,
+                'avg_ms': stats['total_seconds'] / stats['count'] * 1000 if stats['count'] else 0.0,
+                'max_ms': stats['max_seconds'] * 1000,
+            }
+            for alias, stats in _stats.items()
+        }
+
+
+def reset_connection_stats():
+    with _lock:
+        _stats.clear()
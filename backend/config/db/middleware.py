@@ -0,0 +1,127 @@
+import hashlib
+import logging
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import OperationalError
+
+from config.cache import PROCESS_LOCAL_BACKENDS
+from .routers import check_health, replica_aliases, replica_allowed, use_primary, use_replica, wrote_in_context
+
+logger = logging.getLogger(__name__)
+
+PIN_COOKIE = 'db_primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def _pin_cache_key(request):
+    authorization = request.META.get('HTTP_AUTHORIZATION')
+    if not authorization:
+        return None
+    return 'db-pin:' + hashlib.sha256(authorization.encode()).hexdigest()
+
+
+def _pin_cache():
+    return caches[settings.REPLICA_PIN_CACHE]
+
+
+def _cookie_pinned(request):
+    # The signature carries the time it was set, so max_age bounds the pin.
+    return request.get_signed_cookie(
+        PIN_COOKIE, default=None, salt=PIN_COOKIE, max_age=settings.REPLICA_PIN_SECONDS
+    ) is not None
+
+
+def _is_pinned(request):
+    key = _pin_cache_key(request)
+    return _cookie_pinned(request) or bool(key and _pin_cache().get(key))
+
+
+async def _ais_pinned(request):
+    key = _pin_cache_key(request)
+    return _cookie_pinned(request) or bool(key and await _pin_cache().aget(key))
+
+
+def _set_pin_cookie(response):
+    response.set_signed_cookie(
+        PIN_COOKIE, '1', salt=PIN_COOKIE, max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax'
+    )
+
+
+class ReplicaRoutingMiddleware:
+    """Send safe-method requests to replicas and pin recent writers to the primary.
+    
+    A client that performed a write is pinned for REPLICA_PIN_SECONDS, both by
+    signed cookie (browsers) and by an entry in the REPLICA_PIN_CACHE cache
+    keyed on its Authorization header (API clients), so it reads its own writes
+    despite replication lag. The cache must be shared by all web processes for
+    the pin to hold whichever one serves the next request.
+    A safe request that fails because a replica went down is run again on the
+    primary. Async-capable, so the async views run without a thread hop.
+    """
+    
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = bool(replica_aliases())
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        if self.enabled and isinstance(_pin_cache(), PROCESS_LOCAL_BACKENDS):
+            logger.warning(
+                'REPLICA_PIN_CACHE %r is per-process: API clients are only pinned to the primary '
+                'by the process that served their write.', settings.REPLICA_PIN_CACHE
+            )
+    
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        
+        replica = request.method in SAFE_METHODS and not _is_pinned(request)
+        with use_replica() if replica else use_primary():
+            response = self.get_response(request)
+            wrote = wrote_in_context() if replica else request.method not in SAFE_METHODS
+        
+        if wrote and response.status_code < 400:
+            _set_pin_cookie(response)
+            key = _pin_cache_key(request)
+            if key:
+                _pin_cache().set(key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+    
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        
+        replica = request.method in SAFE_METHODS and not await _ais_pinned(request)
+        with use_replica() if replica else use_primary():
+            response = await self.get_response(request)
+            wrote = wrote_in_context() if replica else request.method not in SAFE_METHODS
+        
+        if wrote and response.status_code < 400:
+            _set_pin_cookie(response)
+            key = _pin_cache_key(request)
+            if key:
+                await _pin_cache().aset(key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+    
+    def process_exception(self, request, exception):
+        """Run a safe request again on the primary if a replica failed under it."""
+        if not (isinstance(exception, OperationalError) and replica_allowed() and not wrote_in_context()):
+            return None
+        match = request.resolver_match
+        # check_health records the failure, so later requests skip the replica.
+        failed = [alias for alias in replica_aliases() if not check_health(alias)]
+        if match is None or not failed:
+            return None
+        logger.warning('Replica %s failed; retrying %s %s on the primary', ', '.join(failed),
+                       request.method, request.path)
+        with use_primary():
+            if iscoroutinefunction(match.func):
+                return async_to_sync(match.func)(request, *match.args, **match.kwargs)
+            return match.func(request, *match.args, **match.kwargs)
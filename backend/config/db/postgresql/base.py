@@ -0,0 +1,143 @@
+"""
+PostgreSQL backend with optional in-process connection pooling.
+
+Behaves like django.db.backends.postgresql, plus:
+  - every connection acquisition is timed (see config.db.record_acquisition);
+  - with OPTIONS['pool'] enabled, connections come from a per-process
+    psycopg2 ThreadedConnectionPool and are returned to it on close instead
+    of being torn down. Callers wait up to OPTIONS['pool_timeout'] seconds
+    for a free connection when the pool is exhausted.
+
+Pooling assumes CONN_MAX_AGE = 0 so Django "closes" (returns) the
+connection at the end of every request or Celery task.
+"""
+import os
+import threading
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError
+from django.db.backends.postgresql import base
+from psycopg2 import pool as pg_pool
+
+from config.db import record_acquisition
+
+POOL_OPTIONS = ('pool', 'pool_min_size', 'pool_max_size', 'pool_timeout')
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """psycopg2 ThreadedConnectionPool that blocks instead of failing when exhausted."""
+
+    def __init__(self, conn_params, min_size, max_size, timeout, health_checks, setup):
+        self.pid = os.getpid()
+        self.timeout = timeout
+        self.health_checks = health_checks
+        self.setup = setup
+        self._pool = pg_pool.ThreadedConnectionPool(min_size, max_size, **conn_params)
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._initialized = set()
+
+    def _is_usable(self, connection):
+        if connection.closed:
+            return False
+        if not self.health_checks:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            connection.rollback()
+            return True
+        except Exception:
+            return False
+
+    def getconn(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise OperationalError(f'Timed out after {self.timeout}s waiting for a pooled connection.')
+        try:
+            connection = self._pool.getconn()
+            if id(connection) in self._initialized and not self._is_usable(connection):
+                self._discard(connection)
+                connection = self._pool.getconn()
+            if id(connection) not in self._initialized:
+                self.setup(connection)
+                self._initialized.add(id(connection))
+            return connection
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _discard(self, connection):
+        self._initialized.discard(id(connection))
+        self._pool.putconn(connection, close=True)
+
+    def putconn(self, connection):
+        try:
+            if connection.closed:
+                self._discard(connection)
+            else:
+                # The pool rolls back anything left open before reuse.
+                self._pool.putconn(connection)
+        finally:
+            self._slots.release()
+
+
+def get_pool(alias, conn_params, settings_dict, setup):
+    """Return this process's pool for `alias`, recreating it after a fork."""
+    with _pools_lock:
+        existing = _pools.get(alias)
+        if existing is None or existing.pid != os.getpid():
+            options = settings_dict['OPTIONS']
+            _pools[alias] = ConnectionPool(
+                conn_params,
+                options.get('pool_min_size', 0),
+                options.get('pool_max_size', 4),
+                options.get('pool_timeout', 10),
+                settings_dict['CONN_HEALTH_CHECKS'],
+                setup
+            )
+        return _pools[alias]
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    _pool = None
+
+    @property
+    def pool_enabled(self):
+        return bool(self.settings_dict['OPTIONS'].get('pool'))
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        # Pool settings are ours; keep them out of the libpq connection arguments.
+        for key in POOL_OPTIONS:
+            params.pop(key, None)
+        if self.pool_enabled and self.settings_dict['CONN_MAX_AGE'] != 0:
+            raise ImproperlyConfigured('Set CONN_MAX_AGE = 0 when OPTIONS["pool"] is enabled.')
+        return params
+
+    def get_new_connection(self, conn_params):
+        started = time.perf_counter()
+        if not self.pool_enabled:
+            connection = super().get_new_connection(conn_params)
+        else:
+            self.isolation_level = base.IsolationLevel.READ_COMMITTED
+            self._pool = get_pool(self.alias, conn_params, self.settings_dict, self._setup_pooled_connection)
+            connection = self._pool.getconn()
+        record_acquisition(self.alias, time.perf_counter() - started, self.pool_enabled)
+        return connection
+
+    def _setup_pooled_connection(self, connection):
+        # Same per-connection setup as the stock backend, done once per physical connection.
+        base.psycopg2.extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+
+    def _close(self):
+        if self._pool is None or self.connection is None:
+            return super()._close()
+        pool, self._pool = self._pool, None
+        if pool.pid != os.getpid():
+            # Inherited across a fork: never hand it to this process's pool.
+            return super()._close()
+        with self.wrap_database_errors:
+            pool.putconn(self.connection)
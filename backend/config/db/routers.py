@@ -0,0 +1,113 @@
+"""
+Read-replica routing.
+
+Reads go to a healthy replica only when the current context allows it: the
+ReplicaRoutingMiddleware enables this for safe-method requests from clients
+that have not written recently, and `use_replica()` enables it explicitly for
+read-only querysets elsewhere. Everything else (writes, Celery tasks, reads
+after a write in the same request) uses the primary. A replica that fails a
+query is re-checked at once and, if down, skipped until it passes a check
+again; the middleware then retries the request on the primary.
+"""
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_replica_allowed = contextvars.ContextVar('replica_allowed', default=False)
+_wrote = contextvars.ContextVar('db_wrote', default=False)
+
+_health = {}
+_health_lock = threading.Lock()
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica_')]
+
+
+@contextmanager
+def use_replica():
+    """Allow reads inside the block to be served by a replica."""
+    allowed = _replica_allowed.set(True)
+    wrote = _wrote.set(False)
+    try:
+        yield
+    finally:
+        _replica_allowed.reset(allowed)
+        _wrote.reset(wrote)
+
+
+@contextmanager
+def use_primary():
+    """Force reads inside the block to the primary."""
+    token = _replica_allowed.set(False)
+    try:
+        yield
+    finally:
+        _replica_allowed.reset(token)
+
+
+def replica_allowed():
+    return _replica_allowed.get()
+
+
+def wrote_in_context():
+    return _wrote.get()
+
+
+def check_health(alias):
+    """Run a query on `alias` and record whether it succeeded.
+
+    A query, not just ensure_connection(), which does nothing once a
+    connection is open and so would keep vouching for a replica that went down.
+    """
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        healthy = True
+    except Exception:
+        healthy = False
+        # Drop the broken connection so the next check reconnects.
+        try:
+            connection.close()
+        except Exception:
+            pass
+    with _health_lock:
+        _health[alias] = (healthy, time.monotonic())
+    return healthy
+
+
+def is_healthy(alias):
+    """Result of the last check_health of `alias`, re-checked every REPLICA_HEALTH_CHECK_INTERVAL seconds."""
+    with _health_lock:
+        healthy, checked_at = _health.get(alias, (True, None))
+    if checked_at is not None and time.monotonic() - checked_at < settings.REPLICA_HEALTH_CHECK_INTERVAL:
+        return healthy
+    return check_health(alias)
+
+
+class ReplicaRouter:
+    """Route allowed reads to a random healthy replica and all writes to the primary."""
+
+    def db_for_read(self, model, **hints):
+        if not _replica_allowed.get() or _wrote.get():
+            return DEFAULT_DB_ALIAS
+        candidates = [alias for alias in replica_aliases() if is_healthy(alias)]
+        return random.choice(candidates) if candidates else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Read-your-writes within the current request or block.
+        _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive schema changes through replication.
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,43 @@
+"""
+SQLite backend tuned for concurrent gunicorn and Celery writers.
+
+Behaves like django.db.backends.sqlite3, plus:
+  - OPTIONS['pragmas'] are applied on every new connection (WAL journaling,
+    synchronous=NORMAL, mmap I/O, page cache size, busy timeout, ...);
+  - OPTIONS['transaction_mode'] = 'IMMEDIATE' makes atomic blocks take the
+    write lock up front with BEGIN IMMEDIATE, so a transaction that reads and
+    then writes waits on busy_timeout instead of failing with
+    "database is locked" when it tries to upgrade its lock.
+"""
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+from config.db import record_acquisition
+
+CUSTOM_OPTIONS = ('pragmas', 'transaction_mode')
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        for key in CUSTOM_OPTIONS:
+            params.pop(key, None)
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode', 'DEFERRED').upper()
+        if mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(f'Invalid SQLite transaction_mode {mode!r}.')
+        return params
+
+    def get_new_connection(self, conn_params):
+        started = time.perf_counter()
+        connection = super().get_new_connection(conn_params)
+        for pragma, value in self.settings_dict['OPTIONS'].get('pragmas', {}).items():
+            connection.execute(f'PRAGMA {pragma} = {value}')
+        record_acquisition(self.alias, time.perf_counter() - started, False)
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode', 'DEFERRED').upper()
+        self.cursor().execute(f'BEGIN {mode}')
@@ -2,10 +2,12 @@
 Django settings for AI-Powered Blog CMS project.
 """
 
+import json
 import os
 from pathlib import Path
 from datetime import timedelta
 from decouple import config, Csv
+from kombu import Queue
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -33,11 +35,15 @@ INSTALLED_APPS = [
     'apps.users',
     'apps.blogs',
     'apps.ai_service',
+    'apps.analytics',
+    'apps.media',
+    'apps.search',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'config.db.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -69,6 +75,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
 
 # Database
 DB_ENGINE = config('DB_ENGINE', default='django.db.backends.sqlite3')
@@ -80,18 +87,83 @@ if DB_ENGINE == 'django.db.backends.sqlite3':
             'NAME': BASE_DIR / config('DB_NAME', default='db.sqlite3'),
         }
     }
+    # SQLite performance mode: WAL, relaxed fsync, mmap I/O, larger page cache and
+    # immediate write transactions, for concurrent gunicorn and Celery writers.
+    if config('SQLITE_PERFORMANCE_MODE', default=False, cast=bool):
+        DATABASES['default'].update({
+            'ENGINE': 'config.db.sqlite3',
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'OPTIONS': {
+                # Seconds sqlite3 waits on a locked database before raising.
+                'timeout': config('SQLITE_BUSY_TIMEOUT', default=20, cast=int),
+                'transaction_mode': 'IMMEDIATE',
+                'pragmas': {
+                    'journal_mode': 'WAL',
+                    'synchronous': 'NORMAL',
+                    'mmap_size': config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024, cast=int),
+                    # Negative values are KiB: 64 MB page cache per connection.
+                    'cache_size': -config('SQLITE_CACHE_SIZE_KB', default=64 * 1024, cast=int),
+                    'temp_store': 'MEMORY',
+                    'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=20, cast=int) * 1000,
+                },
+            },
+        })
 else:
+    # Connection management. DB_PROCESS_ROLE ('web' or 'celery') selects per-process pool sizes.
+    DB_PROCESS_ROLE = config('DB_PROCESS_ROLE', default='web')
+    DB_POOL = config('DB_POOL', default=False, cast=bool)
+    DB_POOL_MAX_SIZE = config(
+        'DB_POOL_MAX_SIZE_CELERY' if DB_PROCESS_ROLE == 'celery' else 'DB_POOL_MAX_SIZE_WEB',
+        default=2 if DB_PROCESS_ROLE == 'celery' else 4,
+        cast=int
+    )
+    # Behind pgbouncer in transaction mode server-side cursors cannot span transactions.
+    DB_PGBOUNCER = config('DB_PGBOUNCER', default=False, cast=bool)
+
     DATABASES = {
         'default': {
-            'ENGINE': DB_ENGINE,
+            # Stock PostgreSQL backend plus acquisition metrics and optional pooling.
+            'ENGINE': 'config.db.postgresql' if DB_ENGINE == 'django.db.backends.postgresql' else DB_ENGINE,
             'NAME': config('DB_NAME', default='blog_cms_db'),
             'USER': config('DB_USER', default='postgres'),
             'PASSWORD': config('DB_PASSWORD', default='postgres'),
             'HOST': config('DB_HOST', default='localhost'),
             'PORT': config('DB_PORT', default='5432'),
+            # Pooled connections are returned to the pool at the end of each request or task.
+            'CONN_MAX_AGE': 0 if DB_POOL else config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': True,
+            'DISABLE_SERVER_SIDE_CURSORS': DB_PGBOUNCER,
+            'OPTIONS': {
+                'pool': DB_POOL,
+                'pool_min_size': config('DB_POOL_MIN_SIZE', default=0, cast=int),
+                'pool_max_size': DB_POOL_MAX_SIZE,
+                'pool_timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+                'connect_timeout': config('DB_CONNECT_TIMEOUT', default=5, cast=int),
+            } if DB_ENGINE == 'django.db.backends.postgresql' else {},
         }
     }
 
+# Read replicas: SQLite file names or PostgreSQL hosts (host or host:port), comma separated.
+# Replicas become 'replica_0', 'replica_1', ... and are used by config.db.routers.ReplicaRouter.
+for index, replica in enumerate(config('DB_REPLICAS', default='', cast=Csv())):
+    replica_settings = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+    if DB_ENGINE == 'django.db.backends.sqlite3':
+        replica_settings['NAME'] = BASE_DIR / replica
+    else:
+        host, _, port = replica.partition(':')
+        replica_settings.update({'HOST': host, 'PORT': port or DATABASES['default']['PORT']})
+    DATABASES[f'replica_{index}'] = replica_settings
+
+DATABASE_ROUTERS = ['config.db.routers.ReplicaRouter']
+# Seconds a client stays on the primary after writing (read-your-writes).
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+# Cache holding the pins of API clients; shared by every web process (Redis) for them to hold.
+REPLICA_PIN_CACHE = config('REPLICA_PIN_CACHE', default='default')
+REPLICA_HEALTH_CHECK_INTERVAL = config('REPLICA_HEALTH_CHECK_INTERVAL', default=15, cast=int)
+
+# Log per-process connection acquisition stats every N acquisitions (0 disables).
+DB_CONNECTION_METRICS_LOG_EVERY = config('DB_CONNECTION_METRICS_LOG_EVERY', default=1000, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -100,6 +172,30 @@ AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator'},
 ]
 
+# Password hashing: the profile's hasher hashes new passwords; the others still verify
+# existing hashes (and upgrade them on the next login). argon2 needs argon2-cffi, bcrypt needs bcrypt.
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'bcrypt': 'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+}
+PASSWORD_HASHER_PROFILE = config('PASSWORD_HASHER_PROFILE', default='pbkdf2')
+PASSWORD_HASHERS = [PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]] + [
+    hasher for profile, hasher in PASSWORD_HASHER_PROFILES.items() if profile != PASSWORD_HASHER_PROFILE
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+# apps.users.provisioning: bulk user import (import_users command, /api/users/bulk-import/).
+# Password hashing workers; 0 means one per CPU. 'process' pools fall back to threads in daemon processes.
+USER_IMPORT_WORKERS = config('USER_IMPORT_WORKERS', default=0, cast=int)
+USER_IMPORT_POOL = config('USER_IMPORT_POOL', default='process')
+# Rows validated, hashed and inserted (one bulk_create) at a time.
+USER_IMPORT_CHUNK_SIZE = config('USER_IMPORT_CHUNK_SIZE', default=500, cast=int)
+# Failed rows listed in an import report (all are counted).
+USER_IMPORT_MAX_ERRORS = config('USER_IMPORT_MAX_ERRORS', default=1000, cast=int)
+# Largest file accepted by the bulk-import endpoint; use the command for bigger imports.
+USER_IMPORT_MAX_UPLOAD_MB = config('USER_IMPORT_MAX_UPLOAD_MB', default=10, cast=int)
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -115,13 +211,31 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Image pipeline: responsive variant widths (px) and LQIP placeholder width
+MEDIA_VARIANT_WIDTHS = config('MEDIA_VARIANT_WIDTHS', default='320,640,1280', cast=Csv(int))
+MEDIA_PLACEHOLDER_WIDTH = config('MEDIA_PLACEHOLDER_WIDTH', default=16, cast=int)
+
+# Store uploaded media on S3 via django-storages (chunked uploads then use S3 multipart)
+if config('USE_S3_MEDIA', default=False, cast=bool):
+    DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
+
+# Chunked uploads (S3 requires every part but the last to be at least 5 MB)
+CHUNKED_UPLOAD_CHUNK_SIZE = config('CHUNKED_UPLOAD_CHUNK_SIZE', default=8 * 1024 * 1024, cast=int)
+CHUNKED_UPLOAD_MAX_SIZE = config('CHUNKED_UPLOAD_MAX_SIZE', default=2 * 1024 * 1024 * 1024, cast=int)
+# Part files are kept outside MEDIA_ROOT so unfinished uploads are never served.
+CHUNKED_UPLOAD_TEMP_DIR = Path(config('CHUNKED_UPLOAD_TEMP_DIR', default=str(BASE_DIR / 'var' / 'chunked_uploads')))
+# Largest completed upload accepted as a featured image (featured_image_upload_id).
+CHUNKED_UPLOAD_MAX_IMAGE_SIZE = config('CHUNKED_UPLOAD_MAX_IMAGE_SIZE', default=50 * 1024 * 1024, cast=int)
+CHUNKED_UPLOAD_DESTINATION = 'uploads'
+CHUNKED_UPLOAD_EXPIRY_HOURS = config('CHUNKED_UPLOAD_EXPIRY_HOURS', default=24, cast=int)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
@@ -138,9 +252,11 @@ REST_FRAMEWORK = {
     ],
 }
 
-# JWT Configuration (djangorestframework-simplejwt)
-from rest_framework_simplejwt.settings import DEFAULTS as JWT_DEFAULTS
+# Cache lifetime (seconds) for the async read endpoints in apps.blogs.async_views
+ASYNC_READ_CACHE_TIMEOUT = config('ASYNC_READ_CACHE_TIMEOUT', default=30, cast=int)
 
+# JWT Configuration (djangorestframework-simplejwt). Do not import rest_framework_simplejwt here:
+# its settings module reads SIMPLE_JWT once, on import, and would never see this dict.
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
@@ -149,8 +265,17 @@ SIMPLE_JWT = {
     'UPDATE_LAST_LOGIN': False,
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
+    'TOKEN_OBTAIN_SERIALIZER': 'apps.users.serializers.VersionedTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'apps.users.serializers.VersionedTokenRefreshSerializer',
 }
 
+# apps.users.authentication: request.user comes from the shared cache, not a query per request
+# (CACHE_BACKEND=redis; with locmem every request queries the user).
+# Seconds the shared cache keeps a user's auth state (it is deleted on every save of the user).
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=300, cast=int)
+# Take username, role and staff flags from the token's claims rather than the cached user.
+AUTH_TRUST_TOKEN_CLAIMS = config('AUTH_TRUST_TOKEN_CLAIMS', default=False, cast=bool)
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = config(
     'CORS_ALLOWED_ORIGINS',
@@ -162,6 +287,87 @@ CORS_ALLOW_CREDENTIALS = True
 
 # OpenAI Configuration
 OPENAI_API_KEY = config('OPENAI_API_KEY', default='')
+# Point at a compatible server (e.g. `manage.py run_mock_ai_server`) instead of api.openai.com.
+OPENAI_BASE_URL = config('OPENAI_BASE_URL', default='')
+OPENAI_MODEL = config('OPENAI_MODEL', default='gpt-3.5-turbo')
+OPENAI_TIMEOUT = config('OPENAI_TIMEOUT', default=60, cast=float)
+OPENAI_CONNECT_TIMEOUT = config('OPENAI_CONNECT_TIMEOUT', default=5, cast=float)
+# Chat-completion provider class (see apps.ai_service.providers).
+AI_PROVIDER = config('AI_PROVIDER', default='apps.ai_service.providers.OpenAIProvider')
+# Per-operation overrides, e.g. AI_MODEL_CHUNK_SUMMARY=gpt-4o-mini or AI_TIMEOUT_ANALYSIS=30;
+# operations: analysis, summary, key_points, sentiment, chunk_summary.
+AI_MODELS = {
+    operation: config(f'AI_MODEL_{operation.upper()}', default='')
+    for operation in ('analysis', 'summary', 'key_points', 'sentiment', 'chunk_summary')
+}
+AI_TIMEOUTS = {
+    operation: config(f'AI_TIMEOUT_{operation.upper()}', default=0, cast=float)
+    for operation in ('analysis', 'summary', 'key_points', 'sentiment', 'chunk_summary')
+}
+# Keep-alive connection pool shared by all requests of a process.
+AI_HTTP_MAX_CONNECTIONS = config('AI_HTTP_MAX_CONNECTIONS', default=20, cast=int)
+AI_HTTP_KEEPALIVE_EXPIRY = config('AI_HTTP_KEEPALIVE_EXPIRY', default=30, cast=float)
+# 'openai' calls the provider; 'local' uses the offline extractive engine (apps.ai_service.extractive).
+AI_BACKEND = config('AI_BACKEND', default='openai')
+# Answer with the local engine when no API key is set or the provider fails.
+AI_LOCAL_FALLBACK = config('AI_LOCAL_FALLBACK', default=True, cast=bool)
+# 'combined': one JSON-schema request per blog, falling back to 'concurrent' (three parallel requests).
+AI_ANALYSIS_MODE = config('AI_ANALYSIS_MODE', default='combined')
+# Part of the AI result cache key; bump when prompts change so old results stop matching.
+AI_PROMPT_VERSION = config('AI_PROMPT_VERSION', default='1')
+# Token budgets (local estimate, see apps.ai_service.chunking). Requests over AI_CONTEXT_TOKENS are never sent.
+AI_CONTEXT_TOKENS = config('AI_CONTEXT_TOKENS', default=16385, cast=int)
+# Posts longer than this are split at headings, summarized per chunk and reduced (map-reduce).
+AI_LONG_DOCUMENT_TOKENS = config('AI_LONG_DOCUMENT_TOKENS', default=6000, cast=int)
+AI_CHUNK_TOKENS = config('AI_CHUNK_TOKENS', default=3000, cast=int)
+AI_MAP_SUMMARY_TOKENS = config('AI_MAP_SUMMARY_TOKENS', default=150, cast=int)
+AI_MAP_CONCURRENCY = config('AI_MAP_CONCURRENCY', default=4, cast=int)
+AI_MAX_REDUCE_LEVELS = config('AI_MAX_REDUCE_LEVELS', default=4, cast=int)
+# Provider quota shared by all workers: 'redis' (one budget across processes), 'local' (per process) or 'none'.
+AI_RATE_LIMITER = config('AI_RATE_LIMITER', default='local')
+AI_REQUESTS_PER_MINUTE = config('AI_REQUESTS_PER_MINUTE', default=3500, cast=int)
+AI_TOKENS_PER_MINUTE = config('AI_TOKENS_PER_MINUTE', default=90000, cast=int)
+# In-process retries of 429/timeout/5xx per request (exponential backoff with full jitter)...
+AI_MAX_RETRIES = config('AI_MAX_RETRIES', default=3, cast=int)
+AI_BACKOFF_BASE = config('AI_BACKOFF_BASE', default=1.0, cast=float)
+AI_BACKOFF_MAX = config('AI_BACKOFF_MAX', default=30.0, cast=float)
+# ...then Celery retries of the whole summarization task.
+AI_TASK_MAX_RETRIES = config('AI_TASK_MAX_RETRIES', default=5, cast=int)
+AI_TASK_RETRY_BACKOFF = config('AI_TASK_RETRY_BACKOFF', default=30, cast=int)
+# Soft time limit of one summarization attempt (the AITask fails); the worker is killed 30s later.
+AI_TASK_TIME_LIMIT = config('AI_TASK_TIME_LIMIT', default=600, cast=int)
+# Pending/processing summarization tasks with no update for this long no longer block new requests.
+AI_TASK_DEDUP_TIMEOUT = config('AI_TASK_DEDUP_TIMEOUT', default=900, cast=int)
+# Finished AI tasks older than this are moved to the compact AITaskArchive table, in batches.
+AI_TASK_RETENTION_DAYS = config('AI_TASK_RETENTION_DAYS', default=30, cast=int)
+AI_TASK_ARCHIVE_BATCH_SIZE = config('AI_TASK_ARCHIVE_BATCH_SIZE', default=1000, cast=int)
+# USD per million (prompt, completion) tokens by model, for cost accounting; extend with
+# AI_PRICING='{"model": [prompt, completion]}'. Dated versions (gpt-4o-2024-08-06) match their base name.
+AI_PRICING = {
+    'gpt-3.5-turbo': [0.50, 1.50],
+    'gpt-4o-mini': [0.15, 0.60],
+    'gpt-4o': [2.50, 10.00],
+    'gpt-4-turbo': [10.00, 30.00],
+    **json.loads(config('AI_PRICING', default='{}')),
+}
+# Daily spend limits in USD (0 = none). New summaries are refused once one is spent and
+# queued late, at the lowest priority, beyond AI_BUDGET_THROTTLE_AT of it.
+AI_DAILY_BUDGET = config('AI_DAILY_BUDGET', default=0, cast=float)
+AI_AUTHOR_DAILY_BUDGET = config('AI_AUTHOR_DAILY_BUDGET', default=0, cast=float)
+AI_BUDGET_THROTTLE_AT = config('AI_BUDGET_THROTTLE_AT', default=0.8, cast=float)
+AI_BUDGET_THROTTLE_DELAY = config('AI_BUDGET_THROTTLE_DELAY', default=300, cast=int)
+# Summarize posts automatically when published or edited; edits within the debounce window coalesce.
+AI_AUTO_SUMMARY = config('AI_AUTO_SUMMARY', default=True, cast=bool)
+AI_AUTO_SUMMARY_DEBOUNCE = config('AI_AUTO_SUMMARY_DEBOUNCE', default=60, cast=int)
+# Stream summaries to clients as they are generated (SSE at /api/ai/tasks/<id>/stream/).
+# Enable with an ASGI deployment; each open stream would hold a sync WSGI worker.
+AI_STREAMING = config('AI_STREAMING', default=False, cast=bool)
+# 'redis' relays events from Celery workers to web processes; 'local' only works in-process.
+AI_STREAM_BROKER = config('AI_STREAM_BROKER', default='redis')
+AI_STREAM_TTL = config('AI_STREAM_TTL', default=3600, cast=int)
+AI_STREAM_HEARTBEAT = config('AI_STREAM_HEARTBEAT', default=15, cast=float)
+# Close streams open this long; EventSource reconnects and gets a fresh snapshot.
+AI_STREAM_TIMEOUT = config('AI_STREAM_TIMEOUT', default=300, cast=int)
 
 # AWS Configuration
 AWS_ACCESS_KEY_ID = config('AWS_ACCESS_KEY_ID', default='')
@@ -174,6 +380,31 @@ AWS_S3_OBJECT_PARAMETERS = {'CacheControl': 'max-age=86400'}
 # Redis Configuration
 REDIS_URL = config('REDIS_URL', default='redis://localhost:6379/0')
 
+# Cache: 'redis' shares entries across processes; 'locmem' is per-process (development).
+if config('CACHE_BACKEND', default='locmem') == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config('CACHE_REDIS_URL', default=REDIS_URL),
+            'TIMEOUT': 300,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Two-tier cache (config.cache): in-process LRU (L1) in front of CACHES['default'] (L2)
+CACHE_L1_MAX_ENTRIES = config('CACHE_L1_MAX_ENTRIES', default=1000, cast=int)
+# Also the L2 timeout under locmem, whose entries other processes cannot invalidate.
+CACHE_L1_TTL = config('CACHE_L1_TTL', default=60, cast=int)
+# How long a process trusts its copy of a namespace version; bounds cross-process staleness.
+CACHE_L1_VERSION_TTL = config('CACHE_L1_VERSION_TTL', default=2, cast=int)
+CACHE_L2_TTL = config('CACHE_L2_TTL', default=3600, cast=int)
+CACHE_STATS_FLUSH_EVERY = config('CACHE_STATS_FLUSH_EVERY', default=100, cast=int)
+
 # Celery Configuration
 CELERY_BROKER_URL = REDIS_URL
 CELERY_RESULT_BACKEND = REDIS_URL
@@ -181,6 +412,105 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
+# Outcomes are recorded on AITask, AIBatchJob and ImageAsset rows; nothing reads Celery results.
+CELERY_TASK_IGNORE_RESULT = True
+# One queue per kind of work, so slow AI calls never hold up image processing or
+# housekeeping. Each gets its own worker in production (docker-compose profile 'queues').
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_QUEUES = [
+    Queue('default'),
+    Queue('ai'),
+    Queue('media'),
+    Queue('analytics'),
+    Queue('maintenance'),
+]
+# Exact task names take precedence over the app-wide patterns.
+CELERY_TASK_ROUTES = {
+    'apps.ai_service.tasks.archive_ai_tasks_task': {'queue': 'maintenance'},
+    'apps.media.tasks.purge_stale_uploads_task': {'queue': 'maintenance'},
+    'apps.analytics.tasks.purge_view_events_task': {'queue': 'maintenance'},
+    'apps.search.tasks.*': {'queue': 'maintenance'},
+    'apps.ai_service.tasks.*': {'queue': 'ai'},
+    'apps.media.tasks.*': {'queue': 'media'},
+    'apps.analytics.tasks.*': {'queue': 'analytics'},
+}
+# Reserve one task at a time so a worker busy with a long summary does not sit on
+# queued ones another worker could run. Workers may override it per queue.
+CELERY_WORKER_PREFETCH_MULTIPLIER = config('CELERY_WORKER_PREFETCH_MULTIPLIER', default=1, cast=int)
+CELERY_TASK_DEFAULT_PRIORITY = 5
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    # Redis emulates priorities with one list per step; 0 is served first.
+    'queue_order_strategy': 'priority',
+    'priority_steps': list(range(10)),
+    'sep': ':',
+    # Unacknowledged (acks_late) tasks are redelivered after this long, so it
+    # must exceed the time limit of every acks_late task and the AI debounce countdown.
+    'visibility_timeout': config('CELERY_VISIBILITY_TIMEOUT', default=3600, cast=int),
+}
+CELERY_BEAT_SCHEDULE = {
+    'analytics-rollup-daily-stats': {
+        'task': 'apps.analytics.tasks.rollup_daily_stats_task',
+        'schedule': timedelta(minutes=config('ANALYTICS_ROLLUP_INTERVAL_MINUTES', default=5, cast=int)),
+    },
+    'analytics-purge-view-events': {
+        'task': 'apps.analytics.tasks.purge_view_events_task',
+        'schedule': timedelta(days=1),
+    },
+    'media-purge-stale-uploads': {
+        'task': 'apps.media.tasks.purge_stale_uploads_task',
+        'schedule': timedelta(hours=1),
+    },
+    'ai-archive-tasks': {
+        'task': 'apps.ai_service.tasks.archive_ai_tasks_task',
+        'schedule': timedelta(days=1),
+    },
+    'search-rebuild-semantic-index': {
+        'task': 'apps.search.tasks.rebuild_semantic_index_task',
+        'schedule': timedelta(hours=config('SEMANTIC_REBUILD_INTERVAL_HOURS', default=24, cast=int)),
+    },
+    'search-train-tag-suggester': {
+        'task': 'apps.search.tasks.train_tag_suggester_task',
+        'schedule': timedelta(hours=config('SUGGEST_RETRAIN_INTERVAL_HOURS', default=6, cast=int)),
+    },
+}
+
+# Semantic search (apps.search): local hashed TF-IDF + SVD embeddings in an IVF index of
+# memory-mapped files. Every web process reads SEMANTIC_INDEX_DIR, so on several hosts it
+# must be a shared volume (or the index built on each host).
+SEMANTIC_INDEX_DIR = Path(config('SEMANTIC_INDEX_DIR', default=str(BASE_DIR / 'var' / 'semantic')))
+SEMANTIC_HASH_BITS = config('SEMANTIC_HASH_BITS', default=16, cast=int)
+SEMANTIC_DIMENSIONS = config('SEMANTIC_DIMENSIONS', default=128, cast=int)
+# Posts sampled to fit the embedding model.
+SEMANTIC_FIT_SAMPLE = config('SEMANTIC_FIT_SAMPLE', default=20000, cast=int)
+# Index lists scanned per query: more is slower but finds more of the true nearest posts.
+SEMANTIC_NPROBE = config('SEMANTIC_NPROBE', default=16, cast=int)
+# How often each process picks up posts embedded (saved) by other processes since the build.
+SEMANTIC_DELTA_REFRESH = config('SEMANTIC_DELTA_REFRESH', default=5, cast=float)
+
+# Tag and category suggestions (apps.search.suggest): linear classifiers over hashed TF-IDF,
+# retrained from the previous weights every SUGGEST_RETRAIN_INTERVAL_HOURS if posts changed.
+SUGGEST_MODEL_DIR = Path(config('SUGGEST_MODEL_DIR', default=str(BASE_DIR / 'var' / 'suggest')))
+SUGGEST_HASH_BITS = config('SUGGEST_HASH_BITS', default=16, cast=int)
+# Most recently updated labeled posts used for training.
+SUGGEST_TRAIN_SAMPLE = config('SUGGEST_TRAIN_SAMPLE', default=50000, cast=int)
+# Tags and categories on fewer posts than this are not learned.
+SUGGEST_MIN_EXAMPLES = config('SUGGEST_MIN_EXAMPLES', default=3, cast=int)
+# Passes over the training posts from scratch, and when continuing from the previous model.
+SUGGEST_EPOCHS = config('SUGGEST_EPOCHS', default=5, cast=int)
+SUGGEST_WARM_EPOCHS = config('SUGGEST_WARM_EPOCHS', default=2, cast=int)
+# Probability a tag needs to be suggested to authors, and to be applied by tag_backlog.
+SUGGEST_TAG_THRESHOLD = config('SUGGEST_TAG_THRESHOLD', default=0.3, cast=float)
+SUGGEST_AUTO_TAG_THRESHOLD = config('SUGGEST_AUTO_TAG_THRESHOLD', default=0.6, cast=float)
+SUGGEST_AUTO_CATEGORY_THRESHOLD = config('SUGGEST_AUTO_CATEGORY_THRESHOLD', default=0.7, cast=float)
+SUGGEST_MAX_AUTO_TAGS = config('SUGGEST_MAX_AUTO_TAGS', default=3, cast=int)
+
+# View Analytics Configuration
+# 'local' batches inserts per process, 'redis' buffers events in a Redis list drained by Celery.
+ANALYTICS_VIEW_BUFFER = config('ANALYTICS_VIEW_BUFFER', default='local')
+ANALYTICS_VIEW_BATCH_SIZE = config('ANALYTICS_VIEW_BATCH_SIZE', default=100, cast=int)
+ANALYTICS_VIEW_FLUSH_INTERVAL = config('ANALYTICS_VIEW_FLUSH_INTERVAL', default=5, cast=int)
+ANALYTICS_ROLLUP_LOOKBACK_DAYS = config('ANALYTICS_ROLLUP_LOOKBACK_DAYS', default=2, cast=int)
+ANALYTICS_RAW_RETENTION_DAYS = config('ANALYTICS_RAW_RETENTION_DAYS', default=30, cast=int)
 
 # Logging Configuration
 LOGGING = {
@@ -209,5 +539,9 @@ LOGGING = {
             'handlers': ['file', 'console'],
             'level': 'INFO',
         },
+        'config.db': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+        },
     },
 }
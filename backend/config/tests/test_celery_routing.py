@@ -0,0 +1,95 @@
+"""
+Queue and priority of every Celery task under CELERY_TASK_ROUTES.
+
+Routes are resolved by the project's Celery app, pointed at an in-memory
+broker for the duration of the tests so no Redis is needed; tasks queued
+through helpers such as request_summary are published there and read back.
+"""
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from config.celery import app
+
+# Task name: (queue, priority). Priority 5 is CELERY_TASK_DEFAULT_PRIORITY.
+EXPECTED_ROUTES = {
+    'apps.ai_service.tasks.generate_blog_summary_task': ('ai', 2),
+    'apps.ai_service.tasks.auto_summarize_blog_task': ('ai', 6),
+    'apps.ai_service.tasks.run_summary_batch_task': ('ai', 8),
+    'apps.ai_service.tasks.archive_ai_tasks_task': ('maintenance', 5),
+    'apps.analytics.tasks.rollup_daily_stats_task': ('analytics', 5),
+    'apps.analytics.tasks.purge_view_events_task': ('maintenance', 5),
+    'apps.media.tasks.process_image_task': ('media', 3),
+    'apps.media.tasks.backfill_image_variants_task': ('media', 8),
+    'apps.media.tasks.purge_stale_uploads_task': ('maintenance', 5),
+    'apps.search.tasks.rebuild_semantic_index_task': ('maintenance', 5),
+    'apps.search.tasks.train_tag_suggester_task': ('maintenance', 5),
+    'apps.search.tasks.update_blog_embedding_task': ('maintenance', 5),
+    'apps.users.tasks.import_users_task': ('default', 5),
+    'config.celery.debug_task': ('default', 5),
+}
+
+
+class CeleryRoutingTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.app = app
+        cls.broker_url = app.conf.broker_url
+        # Keys carry the CELERY_ namespace the app was configured with.
+        app.conf.CELERY_BROKER_URL = 'memory://'
+        # Registers the shared tasks of every installed app.
+        app.loader.import_default_modules()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.app.conf.CELERY_BROKER_URL = cls.broker_url
+        super().tearDownClass()
+
+    def route(self, name, **options):
+        task = self.app.tasks[name]
+        routed = self.app.amqp.router.route({**task._get_exec_options(), **options}, name)
+        return routed['queue'].name, routed['priority']
+
+    def test_every_task_is_routed(self):
+        tasks = {name for name in self.app.tasks if not name.startswith('celery.')}
+        self.assertEqual(tasks, set(EXPECTED_ROUTES))
+
+    def test_queue_and_priority(self):
+        for name, expected in EXPECTED_ROUTES.items():
+            with self.subTest(task=name):
+                self.assertEqual(self.route(name), expected)
+
+    def test_queues_are_declared(self):
+        declared = {queue.name for queue in self.app.conf.task_queues}
+        self.assertEqual(declared, {queue for queue, _ in EXPECTED_ROUTES.values()})
+
+    def test_call_options_override_priority(self):
+        # request_summary lowers the priority of automatic summaries this way.
+        self.assertEqual(self.route('apps.ai_service.tasks.generate_blog_summary_task', priority=6), ('ai', 6))
+
+    def published(self, queue):
+        """Priorities of the messages waiting in `queue`, which is emptied."""
+        priorities = []
+        with self.app.connection_for_read() as connection:
+            with connection.SimpleQueue(queue, no_ack=True) as messages:
+                while messages.qsize():
+                    priorities.append(messages.get(timeout=1).properties.get('priority'))
+        return priorities
+
+    def test_request_summary_keeps_task_priority(self):
+        from apps.ai_service import tasks
+
+        self.published('ai')
+        blog = mock.Mock(id=1, author_id=1)
+        with mock.patch.object(tasks, 'budget_state', return_value='ok'), \
+                mock.patch.object(tasks, 'claim_summary_task', return_value=(mock.Mock(id=2), True)), \
+                mock.patch.object(tasks.transaction, 'on_commit', side_effect=lambda callback: callback()):
+            tasks.request_summary(blog)
+            tasks.request_summary(blog, priority=6)
+        self.assertEqual(self.published('ai'), [2, 6])
+
+    def test_broker_is_in_memory(self):
+        with self.app.connection_for_write() as connection:
+            self.assertEqual(connection.transport_cls, 'memory')
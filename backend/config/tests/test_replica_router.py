@@ -0,0 +1,171 @@
+"""
+ReplicaRouter and ReplicaRoutingMiddleware against two SQLite databases.
+
+The test database is the primary and a temporary SQLite file is registered
+as replica_0, each with its own category table holding one row, so every
+read shows which database served it.
+"""
+import os
+import tempfile
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+from django.urls import ResolverMatch
+
+from apps.blogs.models import Category
+from config.db import routers
+from config.db.middleware import PIN_COOKIE, ReplicaRoutingMiddleware
+from config.db.routers import ReplicaRouter, check_health, use_primary, use_replica
+
+REPLICA = 'replica_0'
+
+
+def names():
+    return [category.name for category in Category.objects.all()]
+
+
+def view(request):
+    if request.method == 'POST':
+        Category.objects.create(name='Written', slug='written')
+    return HttpResponse(','.join(names()))
+
+
+async def async_view(request):
+    if request.method == 'POST':
+        await Category.objects.acreate(name='Written', slug='written')
+    return HttpResponse(','.join([category.name async for category in Category.objects.all()]))
+
+
+class ReplicaRoutingTests(SimpleTestCase):
+    databases = '__all__'
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        primary = settings.DATABASES[DEFAULT_DB_ALIAS]
+        # connections.settings is settings.DATABASES, so this registers the alias for both.
+        settings.DATABASES[REPLICA] = {
+            **primary,
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(cls.directory.name, 'replica.sqlite3'),
+            'OPTIONS': {},
+            'TEST': {**primary['TEST'], 'MIRROR': None},
+        }
+        super().setUpClass()
+        with connections[REPLICA].schema_editor() as editor:
+            editor.create_model(Category)
+        Category.objects.using(DEFAULT_DB_ALIAS).create(name='Primary', slug='primary')
+        Category.objects.using(REPLICA).create(name='Replica', slug='replica')
+    
+    @classmethod
+    def tearDownClass(cls):
+        Category.objects.using(DEFAULT_DB_ALIAS).all().delete()
+        connections[REPLICA].close()
+        super().tearDownClass()
+        del connections[REPLICA]
+        del settings.DATABASES[REPLICA]
+        cls.directory.cleanup()
+    
+    def setUp(self):
+        routers._health.clear()
+        cache.clear()
+    
+    def tearDown(self):
+        Category.objects.using(DEFAULT_DB_ALIAS).filter(slug='written').delete()
+    
+    def test_reads_use_primary_by_default(self):
+        self.assertEqual(names(), ['Primary'])
+    
+    def test_use_replica_reads_from_replica(self):
+        with use_replica():
+            self.assertEqual(names(), ['Replica'])
+            with use_primary():
+                self.assertEqual(names(), ['Primary'])
+    
+    def test_reads_after_write_use_primary(self):
+        with use_replica():
+            Category.objects.create(name='Written', slug='written')
+            self.assertEqual(names(), ['Primary', 'Written'])
+        with use_replica():
+            self.assertEqual(names(), ['Replica'])
+    
+    def test_replica_down_after_first_use_falls_back_to_primary(self):
+        with use_replica():
+            self.assertEqual(names(), ['Replica'])
+        # The connection stays open; the next check must still notice the replica is gone.
+        routers._health[REPLICA] = (True, 0)
+        with mock.patch.object(connections[REPLICA], 'create_cursor', side_effect=OperationalError):
+            with use_replica():
+                self.assertEqual(names(), ['Primary'])
+        self.assertFalse(routers.is_healthy(REPLICA))
+    
+    def test_failed_health_check_falls_back_to_primary(self):
+        with mock.patch.object(connections[REPLICA], 'ensure_connection', side_effect=OperationalError):
+            with use_replica():
+                self.assertEqual(names(), ['Primary'])
+    
+    def test_migrations_only_run_on_primary(self):
+        router = ReplicaRouter()
+        self.assertTrue(router.allow_migrate(DEFAULT_DB_ALIAS, 'blogs'))
+        self.assertFalse(router.allow_migrate(REPLICA, 'blogs'))
+    
+    def test_middleware_pins_browser_after_write(self):
+        middleware = ReplicaRoutingMiddleware(view)
+        factory = RequestFactory()
+        self.assertEqual(middleware(factory.get('/')).content, b'Replica')
+        response = middleware(factory.post('/'))
+        self.assertIn(PIN_COOKIE, response.cookies)
+        request = factory.get('/')
+        request.COOKIES[PIN_COOKIE] = response.cookies[PIN_COOKIE].value
+        self.assertEqual(middleware(request).content, b'Primary,Written')
+        forged = factory.get('/')
+        forged.COOKIES[PIN_COOKIE] = '1'
+        self.assertEqual(middleware(forged).content, b'Replica')
+    
+    def test_middleware_pins_api_client_after_write(self):
+        middleware = ReplicaRoutingMiddleware(view)
+        factory = RequestFactory(HTTP_AUTHORIZATION='Bearer one')
+        middleware(factory.post('/'))
+        self.assertEqual(middleware(factory.get('/')).content, b'Primary,Written')
+        other = RequestFactory(HTTP_AUTHORIZATION='Bearer two')
+        self.assertEqual(middleware(other.get('/')).content, b'Replica')
+    
+    def test_middleware_retries_on_primary_when_replica_fails(self):
+        def handler(request):
+            # What Django's handler does with an exception raised by the view.
+            try:
+                return view(request)
+            except Exception as e:
+                response = middleware.process_exception(request, e)
+                if response is None:
+                    raise
+                return response
+        
+        middleware = ReplicaRoutingMiddleware(handler)
+        check_health(REPLICA)
+        request = RequestFactory().get('/')
+        request.resolver_match = ResolverMatch(view, (), {})
+        with mock.patch.object(connections[REPLICA], 'create_cursor', side_effect=OperationalError):
+            self.assertEqual(middleware(request).content, b'Primary')
+        self.assertFalse(routers.is_healthy(REPLICA))
+    
+    def test_middleware_does_not_retry_primary_errors(self):
+        middleware = ReplicaRoutingMiddleware(view)
+        request = RequestFactory().get('/')
+        request.resolver_match = ResolverMatch(view, (), {})
+        with use_replica():
+            self.assertIsNone(middleware.process_exception(request, OperationalError()))
+    
+    async def test_async_middleware_routes_without_thread_hop(self):
+        middleware = ReplicaRoutingMiddleware(async_view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        factory = RequestFactory(HTTP_AUTHORIZATION='Bearer async')
+        self.assertEqual((await middleware(factory.get('/'))).content, b'Replica')
+        response = await middleware(factory.post('/'))
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertEqual((await middleware(factory.get('/'))).content, b'Primary,Written')
@@ -8,6 +8,8 @@ from django.conf.urls.static import static
 
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView, TokenVerifyView
 
+from config.views import cache_stats
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -16,6 +18,9 @@ urlpatterns = [
     path('api/users/', include('apps.users.urls')),
     path('api/blogs/', include('apps.blogs.urls')),
     path('api/ai/', include('apps.ai_service.urls')),
+    path('api/analytics/', include('apps.analytics.urls')),
+    path('api/media/', include('apps.media.urls')),
+    path('api/cache/stats/', cache_stats, name='cache_stats'),
 ]
 
 if settings.DEBUG: